@@ -6,6 +6,7 @@ ASF Data Search를 통한 데이터 검색 및 다운로드
 
 import argparse
 from src.data_retrieval import Sentinel1Retriever
+from src.stacks import partition_scenes
 from rich.console import Console
 
 console = Console()
@@ -50,6 +51,18 @@ def main():
         help='최대 검색 결과 수 (기본값: 100)'
     )
     
+    parser.add_argument(
+        '--bursts',
+        action='store_true',
+        help='전체 zip 대신 AOI와 겹치는 burst만 HTTP Range 요청으로 받기'
+    )
+    
+    parser.add_argument(
+        '--stream',
+        action='store_true',
+        help='검색·다운로드·검증을 겹쳐 실행 (검색 결과가 나오는 즉시 다운로드)'
+    )
+    
     parser.add_argument(
         '--pair',
         action='store_true',
@@ -83,6 +96,25 @@ def main():
     
     console.print(f"[green]검색 기간: {args.start_date} ~ {args.end_date}[/green]")
     
+    if args.stream:
+        # 스트리밍 모드: 결과 표를 기다리지 않고 바로 다운로드/검증
+        from src.streaming import StreamingIngest
+        
+        console.print("[cyan]스트리밍 모드: 검색 → 다운로드 → 검증 동시 진행[/cyan]\n")
+        stats = StreamingIngest(retriever=retriever, bursts_only=args.bursts or None).run(
+            start_date=args.start_date,
+            end_date=args.end_date,
+            max_results=args.max_results,
+            max_products=args.max_products
+        )
+        console.print(
+            f"\n[green]✓ 검색 {stats.searched}개, 다운로드 {stats.downloaded}개 "
+            f"(기존 파일 {stats.skipped}개), 검증 {stats.validated}개[/green]"
+        )
+        if stats.failed:
+            console.print(f"[red]실패 {len(stats.failed)}개: {', '.join(stats.failed)}[/red]")
+        return
+    
     if args.months:
         # 월별 영상 검색 모드
         import pandas as pd
@@ -118,20 +150,22 @@ def main():
             console.print("[bold red]❌ 한 쪽 또는 양쪽 월의 영상을 찾을 수 없습니다.[/bold red]")
             return
         
-        # 같은 촬영 시간대의 영상 찾기
-        products_df1['time'] = pd.to_datetime(products_df1['date']).dt.strftime('%H:%M')
-        products_df2['time'] = pd.to_datetime(products_df2['date']).dt.strftime('%H:%M')
-        
-        # 가장 많은 영상이 있는 시간대
-        all_times = pd.concat([products_df1['time'], products_df2['time']])
-        most_common_time = all_times.value_counts().idxmax()
-        
-        # 해당 시간대로 필터링
-        df1_filtered = products_df1[products_df1['time'] == most_common_time]
-        df2_filtered = products_df2[products_df2['time'] == most_common_time]
-        
-        if df1_filtered.empty or df2_filtered.empty:
-            console.print(f"[yellow]⚠️  촬영 시간 {most_common_time}에 맞는 영상이 부족합니다.[/yellow]")
+        # 두 달의 영상을 (궤도 방향, relative orbit, 프레임 구성) 스택으로 나눠 양쪽 월에 모두 있는 가장 큰 스택 선택
+        both = pd.concat([products_df1, products_df2], ignore_index=True).drop_duplicates('title')
+        stacks = [
+            stack for stack in partition_scenes(both, min_dates=2)
+            if stack.scenes['title'].isin(products_df1['title']).any()
+            and stack.scenes['title'].isin(products_df2['title']).any()
+        ]
+        
+        if stacks:
+            stack_name = stacks[0].name
+            titles = set(stacks[0].scenes['title'])
+            df1_filtered = products_df1[products_df1['title'].isin(titles)]
+            df2_filtered = products_df2[products_df2['title'].isin(titles)]
+        else:
+            stack_name = '-'
+            console.print("[yellow]⚠️  두 달에 모두 있는 스택(같은 궤도, 같은 프레임)이 없습니다.[/yellow]")
             df1_filtered = products_df1
             df2_filtered = products_df2
         
@@ -155,7 +189,7 @@ def main():
         console.print(f"  - {month1}월: {img1['date'].split('T')[0]} (Track {img1['track']}, {img1['size_mb']:.0f} MB)")
         console.print(f"  - {month2}월: {img2['date'].split('T')[0]} (Track {img2['track']}, {img2['size_mb']:.0f} MB)")
         console.print(f"  - 시간 간격: {temporal_baseline}일 (~{temporal_baseline/30:.1f}개월)")
-        console.print(f"  - 촬영 시간: {most_common_time}")
+        console.print(f"  - 스택: {stack_name}")
         
         if not args.download:
             console.print("\n💡 다운로드하려면:")
@@ -189,7 +223,8 @@ def main():
         console.print("\n[yellow]데이터 다운로드를 시작합니다...[/yellow]")
         downloaded = retriever.download_products(
             products_df,
-            max_products=args.max_products
+            max_products=args.max_products,
+            bursts_only=args.bursts or None
         )
         console.print(f"\n[green]✓ 다운로드 완료: {len(downloaded)}개 파일[/green]")
     elif not args.download and not products_df.empty:
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+간섭쌍 실행기(local_cluster) 재시도/노드 장애 테스트
+
+topsApp 없이 실행할 수 있도록 처리 결과(merged/*.geo)를 미리 만든 간섭쌍은 성공하고,
+결과가 없는 간섭쌍은 topsApp 실행 단계에서 실패하는 것을 이용합니다.
+    1. 재시도: 첫 시도에서 워커가 비정상 종료하면 다시 배치되어 성공
+    2. 노드 장애: 연결 실패(종료 코드 255) 노드는 제외되고 작업은 다른 노드로 재배치 (재시도 미차감)
+    3. 재시도 소진: 계속 실패하는 간섭쌍은 retries + 1번 시도 후 error가 채워진 결과로 반환
+"""
+
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import Config
+from src.executor import LocalClusterExecutor, WorkerNode
+from src.insar_processing import PairSpec, pair_products, pair_work_dir
+
+failures = []
+
+
+def check(condition: bool, message: str):
+    print(f"  {'✓' if condition else '✗'} {message}")
+    if not condition:
+        failures.append(message)
+
+
+class FlakyClusterExecutor(LocalClusterExecutor):
+    """marker 파일이 없으면 만들고 비정상 종료하는 워커 (실행마다 첫 시도만 실패)"""
+
+    def __init__(self, marker: Path, **kwargs):
+        super().__init__(**kwargs)
+        self.marker = marker
+
+    def command(self, node: WorkerNode):
+        code = (
+            "import os, sys\n"
+            "if not os.path.exists(sys.argv[1]):\n"
+            "    open(sys.argv[1], 'w').close()\n"
+            "    sys.exit(1)\n"
+            "os.execv(sys.executable, [sys.executable, '-m', 'src.executor', '--worker'])\n"
+        )
+        return [self.python, '-c', code, str(self.marker)]
+
+
+class DeadNodeClusterExecutor(LocalClusterExecutor):
+    """local-0 노드는 연결 실패(ssh 종료 코드 255)처럼 동작"""
+
+    def command(self, node: WorkerNode):
+        if node.name == 'local-0':
+            return [self.python, '-c', f"import sys; sys.exit({self.CONNECTION_FAILED})"]
+        return super().command(node)
+
+
+def make_products(pair: PairSpec, config: Config):
+    """topsApp 결과가 이미 있는 간섭쌍으로 만듦 (run_topsapp이 건너뜀)"""
+    for path in pair_products(pair_work_dir(pair, config)).values():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b'')
+
+
+print("=" * 60)
+print("간섭쌍 실행기(local_cluster) 재시도/노드 장애 테스트")
+print("=" * 60)
+
+workdir = Path(tempfile.mkdtemp(prefix='test_executor_'))
+try:
+    # 임시 프로젝트 (워커는 pickle된 설정 스냅샷으로 같은 경로를 봄)
+    (workdir / 'configs').mkdir()
+    shutil.copy(project_root / 'configs' / 'config.yaml', workdir / 'configs' / 'config.yaml')
+    config = Config(workdir / 'configs' / 'config.yaml')
+
+    done = [PairSpec(f"2020010{i}", f"2020011{i}", [f"/raw/S1A_{i}_ref.zip"], [f"/raw/S1A_{i}_sec.zip"])
+            for i in range(1, 5)]
+    for pair in done:
+        make_products(pair, config)
+    broken = PairSpec("20200201", "20200213", ["/raw/S1A_missing_ref.zip"], ["/raw/S1A_missing_sec.zip"])
+
+    print("\n[1단계] 첫 시도 실패 후 재시도 성공")
+    executor = FlakyClusterExecutor(workdir / 'flaky.marker', n_nodes=2, retries=1, config=config)
+    results = list(executor.run(done[:1]))
+    check(len(results) == 1 and results[0].ok, f"결과: {[(r.pair.name, r.error) for r in results]}")
+    check(results[0].attempts == 2, f"시도 횟수 2 (실제 {results[0].attempts})")
+    check(results[0].work_dir == pair_work_dir(done[0], config), "작업 디렉토리 반환")
+
+    print("\n[2단계] 노드 장애 시 다른 노드로 재배치")
+    executor = DeadNodeClusterExecutor(n_nodes=2, retries=0, config=config)
+    results = list(executor.run(done))
+    check(sorted(r.pair.name for r in results) == sorted(p.name for p in done), "모든 간섭쌍 결과 반환")
+    check(all(r.ok for r in results), f"모두 성공 (retries=0): {[r.error for r in results if not r.ok]}")
+    check({r.node for r in results} == {'local-1'}, f"살아 있는 노드에서만 처리: {sorted({r.node for r in results})}")
+    check(all(r.attempts == 1 for r in results), "노드 장애는 재시도 횟수에 포함되지 않음")
+    check(not executor.nodes[0].alive, "장애 노드 제외")
+
+    print("\n[3단계] 재시도 소진")
+    executor = LocalClusterExecutor(n_nodes=2, retries=2, config=config)
+    results = {r.pair.name: r for r in executor.run([broken, done[0]])}
+    check(results[done[0].name].ok, "정상 간섭쌍은 성공")
+    error = (results[broken.name].error or '').splitlines()
+    check(not results[broken.name].ok, f"실패 간섭쌍 오류: {error[0] if error else ''}")
+    check(results[broken.name].attempts == 3, f"retries + 1 = 3번 시도 (실제 {results[broken.name].attempts})")
+
+    print("\n[4단계] 모든 노드 장애")
+    executor = DeadNodeClusterExecutor(n_nodes=1, retries=0, config=config)
+    results = list(executor.run(done[:2]))
+    check(len(results) == 2 and not any(r.ok for r in results), "작업 노드가 없으면 모든 간섭쌍 실패로 반환")
+finally:
+    shutil.rmtree(workdir, ignore_errors=True)
+
+print("\n" + "=" * 60)
+print("테스트 완료!" if not failures else f"테스트 실패: {len(failures)}개")
+print("=" * 60)
+sys.exit(1 if failures else 0)
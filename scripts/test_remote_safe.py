@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+"""
+burst 부분 다운로드(BurstSubsetRetriever) 왕복 테스트
+
+합성 SAFE zip(burst 3개, 복소 int16 strip TIFF)을 로컬 HTTP 서버로 Range 응답하며 내보내고,
+AOI와 겹치는 가운데 burst만 받은 부분 SAFE가 원본 행과 같은지 확인합니다.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+import io
+import json
+import re
+import shutil
+import struct
+import sys
+import tempfile
+import threading
+import zipfile
+
+import numpy as np
+
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.config import Config, use_config
+from src.remote_safe import BurstSubsetRetriever, read_tiff_layout
+
+SAFE = "S1A_IW_SLC__1SDV_20200101T212305_20200101T212332_030000_036000_ABCD.SAFE"
+STEM = "s1a-iw1-slc-vv-20200101t212305-20200101t212332-030000-036000-004"
+WIDTH, LINES_PER_BURST, N_BURSTS = 4096, 10, 3  # zip 끝 64 KB(중앙 디렉토리 탐색)보다 충분히 크게
+LENGTH = LINES_PER_BURST * N_BURSTS
+
+failures = []
+
+
+def check(condition: bool, message: str):
+    print(f"  {'✓' if condition else '✗'} {message}")
+    if not condition:
+        failures.append(message)
+
+
+def make_tiff(samples: np.ndarray) -> bytes:
+    """(LENGTH, WIDTH, 2) int16 → 행마다 strip 하나인 비압축 TIFF (SampleFormat 5 = 복소 정수)"""
+    n_tags = 9
+    arrays_offset = 8 + 2 + n_tags * 12 + 4
+    counts_offset = arrays_offset + 4 * LENGTH
+    data_offset = counts_offset + 4 * LENGTH
+    row_bytes = WIDTH * 4
+    tags = [
+        (256, 3, 1, WIDTH),                 # ImageWidth
+        (257, 3, 1, LENGTH),                # ImageLength
+        (258, 3, 1, 32),                    # BitsPerSample
+        (259, 3, 1, 1),                     # Compression (없음)
+        (273, 4, LENGTH, arrays_offset),    # StripOffsets
+        (277, 3, 1, 1),                     # SamplesPerPixel
+        (278, 3, 1, 1),                     # RowsPerStrip
+        (279, 4, LENGTH, counts_offset),    # StripByteCounts
+        (339, 3, 1, 5),                     # SampleFormat
+    ]
+    out = io.BytesIO()
+    out.write(b'II' + struct.pack('<HI', 42, 8))
+    out.write(struct.pack('<H', n_tags))
+    for tag, dtype, count, value in tags:
+        if dtype == 3 and count == 1:
+            out.write(struct.pack('<HHIHH', tag, dtype, count, value, 0))
+        else:
+            out.write(struct.pack('<HHII', tag, dtype, count, value))
+    out.write(struct.pack('<I', 0))
+    out.write(struct.pack(f'<{LENGTH}I', *[data_offset + r * row_bytes for r in range(LENGTH)]))
+    out.write(struct.pack(f'<{LENGTH}I', *[row_bytes] * LENGTH))
+    out.write(samples.astype('<i2').tobytes())
+    return out.getvalue()
+
+
+def make_annotation() -> bytes:
+    """burst k는 위도 36.0 + 0.1k ~ 36.0 + 0.1k + 0.09 (행마다 0.01도)"""
+    points = ''.join(
+        f"<geolocationGridPoint><line>{line}</line><pixel>{pixel}</pixel>"
+        f"<latitude>{36.0 + 0.01 * line:.4f}</latitude><longitude>{129.0 + 0.3 * pixel / (WIDTH - 1):.4f}</longitude>"
+        f"</geolocationGridPoint>"
+        for line in sorted({k * LINES_PER_BURST + o for k in range(N_BURSTS) for o in (0, LINES_PER_BURST - 1)})
+        for pixel in (0, WIDTH - 1)
+    )
+    bursts = '<burst/>' * N_BURSTS
+    return (
+        f"<product><adsHeader><swath>IW1</swath><polarisation>VV</polarisation></adsHeader>"
+        f"<swathTiming><linesPerBurst>{LINES_PER_BURST}</linesPerBurst>"
+        f"<burstList count=\"{N_BURSTS}\">{bursts}</burstList></swathTiming>"
+        f"<geolocationGrid><geolocationGridPointList>{points}</geolocationGridPointList></geolocationGrid></product>"
+    ).encode('utf-8')
+
+
+def make_safe_zip(samples: np.ndarray) -> bytes:
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, 'w') as zf:
+        zf.writestr(f"{SAFE}/manifest.safe", "<manifest/>", compress_type=zipfile.ZIP_DEFLATED)
+        zf.writestr(f"{SAFE}/annotation/{STEM}.xml", make_annotation(), compress_type=zipfile.ZIP_DEFLATED)
+        # 측정 TIFF는 SAFE zip처럼 비압축 저장 (구간 읽기 가능)
+        zf.writestr(f"{SAFE}/measurement/{STEM}.tiff", make_tiff(samples), compress_type=zipfile.ZIP_STORED)
+    return out.getvalue()
+
+
+def serve(content: bytes) -> ThreadingHTTPServer:
+    """Range 요청(206)을 지원하는 로컬 HTTP 서버"""
+
+    class RangeHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            match = re.fullmatch(r'bytes=(\d+)-(\d+)', self.headers.get('Range', ''))
+            if match is None:
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+                return
+            start, end = int(match.group(1)), min(int(match.group(2)), len(content) - 1)
+            self.send_response(206)
+            self.send_header('Content-Range', f"bytes {start}-{end}/{len(content)}")
+            self.send_header('Content-Length', str(end - start + 1))
+            self.end_headers()
+            self.wfile.write(content[start:end + 1])
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), RangeHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+print("=" * 60)
+print("burst 부분 다운로드 왕복 테스트 (로컬 HTTP Range 서버)")
+print("=" * 60)
+
+workdir = Path(tempfile.mkdtemp(prefix='test_remote_safe_'))
+server = None
+try:
+    # 임시 프로젝트 (data/ 디렉토리를 저장소 밖에 만듦)
+    (workdir / 'configs').mkdir()
+    shutil.copy(project_root / 'configs' / 'config.yaml', workdir / 'configs' / 'config.yaml')
+    config = Config(workdir / 'configs' / 'config.yaml')
+    config.config['sentinel1']['polarization'] = 'VV'
+    config.config['burst_subset'] = {'workers': 2, 'chunk_mb': 0.01}  # 약 10 KB 청크로 나눠 병렬 Range 요청
+
+    rows = np.arange(LENGTH)[:, None]
+    cols = np.arange(WIDTH)[None, :]
+    samples = np.stack([np.broadcast_to((rows * 100 + cols) % 30000 + 1, (LENGTH, WIDTH)),
+                        np.broadcast_to(-rows - 1, (LENGTH, WIDTH))], axis=-1)
+    content = make_safe_zip(samples)
+    server = serve(content)
+    url = f"http://127.0.0.1:{server.server_address[1]}/{SAFE[:-5]}.zip"
+    print(f"\n[1단계] 합성 SAFE zip: {len(content)} bytes, burst {N_BURSTS}개 → {url}")
+
+    print("\n[2단계] AOI(가운데 burst)만 부분 다운로드...")
+    with use_config(config):
+        retriever = BurstSubsetRetriever()
+        safe_dir = retriever.fetch(url, SAFE[:-5], workdir / 'raw', aoi_bbox=[36.12, 36.17, 129.1, 129.2])
+
+    print("\n[3단계] 결과 확인")
+    check(safe_dir == workdir / 'raw' / SAFE, f"부분 SAFE 경로: {safe_dir.name}")
+    check(not any(p.name.endswith('.partial') for p in (workdir / 'raw').iterdir()), "임시(.partial) 디렉토리 정리")
+    check((safe_dir / 'manifest.safe').read_text() == "<manifest/>", "manifest.safe 복사")
+    check((safe_dir / 'annotation' / f"{STEM}.xml").read_bytes() == make_annotation(), "annotation XML 복사")
+
+    summary = json.loads((safe_dir / 'subset.json').read_text(encoding='utf-8'))
+    check(summary['bursts'] == {f"{STEM}.tiff": [1]}, f"선택된 burst: {summary['bursts']}")
+    check(summary['bytes_read'] < summary['zip_size'], f"전송량 {summary['bytes_read']} < 전체 {summary['zip_size']} bytes")
+
+    tiff = (safe_dir / 'measurement' / f"{STEM}.tiff").read_bytes()
+    layout = read_tiff_layout(lambda offset, length: tiff[offset:offset + length])
+    check((layout.width, layout.length) == (WIDTH, LENGTH), "TIFF 구조(헤더, IFD, strip 배열) 유지")
+    pixels = np.stack([
+        np.frombuffer(tiff[offset:offset + count], dtype='<i2').reshape(WIDTH, 2)
+        for offset, count in zip(layout.strip_offsets, layout.strip_byte_counts)
+    ])
+    burst = slice(LINES_PER_BURST, 2 * LINES_PER_BURST)
+    check(np.array_equal(pixels[burst], samples[burst]), "가운데 burst 행이 원본과 같음")
+    outside = np.r_[0:LINES_PER_BURST, 2 * LINES_PER_BURST:LENGTH]
+    check(not pixels[outside].any(), "받지 않은 burst 행은 0 (hole)")
+finally:
+    if server is not None:
+        server.shutdown()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+print("\n" + "=" * 60)
+print("테스트 완료!" if not failures else f"테스트 실패: {len(failures)}개")
+print("=" * 60)
+sys.exit(1 if failures else 0)
@@ -34,6 +34,19 @@ setup(
     entry_points={
         'console_scripts': [
             's1-retrieve=src.data_retrieval:main',
+            's1-tiles=src.visualization:main',
+            's1-query=src.timeseries_query:main',
+            's1-update=src.incremental:main',
+            's1-dag=src.dag:main',
+            's1-workspace=src.workspace:main',
+            's1-triage=src.triage:main',
+            's1-mask=src.masking:main',
+            's1-scatterers=src.scatterers:main',
+            's1-decompose=src.decomposition:main',
+            's1-model=src.deformation:main',
+            's1-uncertainty=src.uncertainty:main',
+            's1-geotiff=src.geotiff:main',
+            's1-executor=src.executor:main',
         ],
     },
 )
@@ -6,10 +6,34 @@ Sentinel-1 SLC 데이터를 활용한 한반도 동남권 지표 변위 모니
 
 Main modules:
 - data_retrieval: Sentinel-1 데이터 검색 및 다운로드
+- streaming: 검색·다운로드·검증 동시 진행 파이프라인
+- raw_store: 디스크 예산 기반 원시 SLC 저장소
+- remote_safe: HTTP Range 요청 기반 AOI burst 부분 다운로드
 - preprocessing: SAR 데이터 전처리
-- insar_processing: InSAR 간섭도 생성
-- time_series: SBAS 시계열 분석
-- visualization: 결과 시각화
+- insar_processing: InSAR 간섭도 생성 (topsApp 실행 및 스택 적재)
+- time_series: SBAS 시계열 분석 (정규방정식 누적형)
+- atmosphere: 성층 대류권 지연 보정
+- referencing: 기준점 정규화
+- masking: 육지/저 coherence 유효 픽셀 마스크 (블록 건너뛰기)
+- closure: 위상 폐합 기반 간섭도 품질 검사
+- triage: topsApp 전 quick-look coherence 기반 간섭쌍 선별
+- executor: 간섭쌍 처리 실행기 (프로세스 풀/SSH 다중 노드)
+- scatterers: 스택 통계 기반 PS/DS 후보 선정
+- decomposition: 상승/하강 LOS 속도의 수직·동서 분해
+- deformation: 픽셀별 변형 모델(선형/계절/계단) 일괄 적합
+- uncertainty: 간섭도 부트스트랩 기반 속도 표준편차
+- catalog: 장면 카탈로그 및 증분 동기화
+- product_table: 열 단위 제품 테이블 (Parquet 저장)
+- stacks: (궤도 방향, relative orbit, 프레임 구성) 단위 처리 스택 분할
+- incremental: 새 촬영분만 반영하는 증분 스택 갱신
+- workspace: 여러 AOI 공유 작업 공간 (카탈로그/다운로드/간섭쌍 처리 공유)
+- dag: 내용 해시 기반 증분 파이프라인 실행기 (make 방식)
+- visualization: 결과 시각화 (오버뷰 피라미드 타일)
+- geotiff: 최종 제품 Cloud-Optimized GeoTIFF 내보내기 (병렬 타일 압축)
+- raster_io: ISCE2 래스터 블록 단위 읽기/쓰기
+- stack: 간섭도/시계열 스택 저장소 (HDF5)
+- geocoding: 경위도 → 픽셀 룩업 인덱스
+- timeseries_query: 지점 변위 시계열 조회
 """
 
 __version__ = "0.1.0"
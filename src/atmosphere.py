@@ -0,0 +1,361 @@
+"""
+Atmospheric Correction Module
+성층 대류권 지연(stratified tropospheric delay) 추정 및 간섭도 보정
+
+두 가지 방식을 지원합니다.
+- dem: 간섭도별 위상-고도 선형 회귀(phase = k·h + c)를 블록 단위로 누적해 계수를 구하고,
+  간섭쌍 네트워크에서 날짜별 계수로 분해 (k_ij = k_j - k_i)
+- weather: 날짜별 기상 모델 천정 지연(ZTD) 격자(<weather_dir>/<YYYYMMDD>.npz)를
+  픽셀 위치로 보간 후 LOS 방향으로 변환 (간섭쌍 두 날짜 중 하나라도 파일이 없으면
+  그 간섭쌍은 두 날짜 모두 dem 스크린 사용 - 절대 ZTD와 상대 dem 스크린을 섞어 빼지 않음)
+
+날짜별 위상 스크린은 <cache_dir>/screen_<YYYYMMDD>_<방식>_<키>.npy에 한 번만 계산해 두고,
+그 날짜를 포함하는 모든 간섭도에서 재사용합니다 (간섭도 보정 = screen_sec - screen_ref).
+키는 dem 계수 또는 기상 파일과 스택 격자로 정해지므로 /atmosphere가 새로 만들어지면 새 스크린을 계산합니다.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Sequence
+import hashlib
+import logging
+
+import numpy as np
+
+from .config import get_config
+from .masking import ValidityMask
+from .raster_io import IsceRaster
+from .stack import StackStore
+from .time_series import design_matrix
+
+logger = logging.getLogger(__name__)
+
+# 간섭쌍 이름 (YYYYMMDD_YYYYMMDD)
+_PAIR_DTYPE = 'S17'
+
+
+def find_cached_dem(config=None) -> Path:
+    """topsApp이 내려받은 AOI DEM(demLat_*.dem.wgs84) 찾기"""
+    config = config or get_config()
+    candidates = sorted((config.get_path('processed_dir') / 'pairs').glob('*/demLat_*.dem.wgs84'))
+    if not candidates:
+        raise FileNotFoundError(
+            "캐시된 DEM을 찾을 수 없습니다. atmosphere.dem_path를 지정하세요."
+        )
+    return candidates[0]
+
+
+def bilinear_sample(
+    grid_lon: np.ndarray,
+    grid_lat: np.ndarray,
+    values: np.ndarray,
+    lons: np.ndarray,
+    lats: np.ndarray
+) -> np.ndarray:
+    """규칙 격자 쌍선형 보간 (격자 밖은 NaN)
+
+    Args:
+        grid_lon: (nx,) 증가하는 경도
+        grid_lat: (ny,) 위도 (증가/감소 모두 가능)
+        values: (ny, nx) 격자 값
+        lons, lats: 보간 위치 (같은 shape)
+    """
+    if grid_lat[0] > grid_lat[-1]:
+        grid_lat = grid_lat[::-1]
+        values = values[::-1]
+    fx = np.interp(lons, grid_lon, np.arange(grid_lon.size), left=np.nan, right=np.nan)
+    fy = np.interp(lats, grid_lat, np.arange(grid_lat.size), left=np.nan, right=np.nan)
+    outside = np.isnan(fx) | np.isnan(fy)
+    fx = np.where(outside, 0, fx)
+    fy = np.where(outside, 0, fy)
+
+    x0 = np.clip(np.floor(fx).astype(np.int64), 0, grid_lon.size - 2)
+    y0 = np.clip(np.floor(fy).astype(np.int64), 0, grid_lat.size - 2)
+    wx = fx - x0
+    wy = fy - y0
+    out = (values[y0, x0] * (1 - wx) * (1 - wy) + values[y0, x0 + 1] * wx * (1 - wy)
+           + values[y0 + 1, x0] * (1 - wx) * wy + values[y0 + 1, x0 + 1] * wx * wy)
+    out[outside] = np.nan
+    return out
+
+
+class TroposphericCorrection:
+    """대류권 지연 보정 단계
+
+    Example:
+        with StackStore.open(mode='r+') as store:
+            atm = TroposphericCorrection(store)
+            atm.prepare_height()
+            atm.apply()
+    """
+
+    def __init__(self, store: StackStore, block_size: int = None):
+        """
+        Args:
+            store: 쓰기 가능한 StackStore
+            block_size: 블록 처리 단위 (기본값: stack.block_size)
+        """
+        self.config = get_config()
+        self.store = store
+        self.block_size = block_size
+        self.mask = ValidityMask.for_store(store)
+        atm_config = self.config.get('atmosphere', default={}) or {}
+        self.method = atm_config.get('method', 'dem')
+        self.coherence_threshold = atm_config.get('coherence_threshold', 0.5)
+        self.wavelength = self.config.get('sbas', 'wavelength', default=0.0555)
+
+        weather_dir = atm_config.get('weather_dir')
+        self.weather_dir = self.config.project_root / weather_dir if weather_dir else None
+        self.cache_dir = self.config.project_root / atm_config.get(
+            'cache_dir', './data/processed/atmosphere'
+        )
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+        self.group = store.h5.require_group('atmosphere')
+
+    # ------------------------------------------------------------------
+    # 고도 준비
+    # ------------------------------------------------------------------
+    def prepare_height(self, dem_path: str = None, block_rows: int = 256):
+        """DEM을 스택 격자로 (최근접) 리샘플해 /geometry/height에 기록
+
+        스택과 크기가 같은 래스터(예: hgt.rdr)는 그대로 복사합니다.
+        """
+        if self.store.has_geometry('height'):
+            return
+        if dem_path is None:
+            dem_config = self.config.get('atmosphere', 'dem_path')
+            dem_path = self.config.project_root / dem_config if dem_config else find_cached_dem(self.config)
+        dem = IsceRaster(dem_path)
+        view = dem.band(1)
+        cols_all = slice(0, self.store.width)
+
+        if dem.shape == self.store.shape:
+            for row0, row1, block in dem.iter_row_blocks(block_rows):
+                self.store.write_geometry('height', (slice(row0, row1), cols_all), block)
+            return
+
+        if dem.geotransform is None or self.store.geotransform is None:
+            raise ValueError("DEM과 스택 크기가 다르면 둘 다 지오코딩되어 있어야 합니다")
+        lon0, dlon, lat0, dlat = dem.geotransform
+        s_lon0, s_dlon, s_lat0, s_dlat = self.store.geotransform
+        lons = s_lon0 + (np.arange(self.store.width) + 0.5) * s_dlon
+        dem_cols = np.clip(((lons - lon0) / dlon).astype(np.int64), 0, dem.width - 1)
+
+        for row0 in range(0, self.store.length, block_rows):
+            row1 = min(row0 + block_rows, self.store.length)
+            lats = s_lat0 + (np.arange(row0, row1) + 0.5) * s_dlat
+            dem_rows = np.clip(((lats - lat0) / dlat).astype(np.int64), 0, dem.length - 1)
+            block = np.asarray(view[dem_rows.min():dem_rows.max() + 1])
+            height = block[dem_rows - dem_rows.min()][:, dem_cols].astype(np.float32)
+            self.store.write_geometry('height', (slice(row0, row1), cols_all), height)
+        logger.info(f"고도 래스터 준비 완료: {dem_path}")
+
+    # ------------------------------------------------------------------
+    # 계수 추정 (dem 방식)
+    # ------------------------------------------------------------------
+    def _read_list(self, name: str) -> list:
+        """간섭쌍별 기록 읽기 (이전 스택은 그룹 속성에 저장되어 있음)"""
+        if name in self.group:
+            values = self.group[name][:]
+            return [v.decode() if isinstance(v, bytes) else v for v in values.tolist()]
+        return list(self.group.attrs.get(name, []))
+
+    def _write_list(self, name: str, values: Sequence, dtype: str):
+        """간섭쌍별 기록 저장 (속성은 64KB 제한이 있어 긴 스택에서 실패하므로 크기 조절 데이터셋)"""
+        if name in self.group.attrs:
+            del self.group.attrs[name]
+        if name not in self.group:
+            self.group.create_dataset(name, shape=(0,), maxshape=(None,), dtype=dtype)
+        self.group[name].resize(len(values), axis=0)
+        if len(values):
+            self.group[name][:] = np.asarray(values, dtype=dtype)
+
+    def _stored_coefficients(self) -> Dict[str, float]:
+        names = self._read_list('pair_names')
+        values = self._read_list('pair_coefficients')
+        return dict(zip([str(n) for n in names], [float(v) for v in values]))
+
+    def _stored_date_coefficients(self) -> Dict[str, float]:
+        names = self.group.attrs.get('dates', [])
+        values = self.group.attrs.get('date_coefficients', [])
+        return dict(zip([str(n) for n in names], [float(v) for v in values]))
+
+    def estimate_pair_coefficients(self, indices: Sequence[int]) -> np.ndarray:
+        """간섭도별 위상-고도 기울기 k (rad/m) - 블록 단위 합계 누적
+
+        coherence가 atmosphere.coherence_threshold 이상인 픽셀만 사용합니다.
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        n = indices.size
+        sums = {key: np.zeros(n) for key in ('n', 'h', 'hh', 'p', 'hp')}
+
+        for window in self.store.iter_windows(self.block_size, mask=self.mask):
+            height = self.store.read_geometry('height', window)
+            phase = self.store.read_stack('interferograms/unwrapped_phase', window, index=indices)
+            coherence = self.store.read_stack('interferograms/coherence', window, index=indices)
+            valid = np.isfinite(phase) & (coherence >= self.coherence_threshold) & np.isfinite(height)
+            h = np.where(valid, height, 0.0)
+            p = np.where(valid, phase, 0.0)
+            sums['n'] += valid.sum(axis=(1, 2))
+            sums['h'] += h.sum(axis=(1, 2))
+            sums['hh'] += (h * h).sum(axis=(1, 2))
+            sums['p'] += p.sum(axis=(1, 2))
+            sums['hp'] += (h * p).sum(axis=(1, 2))
+
+        denom = sums['n'] * sums['hh'] - sums['h'] ** 2
+        slope = np.divide(
+            sums['n'] * sums['hp'] - sums['h'] * sums['p'], denom,
+            out=np.zeros(n), where=(denom > 0) & (sums['n'] > 10)
+        )
+        return slope
+
+    def _solve_date_coefficients(self, pairs: List[tuple], slopes: np.ndarray):
+        """간섭도 계수 → 날짜 계수 (이미 확정된 날짜는 고정)"""
+        known = self._stored_date_coefficients()
+        dates = sorted({d for pair in pairs for d in pair} | set(known))
+        unknown = [d for d in dates if d not in known]
+        if not unknown:
+            return
+        if not known:
+            # 첫 날짜를 0으로 두고 전체 네트워크 최소제곱
+            A = design_matrix(pairs, dates)
+            solution = np.concatenate([[0.0], np.linalg.lstsq(A, slopes, rcond=None)[0]])
+            known = dict(zip(dates, solution))
+        else:
+            # 기존 날짜 계수는 이미 적용된 스크린과 일치하도록 고정
+            full = np.hstack([np.zeros((len(pairs), 1)), design_matrix(pairs, dates)])
+            col = {d: i for i, d in enumerate(dates)}
+            known_cols = [col[d] for d in known]
+            unknown_cols = [col[d] for d in unknown]
+            residual = slopes - full[:, known_cols] @ np.array(list(known.values()))
+            solution = np.linalg.lstsq(full[:, unknown_cols], residual, rcond=None)[0]
+            known.update(zip(unknown, solution))
+
+        ordered = sorted(known)
+        self.group.attrs['dates'] = ordered
+        self.group.attrs['date_coefficients'] = [known[d] for d in ordered]
+
+    # ------------------------------------------------------------------
+    # 날짜별 스크린 (캐시)
+    # ------------------------------------------------------------------
+    def _weather_file(self, date: str):
+        if self.method != 'weather' or self.weather_dir is None:
+            return None
+        path = self.weather_dir / f"{date}.npz"
+        return path if path.exists() else None
+
+    def _screen_path(self, date: str, kind: str, source) -> Path:
+        """스크린 캐시 경로 - 방식과 입력(dem 계수 또는 기상 파일), 스택 격자가 바뀌면 다른 파일"""
+        key = f"{source!r}|{self.store.shape}|{self.store.geotransform}|{self.wavelength}"
+        if kind == 'weather':
+            key += f"|{source.stat().st_mtime_ns}|{self.store.has_geometry('incidence')}"
+        digest = hashlib.sha1(key.encode()).hexdigest()[:12]
+        return self.cache_dir / f"screen_{date}_{kind}_{digest}.npy"
+
+    def pair_screen_kind(self, pair: Sequence[str]) -> str:
+        """간섭쌍에 쓸 스크린 방식 (두 날짜 모두 기상 파일이 있을 때만 weather)"""
+        if all(self._weather_file(d) is not None for d in pair):
+            return 'weather'
+        return 'dem'
+
+    def date_screen(self, date: str, kind: str = None) -> np.ndarray:
+        """날짜별 위상 스크린 (rad, 메모리 맵) - 없으면 계산 후 캐시
+
+        Args:
+            date: 'YYYYMMDD'
+            kind: 'weather' 또는 'dem' (기본값: 기상 파일이 있으면 weather)
+        """
+        weather_file = self._weather_file(date)
+        if kind is None:
+            kind = 'weather' if weather_file is not None else 'dem'
+        if kind == 'weather':
+            if weather_file is None:
+                raise FileNotFoundError(f"기상 모델 파일이 없습니다: {date}")
+        else:
+            weather_file = None
+            coefficient = self._stored_date_coefficients().get(date)
+            if coefficient is None:
+                raise KeyError(f"날짜 계수가 없습니다: {date} (estimate 먼저 실행)")
+
+        path = self._screen_path(date, kind, weather_file if kind == 'weather' else coefficient)
+        if path.exists():
+            return np.load(path, mmap_mode='r')
+        # 같은 날짜/방식의 이전 스크린(이전 계수, 이전 /atmosphere)은 더 이상 쓰지 않음
+        for stale in [self.cache_dir / f"screen_{date}.npy", *self.cache_dir.glob(f"screen_{date}_{kind}_*.npy")]:
+            if stale.exists():
+                stale.unlink()
+
+        if weather_file is not None:
+            weather = np.load(weather_file)
+            if self.store.geotransform is None:
+                raise ValueError("기상 모델 보정은 지오코딩된 스택에서만 지원합니다")
+            lon0, dlon, lat0, dlat = self.store.geotransform
+        to_phase = 4 * np.pi / self.wavelength
+
+        screen = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32, shape=self.store.shape)
+        for window in self.store.iter_windows(self.block_size):
+            if weather_file is None:
+                screen[window] = coefficient * self.store.read_geometry('height', window)
+                continue
+            rows = np.arange(window[0].start, window[0].stop) + 0.5
+            cols = np.arange(window[1].start, window[1].stop) + 0.5
+            lons, lats = np.meshgrid(lon0 + cols * dlon, lat0 + rows * dlat)
+            ztd = bilinear_sample(weather['lon'], weather['lat'], weather['ztd'], lons, lats)
+            if self.store.has_geometry('incidence'):
+                ztd = ztd / np.cos(np.deg2rad(self.store.read_geometry('incidence', window)))
+            screen[window] = to_phase * ztd
+        screen.flush()
+        del screen
+        logger.info(f"날짜 스크린 생성: {date} ({kind})")
+        return np.load(path, mmap_mode='r')
+
+    # ------------------------------------------------------------------
+    # 적용
+    # ------------------------------------------------------------------
+    @property
+    def corrected_pairs(self) -> set:
+        return {str(n) for n in self._read_list('corrected')}
+
+    def apply(self, indices: Sequence[int] = None):
+        """간섭도 보정 (스크린 차이를 빼서 스택에 덮어씀)
+
+        Args:
+            indices: 보정할 간섭도 인덱스 (기본값: 아직 보정되지 않은 전부)
+        """
+        pairs = self.store.pairs
+        done = self.corrected_pairs
+        if indices is None:
+            indices = range(len(pairs))
+        indices = [int(i) for i in indices if '_'.join(pairs[i]) not in done]
+        if not indices:
+            logger.info("보정할 간섭도가 없습니다")
+            return
+
+        selected = [pairs[i] for i in indices]
+        kinds = [self.pair_screen_kind(pair) for pair in selected]
+        if 'dem' in kinds:
+            self.prepare_height()
+            slopes = self.estimate_pair_coefficients(indices)
+            coefficients = self._stored_coefficients()
+            coefficients.update({'_'.join(p): float(k) for p, k in zip(selected, slopes)})
+            self._write_list('pair_names', list(coefficients), _PAIR_DTYPE)
+            self._write_list('pair_coefficients', list(coefficients.values()), 'float64')
+            self._solve_date_coefficients(selected, slopes)
+
+        # 간섭쌍 안에서는 두 날짜가 같은 방식의 스크린을 써야 차이가 의미 있음
+        keys = sorted({(d, kind) for pair, kind in zip(selected, kinds) for d in pair})
+        screens = {key: self.date_screen(*key) for key in keys}
+        index_array = np.asarray(indices)
+
+        for window in self.store.iter_windows(self.block_size, mask=self.mask):
+            local = {key: np.asarray(screens[key][window]) for key in keys}  # 스크린당 한 번 읽기
+            correction = np.stack([
+                local[(sec, kind)] - local[(ref, kind)] for (ref, sec), kind in zip(selected, kinds)
+            ])
+            phase = self.store.read_stack('interferograms/unwrapped_phase', window, index=index_array)
+            self.store.write_stack('interferograms/unwrapped_phase', window, phase - correction, index=index_array)
+
+        self._write_list('corrected', sorted(done | {'_'.join(p) for p in selected}), _PAIR_DTYPE)
+        if self.mask is not None:
+            self.mask.mark_corrections()
+        logger.info(f"대류권 지연 보정 완료: 간섭도 {len(indices)}개, 날짜 스크린 {len(keys)}개")
@@ -0,0 +1,169 @@
+"""
+Scene Catalog Module
+검색된 Sentinel-1 장면의 로컬 카탈로그와 증분 동기화
+"""
+
+import copy
+import json
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Tuple
+import logging
+
+import pandas as pd
+
+from .config import get_config
+from .product_table import PRODUCT_COLUMNS, empty_table, load_parquet, normalize_table, save_parquet
+from .stacks import SceneStack, partition_scenes, select_stack
+
+logger = logging.getLogger(__name__)
+
+
+# 카탈로그에 저장하는 열 (제품 테이블과 같음)
+CATALOG_COLUMNS = PRODUCT_COLUMNS
+
+
+def scene_date(date_value) -> str:
+    """ASF startTime → 'YYYYMMDD'"""
+    return pd.to_datetime(date_value).strftime('%Y%m%d')
+
+
+class SceneCatalog:
+    """장면 카탈로그 (JSON 또는 .parquet 파일)
+
+    마지막 동기화 시각과 지금까지 확인한 장면 목록을 보관하므로
+    다음 동기화에서는 그 이후의 새 장면만 찾습니다.
+    """
+
+    def __init__(self, path: str = None):
+        """
+        Args:
+            path: 카탈로그 파일 경로 (기본값: catalog.path)
+        """
+        self.config = get_config()
+        if path is None:
+            path = self.config.project_root / self.config.get(
+                'catalog', 'path', default='./data/catalog.json'
+            )
+        self.path = Path(path)
+        self.last_sync = None
+        self.scenes = empty_table()
+        if self.path.exists():
+            self._load()
+
+    @property
+    def _is_parquet(self) -> bool:
+        return self.path.suffix == '.parquet'
+
+    def _load(self):
+        if self._is_parquet:
+            self.scenes, metadata = load_parquet(self.path)
+            self.last_sync = metadata.get('last_sync')
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.last_sync = data.get('last_sync')
+        scenes = pd.DataFrame(data.get('scenes', []))
+        self.scenes = normalize_table(scenes.reindex(columns=CATALOG_COLUMNS)) if not scenes.empty else empty_table()
+
+    def save(self):
+        """카탈로그 저장"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        scenes = self.scenes[CATALOG_COLUMNS]
+        if self._is_parquet:
+            save_parquet(scenes, self.path, metadata={'last_sync': self.last_sync or ''})
+            return
+        records = scenes.astype(object).where(scenes.notna(), None).to_dict(orient='records')
+        data = {'last_sync': self.last_sync, 'scenes': records}
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False, default=int)
+
+    def __len__(self) -> int:
+        return len(self.scenes)
+
+    def add(self, products_df: pd.DataFrame) -> pd.DataFrame:
+        """검색 결과 중 카탈로그에 없는 장면만 추가
+
+        Returns:
+            새로 추가된 행 (입력 DataFrame의 열 그대로)
+        """
+        if products_df.empty:
+            return products_df
+        new_df = products_df[~products_df['title'].isin(self.scenes['title'])].copy()
+        if not new_df.empty:
+            rows = new_df.reindex(columns=CATALOG_COLUMNS).astype({'path': object, 'track': object, 'direction': object})
+            scenes = self.scenes.astype({'path': object, 'track': object, 'direction': object})
+            self.scenes = normalize_table(pd.concat([scenes, rows], ignore_index=True))
+        return new_df
+
+    def sync_range(self, end_date: str = None) -> Tuple[str, str]:
+        """다음 동기화 검색 기간 (마지막 동기화 - catalog.sync_overlap_days ~ end_date 또는 오늘)"""
+        overlap = self.config.get('catalog', 'sync_overlap_days', default=3)
+        if self.last_sync is None:
+            start_date = self.config.get('sentinel1', 'date_range', 'start')
+        else:
+            start = datetime.fromisoformat(self.last_sync) - timedelta(days=overlap)
+            start_date = start.strftime('%Y-%m-%d')
+        if end_date is None:
+            end_date = datetime.now().strftime('%Y-%m-%d')
+        return start_date, end_date
+
+    def subset(self, titles) -> 'SceneCatalog':
+        """주어진 장면만 담은 카탈로그 사본 (AOI별 스택 구성용, 저장하지 않음)"""
+        view = copy.copy(self)
+        view.scenes = self.scenes[self.scenes['title'].isin(set(titles))].reset_index(drop=True)
+        return view
+
+    def sync(self, retriever, end_date: str = None, max_results: int = 1000) -> pd.DataFrame:
+        """마지막 동기화 이후의 새 장면 검색 및 카탈로그 반영
+
+        ASF 등록 지연을 고려해 catalog.sync_overlap_days만큼 겹쳐서 검색합니다.
+
+        Args:
+            retriever: Sentinel1Retriever
+            end_date: 검색 종료일 (기본값: 오늘)
+            max_results: 최대 검색 결과 수
+
+        Returns:
+            새로 발견된 장면 테이블
+        """
+        start_date, end_date = self.sync_range(end_date)
+        logger.info(f"카탈로그 동기화: {start_date} ~ {end_date} (기존 {len(self)}개 장면)")
+        products_df = retriever.search_products(
+            start_date=start_date,
+            end_date=end_date,
+            max_results=max_results
+        )
+        new_df = self.add(products_df)
+        self.last_sync = datetime.now().isoformat(timespec='seconds')
+        logger.info(f"새 장면 {len(new_df)}개 발견")
+        return new_df
+
+    def stacks(self) -> List[SceneStack]:
+        """카탈로그 장면을 처리 스택(방향, relative orbit, 프레임 구성)으로 분할 (날짜가 많은 순)"""
+        return partition_scenes(self.scenes)
+
+    def stack_scenes(self, direction: str = None, path=None, name: str = None) -> pd.DataFrame:
+        """한 스택(같은 궤도 방향, 같은 relative orbit, 같은 프레임 구성)의 장면만 반환
+
+        Args:
+            direction: 'ASCENDING'/'DESCENDING' (기본값: sentinel1.orbit_direction)
+            path: relative orbit (기본값: 해당 방향에서 날짜가 가장 많은 스택)
+            name: 스택 이름 (기본값: catalog.stack, Config.for_stack으로 파생한 설정이면 그 스택)
+        """
+        if name is None:
+            name = self.config.get('catalog', 'stack')
+        if name is None and direction is None:
+            direction = self.config.get('sentinel1', 'orbit_direction')
+        stack = select_stack(self.stacks(), name=name, direction=direction, relative_orbit=path)
+        if stack is None:
+            return self.scenes.iloc[:0].assign(scene_date=pd.Series(dtype=object))
+        scenes = stack.scenes.copy()
+        scenes['scene_date'] = scenes['date'].map(scene_date)
+        return scenes.sort_values('date').reset_index(drop=True)
+
+    @staticmethod
+    def scenes_by_date(scenes: pd.DataFrame) -> Dict[str, List[str]]:
+        """날짜별 장면 이름 (같은 날 연속 프레임은 topsApp에 함께 입력)"""
+        dates = scenes['date'].map(scene_date)
+        return {d: group['title'].tolist() for d, group in scenes.groupby(dates)}
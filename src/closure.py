@@ -0,0 +1,286 @@
+"""
+Phase Closure QC Module
+간섭쌍 삼각형(triplet)의 위상 폐합으로 언래핑 오류 검사
+
+세 날짜 i < j < k의 간섭도 ij, jk, ik가 모두 있으면
+
+    closure = φ_ij + φ_jk − φ_ik
+
+는 잡음을 빼면 2π의 정수배여야 합니다. 정수 n = round(closure / 2π)가 0이 아니면
+셋 중 하나 이상에 언래핑 오류가 있는 것이고, closure − 2πn은 잔여 폐합 오차입니다.
+triplet 폐합 행렬 C (K x N)로 블록마다 C @ phase를 한 번에 계산하고, triplet별/픽셀별
+통계를 스택의 /qc 그룹에 누적하므로 새 간섭도가 들어오면 새 triplet만 계산합니다.
+간섭도별 통계는 triplet 통계에서 바로 계산하므로 제외 판정에 스택을 다시 읽지 않습니다.
+
+    /qc/triplets                 (K, 3)  간섭도 인덱스 (ij, jk, ik)
+    /qc/triplet_errors           (K,)    정수 모호성 ≠ 0인 픽셀 수
+    /qc/triplet_valid            (K,)    세 간섭도가 모두 유효한 픽셀 수
+    /qc/triplet_abs_misclosure   (K,)    잔여 폐합 오차 절댓값 합 (rad)
+    /qc/flagged                  (N,)    제외 대상 여부
+    /qc/pixel_triplets       (L, W)  픽셀별 유효 triplet 수
+    /qc/pixel_errors         (L, W)  픽셀별 정수 모호성 ≠ 0인 triplet 수
+    /qc/pixel_abs_misclosure (L, W)  픽셀별 잔여 폐합 오차 절댓값 합 (rad)
+"""
+
+from typing import List, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from .config import get_config
+from .masking import ValidityMask
+from .stack import StackStore
+
+logger = logging.getLogger(__name__)
+
+TRIPLET_STATS = ('triplet_errors', 'triplet_valid', 'triplet_abs_misclosure')
+PIXEL_STATS = {
+    'pixel_triplets': 'uint32',
+    'pixel_errors': 'uint32',
+    'pixel_abs_misclosure': 'float32',
+}
+
+
+def find_triplets(pairs: Sequence[Tuple[str, str]]) -> np.ndarray:
+    """간섭쌍 네트워크의 닫힌 삼각형
+
+    Returns:
+        (K, 3) 간섭도 인덱스 (ij, jk, ik), i < j < k 날짜 순
+    """
+    index = {tuple(p): n for n, p in enumerate(pairs)}
+    by_reference = {}
+    for reference, secondary in index:
+        by_reference.setdefault(reference, []).append(secondary)
+
+    triplets = []
+    for (i, j), ij in index.items():
+        for k in by_reference.get(j, []):
+            ik = index.get((i, k))
+            if ik is not None:
+                triplets.append((ij, index[(j, k)], ik))
+    return np.array(sorted(triplets), dtype=np.int64).reshape(-1, 3)
+
+
+def closure_matrix(triplets: np.ndarray, n_ifgs: int) -> np.ndarray:
+    """triplet → 폐합 행렬 C (K x N), 행마다 ij, jk에 +1, ik에 −1"""
+    C = np.zeros((len(triplets), n_ifgs), dtype=np.float32)
+    rows = np.arange(len(triplets))
+    C[rows, triplets[:, 0]] = 1.0
+    C[rows, triplets[:, 1]] = 1.0
+    C[rows, triplets[:, 2]] = -1.0
+    return C
+
+
+class ClosureQC:
+    """위상 폐합 기반 간섭도 품질 검사
+
+    Example:
+        with StackStore.open(mode='r+') as store:
+            flagged = ClosureQC(store).run()
+    """
+
+    def __init__(self, store: StackStore, block_size: int = None):
+        """
+        Args:
+            store: 쓰기 가능한 StackStore
+            block_size: 블록 처리 단위 (기본값: stack.block_size)
+        """
+        config = get_config()
+        self.store = store
+        self.block_size = block_size
+        self.mask = ValidityMask.for_store(store)
+        self.max_error_rate = config.get('qc', 'max_error_rate', default=0.1)
+        self.triplet_batch = config.get('qc', 'triplet_batch', default=256)
+
+        if 'qc' not in store.h5:
+            group = store.h5.create_group('qc')
+            group.create_dataset('triplets', shape=(0, 3), maxshape=(None, 3), dtype='int64')
+            for name in TRIPLET_STATS:
+                group.create_dataset(name, shape=(0,), maxshape=(None,), dtype='float64')
+            group.create_dataset('flagged', shape=(0,), maxshape=(None,), dtype='bool')
+            chunks = store.h5['interferograms/unwrapped_phase'].chunks[1:]
+            for name, dtype in PIXEL_STATS.items():
+                group.create_dataset(name, shape=store.shape, chunks=chunks, dtype=dtype, fillvalue=0)
+        self.group = store.h5['qc']
+        self._upgrade_pixel_stats()
+
+    def _upgrade_pixel_stats(self):
+        """이전 스택의 uint16 픽셀 카운터를 uint32로 변환 (triplet 65535개를 넘으면 넘침)"""
+        for name, dtype in PIXEL_STATS.items():
+            old = self.group[name]
+            previous = old.dtype
+            if previous == np.dtype(dtype):
+                continue
+            new = self.group.create_dataset(
+                f'{name}_upgrade', shape=old.shape, chunks=old.chunks, dtype=dtype, fillvalue=0
+            )
+            for window in self.store.iter_windows(self.block_size):
+                new[window[0], window[1]] = old[window[0], window[1]].astype(dtype)
+            del self.group[name]
+            self.group.move(f'{name}_upgrade', name)
+            logger.info(f"/qc/{name} 자료형 변환: {previous} → {dtype}")
+
+    # ------------------------------------------------------------------
+    # 통계
+    # ------------------------------------------------------------------
+    @property
+    def triplets(self) -> np.ndarray:
+        return self.group['triplets'][:]
+
+    @property
+    def flagged(self) -> np.ndarray:
+        """간섭도별 제외 여부"""
+        flagged = np.zeros(len(self.store.pairs), dtype=bool)
+        flagged[:self.group['flagged'].shape[0]] = self.group['flagged'][:]
+        return flagged
+
+    def _ifg_sums(self, exclude: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """triplet 통계를 간섭도별로 합산 (exclude 간섭도를 포함한 triplet은 뺌)"""
+        triplets = self.triplets
+        active = np.ones(len(triplets), dtype=bool)
+        if exclude is not None and len(triplets):
+            active = ~exclude[triplets].any(axis=1)
+        # 간섭도별 합 = 그 간섭도를 포함한 triplet 통계의 합 (K x N 폐합 행렬 없이 bincount)
+        members = triplets[active].ravel()
+        n_ifgs = len(self.store.pairs)
+        return tuple(
+            np.bincount(members, weights=np.repeat(self.group[name][:][active], 3), minlength=n_ifgs)
+            for name in TRIPLET_STATS
+        )
+
+    def ifg_statistics(self, exclude: np.ndarray = None) -> Tuple[np.ndarray, np.ndarray]:
+        """간섭도별 언래핑 오류 비율과 평균 잔여 폐합 오차 (triplet이 없으면 NaN)
+
+        Args:
+            exclude: 제외할 간섭도 (bool, 이 간섭도를 포함한 triplet은 계산에서 뺌)
+
+        Returns:
+            (error_rate, mean_misclosure [rad])
+        """
+        errors, valid, misclosure = self._ifg_sums(exclude)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            error_rate = np.where(valid > 0, errors / valid, np.nan)
+            mean_misclosure = np.where(valid > 0, misclosure / valid, np.nan)
+        return error_rate, mean_misclosure
+
+    def pixel_statistics(self, window) -> Tuple[np.ndarray, np.ndarray]:
+        """픽셀별 정수 모호성 ≠ 0 triplet 비율과 평균 잔여 폐합 오차 (rad)"""
+        n = self.group['pixel_triplets'][window[0], window[1]].astype(np.float32)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            error_fraction = np.where(n > 0, self.group['pixel_errors'][window[0], window[1]] / n, np.nan)
+            misclosure = np.where(n > 0, self.group['pixel_abs_misclosure'][window[0], window[1]] / n, np.nan)
+        return error_fraction, misclosure
+
+    def update_flags(self) -> List[int]:
+        """오류가 가장 많은 간섭도부터 하나씩 제외하며 남은 triplet으로 다시 평가
+
+        나쁜 간섭도 하나가 같은 triplet의 정상 간섭도 비율까지 올리므로, 오류 비율이
+        임계값을 넘는 간섭도 중 오류 픽셀이 가장 많은(가장 많은 triplet에 걸친) 것을
+        빼고 그 triplet을 제외한 뒤 다시 계산합니다.
+
+        Returns:
+            새로 제외된 간섭도 인덱스
+        """
+        before = self.flagged
+        flagged = before.copy()
+        while True:
+            errors, valid, _ = self._ifg_sums(exclude=flagged)
+            over = (valid > 0) & (errors > self.max_error_rate * valid) & ~flagged
+            if not over.any():
+                break
+            flagged[np.argmax(np.where(over, errors, -1.0))] = True
+
+        self.group['flagged'].resize(len(flagged), axis=0)
+        self.group['flagged'][:] = flagged
+        return np.flatnonzero(flagged & ~before).tolist()
+
+    # ------------------------------------------------------------------
+    # 실행
+    # ------------------------------------------------------------------
+    def new_triplets(self, indices: Sequence[int] = None) -> np.ndarray:
+        """아직 계산하지 않은 triplet (indices가 있으면 그 간섭도를 포함하는 것만)"""
+        triplets = find_triplets(self.store.pairs)
+        done = {tuple(t) for t in self.triplets.tolist()}
+        keep = np.array([tuple(t) not in done for t in triplets.tolist()], dtype=bool)
+        if indices is not None:
+            keep &= np.isin(triplets, np.asarray(list(indices))).any(axis=1)
+        return triplets[keep] if len(triplets) else triplets
+
+    def run(self, indices: Sequence[int] = None) -> List[int]:
+        """새 triplet의 폐합 통계를 블록 단위로 누적하고 오류 비율이 큰 간섭도 표시
+
+        triplet에 필요한 간섭도만 블록마다 한 번씩 읽습니다.
+
+        Args:
+            indices: 검사할 간섭도 (기본값: 전체 네트워크의 새 triplet)
+
+        Returns:
+            새로 제외 대상이 된 간섭도 인덱스
+        """
+        triplets = self.new_triplets(indices)
+        if len(triplets) == 0:
+            logger.info("새로 계산할 폐합 triplet이 없습니다")
+            return []
+
+        # 필요한 간섭도만 모아 로컬 인덱스로 폐합 행렬 구성
+        needed = np.unique(triplets)
+        local = np.searchsorted(needed, triplets)
+        C = closure_matrix(local, len(needed))
+        C_abs = np.abs(C)
+
+        triplet_errors = np.zeros(len(triplets))
+        triplet_valid = np.zeros(len(triplets))
+        triplet_misclosure = np.zeros(len(triplets))
+        two_pi = np.float32(2 * np.pi)
+
+        for window in self.store.iter_windows(self.block_size, mask=self.mask):
+            phase = self.store.read_stack('interferograms/unwrapped_phase', window, index=needed)
+            block_shape = phase.shape[1:]
+            phase = phase.reshape(len(needed), -1)
+            missing = np.isnan(phase).astype(np.float32)
+            phase = np.nan_to_num(phase)
+
+            pixel_triplets = np.zeros(phase.shape[1], dtype=np.int64)
+            pixel_errors = np.zeros(phase.shape[1], dtype=np.int64)
+            pixel_misclosure = np.zeros(phase.shape[1], dtype=np.float64)
+            for start in range(0, len(C), self.triplet_batch):
+                batch = slice(start, start + self.triplet_batch)
+                closure = C[batch] @ phase
+                valid = (C_abs[batch] @ missing) == 0
+                ambiguity = np.rint(closure / two_pi)
+                errors = valid & (ambiguity != 0)
+                residual = np.where(valid, np.abs(closure - two_pi * ambiguity), 0.0)
+
+                pixel_triplets += valid.sum(axis=0)
+                pixel_errors += errors.sum(axis=0)
+                pixel_misclosure += residual.sum(axis=0)
+                triplet_errors[batch] += errors.sum(axis=1)
+                triplet_valid[batch] += valid.sum(axis=1)
+                triplet_misclosure[batch] += residual.sum(axis=1)
+
+            for name, values in (
+                ('pixel_triplets', pixel_triplets),
+                ('pixel_errors', pixel_errors),
+                ('pixel_abs_misclosure', pixel_misclosure),
+            ):
+                dataset = self.group[name]
+                current = dataset[window[0], window[1]]
+                dataset[window[0], window[1]] = (current + values.reshape(block_shape)).astype(dataset.dtype)
+
+        n_done = self.group['triplets'].shape[0]
+        for name, values in (
+            ('triplets', triplets),
+            ('triplet_errors', triplet_errors),
+            ('triplet_valid', triplet_valid),
+            ('triplet_abs_misclosure', triplet_misclosure),
+        ):
+            self.group[name].resize(n_done + len(triplets), axis=0)
+            self.group[name][n_done:] = values
+
+        newly = self.update_flags()
+        error_rate, _ = self.ifg_statistics()
+        pairs = self.store.pairs
+        for i in newly:
+            logger.warning(f"언래핑 오류 의심 간섭도 제외: {'_'.join(pairs[i])} (오류 비율 {error_rate[i]:.1%})")
+        logger.info(f"위상 폐합 검사: triplet {len(triplets)}개, 간섭도 {len(needed)}개, 제외 {len(newly)}개")
+        return newly
@@ -3,10 +3,17 @@ Configuration Management Module
 설정 파일 로드 및 환경 변수 관리
 """
 
-import os
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Dict, List
+import copy
+import os
+import re
+
 import yaml
-from typing import Dict, Any
+
+# AOI별 설정에서도 작업 공간 전체가 공유하는 섹션 (경로를 AOI 디렉토리로 옮기지 않음)
+SHARED_SECTIONS = ('paths', 'catalog', 'raw_store', 'burst_subset', 'executor', 'workspace')
 
 
 class Config:
@@ -90,6 +97,91 @@ class Config:
         """
         return self.credentials.get(service, {})
 
+    def aoi_names(self) -> List[str]:
+        """작업 공간(workspace.aois)에 정의된 AOI 이름"""
+        return list(self.get('workspace', 'aois', default={}) or {})
+
+    def derive(self, aoi: Dict[str, Any] = None, processed_dir: str = None, output_dir: str = None) -> 'Config':
+        """aoi 블록과 처리/출력 디렉토리를 바꾼 설정 사본
+
+        공유 섹션(SHARED_SECTIONS) 밖에서 기존 처리/출력 디렉토리 아래를 가리키는 경로
+        (stack.store_path 등)도 새 디렉토리 아래로 옮깁니다.
+
+        Args:
+            aoi: 새 aoi 블록 (기본값: 그대로)
+            processed_dir: 새 paths.processed_dir (기본값: 그대로)
+            output_dir: 새 paths.output_dir (기본값: 그대로)
+        """
+        data = copy.deepcopy(self.config)
+        if aoi is not None:
+            data['aoi'] = dict(aoi)
+        moves = []
+        for key, new in (('processed_dir', processed_dir), ('output_dir', output_dir)):
+            if new is not None:
+                moves.append((os.path.normpath(data['paths'][key]), os.path.normpath(new)))
+                data['paths'][key] = new
+
+        def move(value):
+            if isinstance(value, dict):
+                return {k: move(v) for k, v in value.items()}
+            if isinstance(value, list):
+                return [move(v) for v in value]
+            if isinstance(value, str) and value.startswith('.'):
+                normalized = os.path.normpath(value)
+                for old, new in moves:
+                    if normalized == old or normalized.startswith(old + os.sep):
+                        rest = os.path.relpath(normalized, old)
+                        return './' + (new if rest == '.' else os.path.join(new, rest))
+            return value
+
+        for section, value in data.items():
+            if section not in SHARED_SECTIONS:
+                data[section] = move(value)
+
+        derived = copy.copy(self)
+        derived.config = data
+        derived._setup_directories()
+        return derived
+
+    def for_aoi(self, name: str) -> 'Config':
+        """작업 공간 AOI 하나의 설정 (스택/출력은 AOI별, 카탈로그/원시 데이터는 공유)
+
+        처리 디렉토리는 <processed_dir>/aois/<name>, 출력은 <output_dir>/<name>입니다.
+        AOI 항목의 reference_point({lon, lat})는 그 AOI의 sbas.reference_point가 됩니다.
+        """
+        aois = self.get('workspace', 'aois', default={}) or {}
+        if name not in aois:
+            raise KeyError(f"workspace.aois에 없는 AOI입니다: {name} (가능: {', '.join(aois)})")
+        if not re.fullmatch(r'[A-Za-z0-9_-]+', name):
+            raise ValueError(f"AOI 이름은 영문/숫자/_/-만 사용할 수 있습니다: {name}")
+        bbox = dict(aois[name])
+        reference_point = bbox.pop('reference_point', None)
+        aoi = {'name': name, 'epsg': self.get('aoi', 'epsg', default=4326), **bbox}
+        derived = self.derive(
+            aoi,
+            processed_dir=os.path.join(self.config['paths']['processed_dir'], 'aois', name),
+            output_dir=os.path.join(self.config['paths']['output_dir'], name),
+        )
+        if reference_point is not None:
+            # AOI별 기준점 (없으면 sbas.reference_point, 스택 영역 밖이면 자동 선정)
+            derived.config.setdefault('sbas', {})['reference_point'] = reference_point
+        return derived
+
+    def for_stack(self, name: str) -> 'Config':
+        """처리 스택 하나의 설정 (catalog.stack으로 스택을 고정, 스택/출력은 스택별)
+
+        처리 디렉토리는 <processed_dir>/stacks/<name>, 출력은 <output_dir>/<name>입니다.
+        작업 공간 AOI 설정에서 파생하면 AOI 디렉토리 아래에 스택별 디렉토리가 생깁니다.
+        """
+        if not re.fullmatch(r'[A-Za-z0-9_-]+', name):
+            raise ValueError(f"스택 이름은 영문/숫자/_/-만 사용할 수 있습니다: {name}")
+        derived = self.derive(
+            processed_dir=os.path.join(self.config['paths']['processed_dir'], 'stacks', name),
+            output_dir=os.path.join(self.config['paths']['output_dir'], name),
+        )
+        derived.config.setdefault('catalog', {})['stack'] = name
+        return derived
+
 
 # Global config instance
 _config = None
@@ -100,3 +192,15 @@ def get_config(config_path: str = None) -> Config:
     if _config is None:
         _config = Config(config_path)
     return _config
+
+
+@contextmanager
+def use_config(config: Config):
+    """블록 안에서 get_config()가 주어진 설정을 돌려주도록 전역 인스턴스 교체 (AOI별 단계 실행용)"""
+    global _config
+    previous = _config
+    _config = config
+    try:
+        yield config
+    finally:
+        _config = previous
@@ -0,0 +1,544 @@
+"""
+Pipeline DAG Module
+내용 해시 기반 make 방식 파이프라인 실행기
+
+각 노드의 키는
+
+    sha256(노드 이름, 관련 설정 하위 트리, 입력 파일 내용 해시, 상위 노드 키)
+
+이고, 상태 파일에 기록된 키와 다르거나 출력 파일이 없을 때만 다시 실행합니다.
+입력 파일 해시는 (크기, mtime, inode)로 메모해 둡니다. 원시 SLC(SAFE zip)는 처리 후
+예산 관리로 삭제되거나 .zip/.SAFE 형식이 바뀔 수 있으므로 내용 대신 장면 이름으로 키를 만들고,
+입력이 없어도 출력이 남아 있으면 다시 실행하지 않습니다. 상위 노드의 키가 하위 키에 들어가므로 설정 하나를 바꾸면
+그 노드와 하위 노드만 다시 계산되고, 서로 의존하지 않는 노드(간섭쌍별 topsApp)는 병렬로 실행됩니다.
+
+파이프라인:
+    pairs → topsapp:<간섭쌍> (병렬) → stack (적재 + 대류권 보정 + 기준점) → mask → timeseries (폐합 검사 + SBAS)
+    timeseries → velocity (속도 래스터), model (변형 모델 적합), uncertainty (부트스트랩 속도 표준편차)
+    timeseries + uncertainty → geotiff (output.format이 GeoTIFF면 Cloud-Optimized GeoTIFF 내보내기)
+"""
+
+import argparse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+import hashlib
+import json
+import logging
+import shutil
+import threading
+
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from .catalog import SceneCatalog
+from .config import Config, get_config, use_config
+
+console = Console()
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Node:
+    """DAG 노드 (출력 = action(입력, 설정))"""
+    name: str
+    action: Callable[[], None]
+    deps: List[str] = field(default_factory=list)
+    inputs: List[Path] = field(default_factory=list)            # 외부 입력 파일/디렉토리
+    sources: List[Path] = field(default_factory=list)           # 재실행에 필요하지만 키에 넣지 않는 입력 (삭제될 수 있는 원시 SLC)
+    config_keys: List[Tuple[str, ...]] = field(default_factory=list)
+    params: Dict[str, Any] = field(default_factory=dict)        # 키에 포함할 추가 값 (JSON 직렬화 가능)
+    outputs: List[Path] = field(default_factory=list)
+
+
+class FileHasher:
+    """파일 내용 해시 (stat이 같으면 이전 해시 재사용)"""
+
+    def __init__(self, memo: Dict[str, list] = None, chunk_mb: int = 4):
+        self.memo = memo if memo is not None else {}
+        self.chunk = chunk_mb * 1024 ** 2
+        self._lock = threading.Lock()
+
+    def _file(self, path: Path) -> str:
+        stat = path.stat()
+        fingerprint = [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+        key = str(path.resolve())
+        with self._lock:
+            cached = self.memo.get(key)
+        if cached is not None and cached[:3] == fingerprint:
+            return cached[3]
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(self.chunk)
+                if not block:
+                    break
+                digest.update(block)
+        value = digest.hexdigest()
+        with self._lock:
+            self.memo[key] = fingerprint + [value]
+        return value
+
+    def hash(self, path: Path) -> str:
+        """파일 또는 디렉토리(하위 파일 상대 경로 + 내용) 해시, 없으면 'missing'"""
+        path = Path(path)
+        if not path.exists():
+            return 'missing'
+        if path.is_file():
+            return self._file(path)
+        digest = hashlib.sha256()
+        for child in sorted(p for p in path.rglob('*') if p.is_file()):
+            digest.update(str(child.relative_to(path)).encode())
+            digest.update(self._file(child).encode())
+        return digest.hexdigest()
+
+
+class DagRunner:
+    """내용 해시 기반 증분 DAG 실행기
+
+    Example:
+        runner = DagRunner(build_pipeline())
+        runner.run(dry_run=True)   # 다시 만들 노드만 출력
+        runner.run()
+    """
+
+    def __init__(self, nodes: Sequence[Node], state_path: str = None, workers: int = None, config: Config = None):
+        """
+        Args:
+            nodes: DAG 노드 (의존 노드는 같은 목록에 있어야 함)
+            state_path: 상태 파일 (기본값: dag.state_path)
+            workers: 동시 실행 노드 수 (기본값: dag.workers)
+            config: 키 계산에 쓸 설정 (기본값: 전역 설정)
+        """
+        self.config = config or get_config()
+        self.nodes = {node.name: node for node in nodes}
+        for node in nodes:
+            missing = [d for d in node.deps if d not in self.nodes]
+            if missing:
+                raise ValueError(f"{node.name}: 알 수 없는 의존 노드 {missing}")
+        if state_path is None:
+            state_path = self.config.project_root / self.config.get(
+                'dag', 'state_path', default='./data/processed/dag_state.json'
+            )
+        self.state_path = Path(state_path)
+        self.workers = workers or self.config.get('dag', 'workers', default=2)
+        self._lock = threading.Lock()
+        self.state = {'nodes': {}, 'files': {}}
+        if self.state_path.exists():
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                self.state.update(json.load(f))
+        self.hasher = FileHasher(self.state['files'])
+
+    def save(self):
+        """상태 파일 저장 (원자적 교체)"""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix('.tmp')
+        with self._lock:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(self.state, f, indent=2, ensure_ascii=False)
+        tmp.replace(self.state_path)
+
+    def order(self) -> List[str]:
+        """위상 정렬 (순환이 있으면 ValueError)"""
+        order, visiting, done = [], set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise ValueError(f"DAG에 순환이 있습니다: {name}")
+            visiting.add(name)
+            for dep in self.nodes[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+
+        for name in self.nodes:
+            visit(name)
+        return order
+
+    def _key(self, node: Node, dep_keys: Dict[str, str]) -> str:
+        payload = {
+            'name': node.name,
+            'config': {'.'.join(k): self.config.get(*k) for k in node.config_keys},
+            'params': node.params,
+            'inputs': {str(p): self.hasher.hash(p) for p in node.inputs},
+            'deps': {d: dep_keys[d] for d in sorted(node.deps)},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+    def plan(self, targets: Sequence[str] = None) -> Dict[str, Tuple[str, str]]:
+        """노드별 (키, 사유) - 사유가 'up to date'가 아니면 다시 실행 대상
+
+        Args:
+            targets: 이 노드들과 그 상위 노드만 (기본값: 전체)
+        """
+        order = self.order()
+        if targets:
+            needed = set()
+            stack = list(targets)
+            while stack:
+                name = stack.pop()
+                if name not in needed:
+                    needed.add(name)
+                    stack.extend(self.nodes[name].deps)
+            order = [n for n in order if n in needed]
+
+        keys, plan = {}, {}
+        for name in order:
+            node = self.nodes[name]
+            keys[name] = self._key(node, keys)
+            stored = self.state['nodes'].get(name)
+            if stored is None:
+                reason = 'new'
+            elif stored.get('key') != keys[name]:
+                reason = 'inputs/config changed'
+            elif any(not Path(p).exists() for p in node.outputs):
+                reason = 'output missing'
+            else:
+                reason = 'up to date'
+            if reason != 'up to date' and node.outputs and all(Path(p).exists() for p in node.outputs) \
+                    and any(not Path(p).exists() for p in node.sources):
+                # 입력이 예산 관리로 삭제된 뒤에는 다시 만들 수 없으므로 기존 출력 유지
+                logger.warning(f"[{name}] 입력이 없어 기존 출력을 유지합니다 ({reason})")
+                reason = 'up to date'
+            plan[name] = (keys[name], reason)
+        return plan
+
+    def run(self, targets: Sequence[str] = None, dry_run: bool = False) -> Dict[str, str]:
+        """다시 실행할 노드만 의존 순서대로 실행 (독립 노드는 병렬)
+
+        실패한 노드의 하위 노드는 건너뜁니다.
+
+        Returns:
+            {노드: 'up to date' | 'built' | 'failed' | 'skipped' | (dry_run) 사유}
+        """
+        plan = self.plan(targets)
+        if dry_run:
+            return {name: reason for name, (_, reason) in plan.items()}
+
+        status = {name: 'up to date' for name, (_, reason) in plan.items() if reason == 'up to date'}
+        pending = [name for name in plan if name not in status]
+        self.save()  # 입력 해시 메모 저장
+        logger.info(f"DAG 실행: 노드 {len(plan)}개 중 {len(pending)}개 다시 실행")
+
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while pending or running:
+                for name in list(pending):
+                    deps = self.nodes[name].deps
+                    if any(status.get(d) in ('failed', 'skipped') for d in deps):
+                        status[name] = 'skipped'
+                        pending.remove(name)
+                    elif all(status.get(d) in ('up to date', 'built') for d in deps):
+                        pending.remove(name)
+                        logger.info(f"[{name}] 실행 ({plan[name][1]})")
+                        running[pool.submit(self.nodes[name].action)] = name
+                if not running:
+                    break
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.error(f"[{name}] 실패: {e}")
+                        status[name] = 'failed'
+                        continue
+                    status[name] = 'built'
+                    with self._lock:
+                        self.state['nodes'][name] = {
+                            'key': plan[name][0],
+                            'outputs': [str(p) for p in self.nodes[name].outputs],
+                            'finished': datetime.now().isoformat(timespec='seconds'),
+                        }
+                    self.save()
+        return status
+
+
+# ----------------------------------------------------------------------
+# InSAR 파이프라인
+# ----------------------------------------------------------------------
+def plan_stack_pairs(catalog: SceneCatalog = None, config: Config = None) -> list:
+    """카탈로그의 스택 장면 전체로 간섭쌍 목록 생성"""
+    from .incremental import plan_new_pairs, safe_path
+    from .insar_processing import PairSpec
+
+    config = config or get_config()
+    catalog = catalog or SceneCatalog()
+    scenes = catalog.stack_scenes(name=config.get('catalog', 'stack'))
+    if scenes.empty:
+        return []
+    by_date = SceneCatalog.scenes_by_date(scenes)
+    raw_dir = config.get_path('raw_data_dir')
+    pairs = plan_new_pairs(
+        [], by_date,
+        max_days=config.get('insar', 'temporal_baseline', 'max_days', default=60),
+        min_days=config.get('insar', 'temporal_baseline', 'min_days', default=0),
+    )
+    return [
+        PairSpec(
+            reference=reference,
+            secondary=secondary,
+            reference_safes=[str(safe_path(raw_dir, t, config)) for t in by_date[reference]],
+            secondary_safes=[str(safe_path(raw_dir, t, config)) for t in by_date[secondary]],
+        )
+        for reference, secondary in pairs
+    ]
+
+
+def _scene_titles(paths) -> List[str]:
+    """입력 경로 → 장면 이름 (.zip/.SAFE 어느 쪽이든 같은 이름)"""
+    from .raw_store import scene_name
+
+    return [scene_name(p) or Path(p).stem for p in paths]
+
+
+def _pair_params(pair) -> Dict[str, Any]:
+    """간섭쌍 노드 키 (삭제·형식 변경될 수 있는 파일 대신 바뀌지 않는 장면 이름)"""
+    return {
+        'reference': pair.reference,
+        'secondary': pair.secondary,
+        'reference_scenes': _scene_titles(pair.reference_safes),
+        'secondary_scenes': _scene_titles(pair.secondary_safes),
+    }
+
+
+def _run_pair(pair):
+    """설정이 바뀐 간섭쌍은 이전 결과를 지우고 topsApp 재실행 (입력이 모두 있을 때만 삭제)"""
+    from .insar_processing import pair_work_dir, run_topsapp
+
+    missing = [p for p in pair.reference_safes + pair.secondary_safes if not Path(p).exists()]
+    if missing:
+        raise FileNotFoundError(
+            f"{pair.name}: 입력 장면이 없습니다 ({', '.join(_scene_titles(missing))}) - "
+            "python -m src.incremental 등으로 다시 받은 뒤 실행하세요"
+        )
+    work_dir = pair_work_dir(pair)
+    if work_dir.exists():
+        shutil.rmtree(work_dir)
+    run_topsapp(pair)
+
+
+def _build_stack(pairs, store_path: Path):
+    """간섭쌍 결과를 새 스택에 적재하고 위상을 바꾸는 보정(대류권, 기준점)까지 적용"""
+    from .atmosphere import TroposphericCorrection
+    from .insar_processing import ingest_interferogram, ingest_los_geometry, pair_products, pair_work_dir
+    from .raster_io import IsceRaster
+    from .referencing import ReferencePointNormalizer
+    from .stack import StackStore
+
+    if not pairs:
+        raise ValueError("스택에 적재할 간섭쌍이 없습니다 (카탈로그 동기화 필요)")
+    config = get_config()
+    first = IsceRaster(pair_products(pair_work_dir(pairs[0]))['unwrapped_phase'])
+    with StackStore.create(first.length, first.width, store_path, first.geotransform) as store:
+        for pair in pairs:
+            ingest_interferogram(store, pair, pair_work_dir(pair))
+            ingest_los_geometry(store, pair_work_dir(pair))
+        if config.get('atmosphere', 'enabled', default=False):
+            TroposphericCorrection(store).apply()
+        ReferencePointNormalizer(store).apply()
+
+
+def _build_mask(store_path: Path):
+    from .masking import ValidityMask
+    from .stack import StackStore
+
+    with StackStore.open(store_path, 'r+') as store:
+        ValidityMask.build(store)
+
+
+def _build_timeseries(store_path: Path):
+    """폐합 검사와 SBAS 역산을 처음부터 다시 수행 (이전 /qc, /sbas, 시계열 삭제)"""
+    from .closure import ClosureQC
+    from .stack import StackStore
+    from .time_series import IncrementalSBAS
+
+    with StackStore.open(store_path, 'r+') as store:
+        if 'qc' in store.h5:
+            del store.h5['qc']
+        timeseries = store.h5['timeseries']
+        for name in ('displacement', 'velocity'):
+            if name in timeseries:
+                del timeseries[name]
+        timeseries['dates'].resize(0, axis=0)
+
+        ClosureQC(store).run()
+        sbas = IncrementalSBAS(store)
+        sbas.reset()
+        sbas.accumulate()
+        sbas.solve()
+
+
+def _export_velocity(store_path: Path, output_path: Path):
+    """SBAS 속도(mm/yr)를 ISCE 래스터로 내보내기"""
+    from .raster_io import IsceRaster
+    from .stack import StackStore
+
+    with StackStore.open(store_path) as store:
+        raster = IsceRaster.create(output_path, store.width, store.length, geotransform=store.geotransform)
+        velocity = store.h5['timeseries/velocity']
+        for window in store.iter_windows():
+            raster.write_window(window, np.asarray(velocity[window[0], window[1]]))
+        raster.flush()
+
+
+def _fit_model(store_path: Path, output_dir: Path):
+    from .deformation import DeformationModelFit
+    from .stack import StackStore
+
+    with StackStore.open(store_path) as store:
+        DeformationModelFit(store).run(output_dir)
+
+
+def _bootstrap_uncertainty(store_path: Path, output: Path):
+    from .stack import StackStore
+    from .uncertainty import BootstrapUncertainty
+
+    with StackStore.open(store_path) as store:
+        BootstrapUncertainty(store).run(output)
+
+
+def _export_geotiff(store_path: Path, output_dir: Path):
+    from .geotiff import CogExporter
+    from .stack import StackStore
+
+    with StackStore.open(store_path) as store:
+        CogExporter(store, output_dir).run()
+
+
+def build_pipeline(config: Config = None, pairs: list = None) -> List[Node]:
+    """pairs → topsapp:* → stack → mask → timeseries → velocity/model/uncertainty(→ geotiff) 노드 구성
+
+    Args:
+        config: 설정 (기본값: 전역 설정)
+        pairs: 간섭쌍 목록 (기본값: 카탈로그로 생성)
+    """
+    from .insar_processing import pair_products, pair_work_dir
+    from .stack import StackStore
+
+    config = config or get_config()
+    if pairs is None:
+        pairs = plan_stack_pairs(config=config)
+    pairs = sorted(pairs, key=lambda p: p.name)
+    processed_dir = config.get_path('processed_dir')
+    store_path = StackStore.default_path()
+    pairs_path = processed_dir / 'pairs.json'
+    velocity_path = config.get_path('output_dir') / 'velocity.geo'
+    std_path = config.project_root / config.get('uncertainty', 'output', default='./outputs/velocity_std.geo')
+    model_dir = config.project_root / config.get('model', 'output_dir', default='./outputs/model')
+    geotiff_dir = config.project_root / config.get('output', 'geotiff', 'output_dir', default='./outputs/geotiff')
+
+    def write_pairs():
+        pairs_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(pairs_path, 'w', encoding='utf-8') as f:
+            json.dump([p.__dict__ for p in pairs], f, indent=2, ensure_ascii=False)
+
+    nodes = [Node(
+        name='pairs',
+        action=write_pairs,
+        config_keys=[('insar', 'temporal_baseline')],
+        params={'pairs': [_pair_params(p) for p in pairs]},
+        outputs=[pairs_path],
+    )]
+    topsapp_config = [('insar', 'multilook'), ('insar', 'filter'), ('aoi',)]
+    for pair in pairs:
+        products = pair_products(pair_work_dir(pair))
+        nodes.append(Node(
+            name=f"topsapp:{pair.name}",
+            action=lambda pair=pair: _run_pair(pair),
+            deps=['pairs'],
+            sources=[Path(p) for p in pair.reference_safes + pair.secondary_safes],
+            config_keys=topsapp_config,
+            params=_pair_params(pair),
+            outputs=[products['unwrapped_phase'], products['coherence']],
+        ))
+    nodes += [
+        Node(
+            name='stack',
+            action=lambda: _build_stack(pairs, store_path),
+            deps=[f"topsapp:{p.name}" for p in pairs],
+            config_keys=[('stack', 'chunk_shape'), ('atmosphere',), ('sbas', 'reference_point'), ('sbas', 'reference_radius')],
+            outputs=[store_path],
+        ),
+        Node(
+            name='mask',
+            action=lambda: _build_mask(store_path),
+            deps=['stack'],
+            inputs=[config.project_root / config.get('mask', 'land_polygon')] if config.get('mask', 'land_polygon') else [],
+            config_keys=[('mask',)],
+            outputs=[store_path],
+        ),
+        Node(
+            name='timeseries',
+            action=lambda: _build_timeseries(store_path),
+            deps=['mask'],
+            config_keys=[('qc',), ('sbas', 'wavelength')],
+            outputs=[store_path],
+        ),
+        Node(
+            name='velocity',
+            action=lambda: _export_velocity(store_path, velocity_path),
+            deps=['timeseries'],
+            outputs=[velocity_path],
+        ),
+        Node(
+            name='model',
+            action=lambda: _fit_model(store_path, model_dir),
+            deps=['timeseries'],
+            config_keys=[('model',)],
+            outputs=[model_dir / 'model.json'],
+        ),
+        Node(
+            name='uncertainty',
+            action=lambda: _bootstrap_uncertainty(store_path, std_path),
+            deps=['timeseries'],
+            config_keys=[('uncertainty',), ('sbas', 'wavelength')],
+            outputs=[std_path],
+        ),
+    ]
+    if config.get('output', 'format') == 'GeoTIFF':
+        nodes.append(Node(
+            name='geotiff',
+            action=lambda: _export_geotiff(store_path, geotiff_dir),
+            deps=['timeseries', 'uncertainty'],
+            config_keys=[('output', 'geotiff')],
+            outputs=[geotiff_dir / f"{name}.tif" for name in ('velocity', 'displacement', 'coherence', 'velocity_std')],
+        ))
+    return nodes
+
+
+def main():
+    """메인 실행 함수"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="내용 해시 기반 증분 파이프라인 실행")
+    parser.add_argument('targets', nargs='*', help='실행할 노드 (기본값: 전체, 예: timeseries)')
+    parser.add_argument('--dry-run', action='store_true', help='다시 실행할 노드만 출력')
+    parser.add_argument('--workers', type=int, default=None, help='동시 실행 노드 수 (기본값: dag.workers)')
+    parser.add_argument('--stack', default=None, help='처리할 스택 이름 (기본값: catalog.stack 또는 가장 큰 스택)')
+    args = parser.parse_args()
+
+    config = get_config()
+    if args.stack:
+        # 스택별 처리/출력 디렉토리와 DAG 상태 파일 사용
+        config = config.for_stack(args.stack)
+    with use_config(config):
+        runner = DagRunner(build_pipeline(config), workers=args.workers, config=config)
+        status = runner.run(args.targets or None, dry_run=args.dry_run)
+
+    table = Table(title="파이프라인 노드" + (" (dry-run)" if args.dry_run else ""))
+    table.add_column("노드", style="cyan")
+    table.add_column("상태")
+    for name, value in status.items():
+        style = 'green' if value in ('up to date', 'built') else 'yellow' if args.dry_run else 'red'
+        table.add_row(name, f"[{style}]{value}[/{style}]")
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,7 @@ ASF (Alaska Satellite Facility)를 통한 Sentinel-1 데이터 검색 및 다운
 import os
 from pathlib import Path
 from datetime import datetime
-from typing import List, Dict
+from typing import Dict, Iterator, List, Optional
 import logging
 
 try:
@@ -17,11 +17,14 @@ except ImportError:
     asf = None
 
 from shapely.geometry import box
+import numpy as np
 import pandas as pd
 from rich.console import Console
 from rich.table import Table
 
 from .config import get_config
+from .product_table import PRODUCT_COLUMNS, empty_table, pair_candidates, rehydrate_products, results_to_table
+from .stacks import cluster_frames, partition_scenes, seconds_of_day
 
 console = Console()
 logging.basicConfig(level=logging.INFO)
@@ -103,57 +106,74 @@ class Sentinel1Retriever:
         if end_date is None:
             end_date = self.config.get('sentinel1', 'date_range', 'end')
         
-        # 검색 영역
-        aoi_wkt = self.get_aoi_wkt()
-        
         logger.info(f"검색 중: {start_date} ~ {end_date}")
         logger.info(f"영역: {self.config.get('aoi', 'name')}")
         
         try:
-            # ASF 검색 (orbit direction 제외하여 더 많은 결과 검색)
-            results = asf.search(
-                platform=asf.PLATFORM.SENTINEL1,
-                processingLevel=asf.PRODUCT_TYPE.SLC,
-                beamMode=asf.BEAMMODE.IW,
-                # flightDirection 제거 - ASCENDING과 DESCENDING 모두 검색
-                start=start_date,
-                end=end_date,
-                intersectsWith=aoi_wkt,
-                maxResults=max_results
-            )
+            results = asf.search(**self._search_options(start_date, end_date, max_results))
             
             logger.info(f"검색 조건: Sentinel-1 SLC, IW 모드, 모든 궤도 방향")
             
             logger.info(f"검색 완료: {len(results)}개 제품 발견")
             
-            # DataFrame으로 변환
-            products_data = []
-            for result in results:
-                path_value = result.properties.get('pathNumber')
-                
-                # orbit은 absolute orbit number이므로 relative orbit (track)으로 변환
-                # Sentinel-1의 relative orbit number는 1-175 범위
-                absolute_orbit = result.properties.get('orbit')
-                if absolute_orbit is not None:
-                    track_value = ((absolute_orbit - 1) % 175) + 1
-                else:
-                    track_value = 'N/A'
-                
-                products_data.append({
-                    'title': result.properties['sceneName'],
-                    'date': result.properties['startTime'],
-                    'path': path_value if path_value is not None else 'N/A',
-                    'track': track_value,
-                    'size_mb': result.properties.get('bytes', 0) / (1024**2),
-                    'url': result.properties.get('url', ''),
-                    'product': result
-                })
-            
-            return pd.DataFrame(products_data)
+            return self._results_to_dataframe(results)
             
         except Exception as e:
             logger.error(f"검색 실패: {e}")
-            return pd.DataFrame()
+            return empty_table()
+    
+    def _search_options(self, start_date: str, end_date: str, max_results: int) -> Dict:
+        """ASF 검색 조건 (orbit direction 제외하여 ASCENDING과 DESCENDING 모두 검색)"""
+        return dict(
+            platform=asf.PLATFORM.SENTINEL1,
+            processingLevel=asf.PRODUCT_TYPE.SLC,
+            beamMode=asf.BEAMMODE.IW,
+            start=start_date,
+            end=end_date,
+            intersectsWith=self.get_aoi_wkt(),
+            maxResults=max_results
+        )
+    
+    def iter_search(
+        self,
+        start_date: str = None,
+        end_date: str = None,
+        max_results: int = 100
+    ) -> Iterator[pd.DataFrame]:
+        """검색 결과를 페이지 단위로 반환 (전체 검색이 끝나기 전에 처리 시작 가능)
+        
+        Yields:
+            페이지별 제품 정보 DataFrame
+        """
+        if start_date is None:
+            start_date = self.config.get('sentinel1', 'date_range', 'start')
+        if end_date is None:
+            end_date = self.config.get('sentinel1', 'date_range', 'end')
+        
+        logger.info(f"스트리밍 검색: {start_date} ~ {end_date}")
+        for page in asf.search_generator(**self._search_options(start_date, end_date, max_results)):
+            yield self._results_to_dataframe(page)
+    
+    def _results_to_dataframe(self, results) -> pd.DataFrame:
+        """ASF 검색 결과 → 제품 테이블 (열 단위, 제품 객체는 보관하지 않음)"""
+        return results_to_table(results)
+    
+    def search_granules(self, titles: List[str]) -> pd.DataFrame:
+        """장면 이름으로 제품 검색 (카탈로그에 있는 장면 재다운로드용)
+        
+        Args:
+            titles: 장면 이름 리스트
+        
+        Returns:
+            검색된 제품 정보 DataFrame
+        """
+        if not titles:
+            return empty_table()
+        try:
+            return self._results_to_dataframe(rehydrate_products(titles).values())
+        except Exception as e:
+            logger.error(f"장면 검색 실패: {e}")
+            return empty_table()
     
     def search_image_pair(
         self,
@@ -174,8 +194,6 @@ class Sentinel1Retriever:
         Returns:
         - products_df: 2개의 영상 정보 DataFrame
         """
-        from datetime import datetime, timedelta
-        
         logger.info(f"InSAR 영상 쌍 검색 시작 (간격: {temporal_baseline_days}일)")
         
         # 1. 전체 기간 검색
@@ -187,86 +205,66 @@ class Sentinel1Retriever:
         
         if all_products_df.empty:
             logger.warning("검색 결과가 없습니다")
-            return pd.DataFrame()
-        
-        # 2. 날짜와 시간으로 그룹화 (같은 프레임 = 비슷한 시간)
-        all_products_df['datetime'] = pd.to_datetime(all_products_df['date'])
-        all_products_df['time_only'] = all_products_df['datetime'].dt.time
-        all_products_df['date_only'] = all_products_df['datetime'].dt.date
-        
-        # 3. 시간대별로 그룹화 (같은 프레임 찾기)
-        # 시간을 분 단위로 반올림해서 같은 프레임 묶기
-        all_products_df['time_minute'] = all_products_df['datetime'].dt.floor('1min')
-        
-        # 4. 가장 많은 영상이 있는 시간대(프레임) 찾기
-        time_groups = all_products_df.groupby(all_products_df['time_minute'].dt.time)
-        most_common_time = time_groups.size().idxmax()
-        
-        logger.info(f"가장 많은 영상이 있는 촬영 시간: {most_common_time}")
-        
-        # 5. 해당 시간대의 영상만 필터링
-        same_frame_df = all_products_df[
-            all_products_df['time_minute'].dt.time == most_common_time
-        ].copy()
+            return all_products_df
+        
+        # 2. (궤도 방향, relative orbit, 프레임 구성)으로 스택 분할
+        stacks = partition_scenes(all_products_df, min_dates=1)
+        if not stacks:
+            logger.warning("relative orbit을 알 수 있는 영상이 없습니다")
+            return all_products_df.iloc[:0]
+        
+        # 3. 날짜가 가장 많은 스택 선택 (날짜마다 같은 프레임 구성이므로 프레임이 1개인 날짜만 쌍 후보)
+        stack = stacks[0]
+        logger.info(f"날짜가 가장 많은 스택: {stack.name} (날짜 {len(stack)}개, 전체 스택 {len(stacks)}개)")
+        
+        # 4. 해당 스택의 영상을 날짜순으로 (여러 프레임이면 첫 프레임만)
+        same_frame_df = stack.scenes
+        if len(stack.frames) > 1:
+            frames = cluster_frames(
+                seconds_of_day(same_frame_df['timestamp'].to_numpy()),
+                self.config.get('catalog', 'stacks', 'frame_tolerance_s', default=10)
+            )
+            same_frame_df = same_frame_df[frames == 0]
+        same_frame_df = same_frame_df.sort_values('timestamp').reset_index(drop=True)
         
         if len(same_frame_df) < 2:
             logger.warning(f"같은 프레임의 영상이 {len(same_frame_df)}개뿐입니다")
             return same_frame_df
         
-        # 6. 날짜순 정렬
-        same_frame_df = same_frame_df.sort_values('datetime').reset_index(drop=True)
-        
-        # 7. 파일 크기로 burst 수 추정 (크기가 비슷 = 비슷한 커버리지)
+        # 5. 파일 크기로 burst 수 추정 (크기가 비슷 = 비슷한 커버리지)
         # 크기가 너무 작거나 큰 영상 제외 (median 대비 50% 이상 차이나면 제외)
-        median_size = same_frame_df['size_mb'].median()
+        sizes = same_frame_df['size_mb'].to_numpy()
+        median_size = float(np.median(sizes))
         min_size = median_size * 0.5
         max_size = median_size * 1.5
+        size_ok = (sizes >= min_size) & (sizes <= max_size)
         
-        filtered_df = same_frame_df[
-            (same_frame_df['size_mb'] >= min_size) & 
-            (same_frame_df['size_mb'] <= max_size)
-        ].copy()
-        
-        logger.info(f"크기 필터링: {len(same_frame_df)}개 → {len(filtered_df)}개")
+        logger.info(f"크기 필터링: {len(same_frame_df)}개 → {int(size_ok.sum())}개")
         logger.info(f"크기 범위: {min_size:.0f} - {max_size:.0f} MB (median: {median_size:.0f} MB)")
         
-        if len(filtered_df) < 2:
+        if size_ok.sum() < 2:
             logger.warning("크기가 비슷한 영상이 충분하지 않습니다. 필터링하지 않고 진행합니다.")
-            filtered_df = same_frame_df
-        
-        # 8. 지정된 시간 간격에 가장 가까운 쌍 찾기
-        target_delta = timedelta(days=temporal_baseline_days)
-        best_pair = None
-        min_diff = timedelta(days=9999)
-        
-        for i in range(len(filtered_df) - 1):
-            for j in range(i + 1, len(filtered_df)):
-                date1 = filtered_df.iloc[i]['datetime']
-                date2 = filtered_df.iloc[j]['datetime']
-                actual_delta = date2 - date1
-                diff = abs(actual_delta - target_delta)
-                
-                if diff < min_diff:
-                    min_diff = diff
-                    best_pair = (filtered_df.index[i], filtered_df.index[j])
-                    actual_baseline = actual_delta.days
-        
-        if best_pair:
-            i, j = best_pair
-            pair_df = same_frame_df.loc[[i, j]].reset_index(drop=True)
-            
-            logger.info(f"✓ 영상 쌍 발견!")
-            logger.info(f"  Reference: {pair_df.iloc[0]['date']} ({pair_df.iloc[0]['size_mb']:.0f} MB)")
-            logger.info(f"  Secondary: {pair_df.iloc[1]['date']} ({pair_df.iloc[1]['size_mb']:.0f} MB)")
-            logger.info(f"  Temporal Baseline: {actual_baseline}일")
-            logger.info(f"  촬영 시간: {most_common_time}")
-            logger.info(f"  크기 차이: {abs(pair_df.iloc[0]['size_mb'] - pair_df.iloc[1]['size_mb']):.0f} MB")
-            
-            # 정리된 열만 반환
-            return pair_df[['title', 'date', 'path', 'track', 'size_mb', 'url', 'product']]
-        else:
+            size_ok[:] = True
+        
+        # 6. 지정된 시간 간격에 가장 가까운 쌍 찾기 (모든 조합을 한 번에 계산)
+        candidates = np.flatnonzero(size_ok)
+        diff = pair_candidates(same_frame_df['timestamp'].to_numpy()[candidates], temporal_baseline_days)
+        i, j = np.unravel_index(np.argmin(diff), diff.shape)
+        if not np.isfinite(diff[i, j]):
             logger.warning("적절한 영상 쌍을 찾지 못했습니다")
             return same_frame_df.head(2)
+        
+        pair_df = same_frame_df.iloc[[candidates[i], candidates[j]]].reset_index(drop=True)
+        actual_baseline = int((pair_df['timestamp'].iloc[1] - pair_df['timestamp'].iloc[0]) // 86400_000_000_000)
+        
+        logger.info(f"✓ 영상 쌍 발견!")
+        logger.info(f"  Reference: {pair_df.iloc[0]['date']} ({pair_df.iloc[0]['size_mb']:.0f} MB)")
+        logger.info(f"  Secondary: {pair_df.iloc[1]['date']} ({pair_df.iloc[1]['size_mb']:.0f} MB)")
+        logger.info(f"  Temporal Baseline: {actual_baseline}일")
+        logger.info(f"  스택: {stack.name}")
+        logger.info(f"  크기 차이: {abs(pair_df.iloc[0]['size_mb'] - pair_df.iloc[1]['size_mb']):.0f} MB")
+        
+        return pair_df[PRODUCT_COLUMNS]
     
     def display_products(self, products_df: pd.DataFrame):
         """검색된 제품 정보 출력"""
@@ -282,29 +280,34 @@ class Sentinel1Retriever:
         table.add_column("크기 (MB)", style="magenta")
         table.add_column("제품명", style="blue")
         
-        # Reset index to ensure sequential numbering
-        for i, (idx, row) in enumerate(products_df.iterrows(), start=1):
-            table.add_row(
-                str(i),
-                str(row['date'])[:10] if pd.notna(row['date']) else 'N/A',
-                str(row.get('path', 'N/A')),
-                str(row.get('track', 'N/A')),
-                f"{row['size_mb']:.2f}",
-                row['title'][:50] + "..." if len(row['title']) > 50 else row['title']
-            )
+        # 열 단위로 문자열을 만든 뒤 한 번에 추가
+        def column_text(name):
+            if name not in products_df.columns:
+                return ['N/A'] * len(products_df)
+            return products_df[name].astype(object).where(products_df[name].notna(), 'N/A').astype(str)
+        
+        dates = products_df['date'].astype(str).str[:10]
+        sizes = products_df['size_mb'].map('{:.2f}'.format)
+        titles = products_df['title'].where(
+            products_df['title'].str.len() <= 50, products_df['title'].str[:50] + "..."
+        )
+        for i, row in enumerate(zip(dates, column_text('path'), column_text('track'), sizes, titles), start=1):
+            table.add_row(str(i), *row)
         
         console.print(table)
     
     def download_products(
         self,
         products_df: pd.DataFrame,
-        max_products: int = None
+        max_products: int = None,
+        bursts_only: bool = None
     ) -> List[str]:
         """제품 다운로드
         
         Args:
             products_df: 다운로드할 제품 DataFrame
             max_products: 최대 다운로드 개수
+            bursts_only: True면 AOI burst만 담은 부분 SAFE 생성 (기본값: burst_subset.enabled)
         
         Returns:
             다운로드된 파일 경로 리스트
@@ -325,36 +328,63 @@ class Sentinel1Retriever:
         # Use enumerate for sequential numbering
         for i, (idx, row) in enumerate(products_df.iterrows(), start=1):
             logger.info(f"다운로드 중 ({i}/{len(products_df)}): {row['title']}")
-            
-            try:
-                product = row['product']
-                
-                # 환경 변수가 설정되어 있는지 재확인
-                if 'EARTHDATA_USERNAME' not in os.environ:
-                    credentials = self.config.get_credential('asf')
-                    os.environ['EARTHDATA_USERNAME'] = str(credentials['username'])
-                    os.environ['EARTHDATA_PASSWORD'] = str(credentials['password'])
-                    logger.info("환경 변수 재설정 완료")
-                
-                # 다운로드 (세션 전달)
-                product.download(path=str(download_dir), session=self.session)
-                
-                # 다운로드된 파일 경로 추정
-                file_path = download_dir / f"{row['title']}.zip"
+            file_path = self.download_product(row, download_dir, bursts_only=bursts_only)
+            if file_path is not None:
                 downloaded_files.append(str(file_path))
-                logger.info(f"다운로드 완료: {file_path}")
-            except Exception as e:
-                logger.error(f"다운로드 실패: {e}")
-                logger.error(f"상세 오류 정보: {type(e).__name__}")
-                
-                # 대안: wget으로 다운로드 URL 안내
-                if hasattr(product, 'properties'):
-                    url = product.properties.get('url', '')
-                    if url:
-                        logger.info(f"대안: 다음 URL에서 수동 다운로드 가능")
-                        logger.info(f"  {url}")
         
         return downloaded_files
+    
+    def download_product(self, row, download_dir: Path, bursts_only: bool = None) -> Optional[Path]:
+        """제품 하나 다운로드
+        
+        Args:
+            row: 제품 테이블의 행 (title, url)
+            download_dir: 저장 디렉토리
+            bursts_only: True면 AOI burst만 담은 부분 SAFE 생성 (기본값: burst_subset.enabled)
+        
+        Returns:
+            다운로드된 파일(또는 .SAFE 디렉토리) 경로 (실패 시 None)
+        """
+        if bursts_only is None:
+            bursts_only = self.config.get('burst_subset', 'enabled', default=False)
+        if bursts_only:
+            try:
+                from .remote_safe import BurstSubsetRetriever
+                return BurstSubsetRetriever(session=self.session).fetch(row['url'], row['title'], download_dir)
+            except Exception as e:
+                logger.error(f"burst 부분 다운로드 실패 ({row['title']}): {e}")
+                return None
+        
+        url = row.get('url') or ''
+        try:
+            # 환경 변수가 설정되어 있는지 재확인
+            if 'EARTHDATA_USERNAME' not in os.environ:
+                credentials = self.config.get_credential('asf')
+                os.environ['EARTHDATA_USERNAME'] = str(credentials['username'])
+                os.environ['EARTHDATA_PASSWORD'] = str(credentials['password'])
+                logger.info("환경 변수 재설정 완료")
+            
+            # 테이블에 URL이 없을 때만 제품 객체를 다시 조회
+            if not url:
+                product = rehydrate_products([row['title']]).get(row['title'])
+                if product is None:
+                    raise ValueError(f"ASF에서 장면을 찾을 수 없습니다: {row['title']}")
+                url = product.properties['url']
+            
+            # 다운로드 (세션 전달)
+            file_path = Path(download_dir) / f"{row['title']}.zip"
+            asf.download_url(url=url, path=str(download_dir), filename=file_path.name, session=self.session)
+            logger.info(f"다운로드 완료: {file_path}")
+            return file_path
+        except Exception as e:
+            logger.error(f"다운로드 실패: {e}")
+            logger.error(f"상세 오류 정보: {type(e).__name__}")
+            
+            # 대안: wget으로 다운로드 URL 안내
+            if url:
+                logger.info(f"대안: 다음 URL에서 수동 다운로드 가능")
+                logger.info(f"  {url}")
+            return None
 
 
 def main():
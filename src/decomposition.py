@@ -0,0 +1,185 @@
+"""
+LOS Decomposition Module
+상승/하강 궤도 LOS 속도를 수직·동서 성분으로 분해
+
+ISCE los.rdr의 입사각 θ와 방위각 α(지표→위성 LOS, 북쪽 기준 반시계)로 지표→위성 단위 벡터
+
+    e = −sin θ · sin α,   n = sin θ · cos α,   u = cos θ
+
+를 만들고, SBAS 속도의 부호(+: 위성에서 멀어짐)에 맞춰 관측식
+
+    v_los = −(e · v_east + n · v_north + u · v_up)
+
+을 픽셀마다 세웁니다. 궤도 두 개(상승 + 하강)면 (east, up) 2x2 연립방정식, 세 개 이상이면
+최소제곱으로 풉니다. 남북 성분은 LOS 민감도가 낮아 기본적으로 미지수에서 제외합니다.
+모든 스택은 같은 지오코딩 격자(같은 geocode bounding box와 간격)여야 하며,
+블록마다 배치 행렬 연산(einsum + np.linalg.solve)으로 풀어 파이썬 픽셀 루프가 없습니다.
+"""
+
+import argparse
+from pathlib import Path
+from typing import Dict, Sequence, Tuple
+import logging
+
+import numpy as np
+
+from .config import get_config
+from .insar_processing import ingest_los_geometry
+from .masking import ValidityMask
+from .raster_io import IsceRaster
+from .stack import StackStore
+
+logger = logging.getLogger(__name__)
+
+COMPONENTS = ('east', 'north', 'up')
+
+
+def los_unit_vectors(incidence: np.ndarray, azimuth: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """입사각/방위각(도) → 지표→위성 LOS 단위 벡터 (east, north, up)"""
+    inc = np.deg2rad(incidence)
+    az = np.deg2rad(azimuth)
+    return -np.sin(inc) * np.sin(az), np.sin(inc) * np.cos(az), np.cos(inc)
+
+
+def los_design(incidence: np.ndarray, azimuth: np.ndarray, components: Sequence[str]) -> np.ndarray:
+    """v_los = G · v 의 G 행 (..., m) - 위성에서 멀어지는 방향이 +"""
+    vectors = dict(zip(COMPONENTS, los_unit_vectors(incidence, azimuth)))
+    return -np.stack([vectors[c] for c in components], axis=-1)
+
+
+def solve_components(G: np.ndarray, d: np.ndarray, min_det: float = 1e-6) -> np.ndarray:
+    """픽셀별 (가중) 최소제곱 해를 배치로 계산
+
+    Args:
+        G: (k, P, m) 궤도별 설계 행
+        d: (k, P) 궤도별 LOS 속도 (NaN은 해당 궤도 제외)
+        min_det: 정규행렬 행렬식 하한 (기하가 나쁘면 NaN)
+
+    Returns:
+        (P, m) 성분 속도 (풀 수 없는 픽셀은 NaN)
+    """
+    valid = ~(np.isnan(d) | np.isnan(G).any(axis=-1))
+    w = valid.astype(np.float64)
+    G = np.where(valid[..., None], G, 0.0)
+    d = np.where(valid, d, 0.0)
+
+    N = np.einsum('kpi,kpj,kp->pij', G, G, w)
+    b = np.einsum('kpi,kp,kp->pi', G, d, w)
+    m = G.shape[-1]
+    solvable = (valid.sum(axis=0) >= m) & (np.abs(np.linalg.det(N)) > min_det)
+
+    x = np.full((G.shape[1], m), np.nan)
+    if solvable.any():
+        x[solvable] = np.linalg.solve(N[solvable], b[solvable][..., None])[..., 0]
+    return x
+
+
+class LosDecomposition:
+    """여러 궤도 스택의 LOS 속도 → 수직/동서(/남북) 속도 래스터
+
+    Example:
+        with StackStore.open('asc/stack.h5') as asc, StackStore.open('desc/stack.h5') as desc:
+            paths = LosDecomposition([asc, desc]).run()
+    """
+
+    def __init__(self, stores: Sequence[StackStore], components: Sequence[str] = None, block_size: int = None):
+        """
+        Args:
+            stores: 같은 격자로 지오코딩된 궤도별 스택 (timeseries/velocity와 LOS 기하 필요)
+            components: 미지수 성분 (기본값: decomposition.components, ['east', 'up'])
+            block_size: 블록 처리 단위 (기본값: stack.block_size)
+        """
+        config = get_config()
+        self.stores = list(stores)
+        if components is None:
+            components = config.get('decomposition', 'components', default=['east', 'up'])
+        self.components = [c for c in COMPONENTS if c in components]
+        if len(self.components) != len(components):
+            raise ValueError(f"알 수 없는 성분: {components} (가능: {', '.join(COMPONENTS)})")
+        self.block_size = block_size
+        self.masks = [m for m in (ValidityMask.for_store(s) for s in self.stores) if m is not None]
+        self.output_dir = config.project_root / config.get(
+            'decomposition', 'output_dir', default='./outputs/decomposition'
+        )
+        self._check()
+
+    def _check(self):
+        if len(self.stores) < len(self.components):
+            raise ValueError(
+                f"성분 {len(self.components)}개를 풀려면 궤도 스택이 {len(self.components)}개 이상 필요합니다 "
+                f"(현재 {len(self.stores)}개)"
+            )
+        reference = self.stores[0]
+        for store in self.stores:
+            if store.shape != reference.shape:
+                raise ValueError(f"스택 격자 크기가 다릅니다: {store.path} {store.shape} vs {reference.shape}")
+            if store.geotransform is None or not np.allclose(store.geotransform, reference.geotransform):
+                raise ValueError(f"스택이 같은 지오코딩 격자가 아닙니다: {store.path}")
+            if 'timeseries/velocity' not in store.h5:
+                raise ValueError(f"SBAS 속도가 없습니다: {store.path}")
+            if not (store.has_geometry('incidence') and store.has_geometry('azimuth')):
+                raise ValueError(f"LOS 기하(incidence/azimuth)가 없습니다: {store.path} (ingest_los_geometry로 적재)")
+
+    def run(self, output_dir: str = None) -> Dict[str, Path]:
+        """블록 단위로 분해해 성분별 속도 래스터(mm/yr, ISCE .geo) 기록
+
+        Returns:
+            {성분: 래스터 경로}
+        """
+        output_dir = Path(output_dir or self.output_dir)
+        reference = self.stores[0]
+        rasters = {
+            c: IsceRaster.create(
+                output_dir / f"velocity_{c}.geo", reference.width, reference.length,
+                geotransform=reference.geotransform, fill_value=np.nan,
+            )
+            for c in self.components
+        }
+
+        # 첫 마스크로 블록을 건너뛰고, 모든 스택의 마스크는 픽셀 단위로 적용
+        for window in reference.iter_windows(self.block_size, mask=self.masks[0] if self.masks else None):
+            d = np.stack([s.h5['timeseries/velocity'][window[0], window[1]] for s in self.stores])
+            G = np.stack([
+                los_design(s.read_geometry('incidence', window), s.read_geometry('azimuth', window), self.components)
+                for s in self.stores
+            ])
+            block_shape = d.shape[1:]
+            for mask in self.masks:
+                d[:, ~mask.window(window)] = np.nan
+            x = solve_components(G.reshape(len(self.stores), -1, len(self.components)), d.reshape(len(self.stores), -1))
+            for i, c in enumerate(self.components):
+                rasters[c].write_window(window, x[:, i].reshape(block_shape).astype(np.float32))
+
+        for raster in rasters.values():
+            raster.flush()
+        logger.info(f"LOS 분해 완료: 궤도 {len(self.stores)}개 → {', '.join(self.components)} ({output_dir})")
+        return {c: r.path for c, r in rasters.items()}
+
+
+def main():
+    """메인 실행 함수"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="상승/하강 LOS 속도의 수직·동서 분해")
+    parser.add_argument('--stack', action='append', required=True, help='궤도별 스택 HDF5 (2개 이상)')
+    parser.add_argument('--los-from', action='append', default=None,
+                        help='LOS 기하가 없는 스택에 적재할 간섭쌍 작업 디렉토리 (--stack 순서대로)')
+    parser.add_argument('--components', nargs='+', default=None, choices=COMPONENTS, help='미지수 성분')
+    parser.add_argument('--output-dir', default=None, help='출력 디렉토리 (기본값: decomposition.output_dir)')
+    args = parser.parse_args()
+
+    if args.los_from and len(args.los_from) != len(args.stack):
+        parser.error("--los-from은 --stack과 같은 개수여야 합니다")
+    stores = [StackStore.open(path, 'r+' if args.los_from else 'r') for path in args.stack]
+    try:
+        for store, pair_dir in zip(stores, args.los_from or []):
+            ingest_los_geometry(store, Path(pair_dir))
+        paths = LosDecomposition(stores, args.components).run(args.output_dir)
+    finally:
+        for store in stores:
+            store.close()
+    for component, path in paths.items():
+        print(f"{component}: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Deformation Model Module
+SBAS 변위 시계열에 픽셀별 변형 모델(선형 + 연/반년 주기 + 계단) 일괄 적합
+
+    d(t) = c + v·t + Σ_h [a_h·sin(2πh·τ) + b_h·cos(2πh·τ)] + Σ_k s_k·H(t − t_k)
+
+t는 첫 날짜 기준 경과 연수, τ는 연중 위치(소수 연도)라 계절 위상이 달력 기준으로 해석됩니다.
+H는 이벤트 날짜 다음 촬영부터 1인 Heaviside 함수입니다 (당일 촬영은 이벤트 전으로 간주).
+
+설계 행렬 G (T x P)는 모든 픽셀이 공유하므로 G⁺ = pinv(G)를 한 번 계산하고 타일마다
+
+    X = G⁺ · D      (P x T) · (T x n_pixels)
+
+행렬 곱 하나로 수백만 픽셀을 풉니다. 일부 날짜만 값이 없는 픽셀은 유효 날짜 패턴별로
+묶어 패턴마다 pinv를 한 번만 계산(캐시)합니다.
+"""
+
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Sequence
+import json
+import logging
+
+import numpy as np
+
+from .config import get_config
+from .masking import ValidityMask
+from .raster_io import IsceRaster
+from .stack import StackStore
+from .time_series import date_to_years
+
+logger = logging.getLogger(__name__)
+
+HARMONICS = {'annual': 1, 'semiannual': 2}
+
+
+def decimal_year(dates: Sequence[str]) -> np.ndarray:
+    """'YYYYMMDD' → 소수 연도 (예: 2017-07-02 → 2017.5)"""
+    parsed = [datetime.strptime(d, '%Y%m%d') for d in dates]
+    return np.array([
+        d.year + (d - datetime(d.year, 1, 1)).days / (datetime(d.year + 1, 1, 1) - datetime(d.year, 1, 1)).days
+        for d in parsed
+    ])
+
+
+@dataclass
+class DeformationModel:
+    """변형 모델 구성 (설계 행렬 열 정의)"""
+    annual: bool = True
+    semiannual: bool = True
+    steps: List[str] = field(default_factory=list)       # 'YYYYMMDD' 이벤트 날짜
+
+    @classmethod
+    def from_config(cls) -> 'DeformationModel':
+        config = get_config()
+        return cls(
+            annual=config.get('model', 'annual', default=True),
+            semiannual=config.get('model', 'semiannual', default=True),
+            steps=[str(s) for s in config.get('model', 'steps', default=[]) or []],
+        )
+
+    def fitted_steps(self, dates: Sequence[str]) -> List[str]:
+        """시계열 앞뒤로 모두 촬영이 있는 이벤트만 (나머지는 절편과 구분되지 않음)"""
+        steps = []
+        for step in sorted(self.steps):
+            if dates[0] <= step < dates[-1]:
+                steps.append(step)
+            else:
+                logger.warning(f"계단 날짜가 시계열 범위({dates[0]}~{dates[-1]}) 밖이라 제외합니다: {step}")
+        return steps
+
+    def columns(self, dates: Sequence[str]) -> List[str]:
+        """모델 파라미터 이름"""
+        names = ['offset', 'velocity']
+        for name in HARMONICS:
+            if getattr(self, name):
+                names += [f"{name}_sin", f"{name}_cos"]
+        return names + [f"step_{s}" for s in self.fitted_steps(dates)]
+
+    def design(self, dates: Sequence[str]) -> np.ndarray:
+        """설계 행렬 G (T x P) - 열 순서는 columns()와 같음"""
+        t = date_to_years(dates)
+        tau = decimal_year(dates)
+        columns = [np.ones_like(t), t]
+        for name, harmonic in HARMONICS.items():
+            if getattr(self, name):
+                columns += [np.sin(2 * np.pi * harmonic * tau), np.cos(2 * np.pi * harmonic * tau)]
+        for step in self.fitted_steps(dates):
+            columns.append((np.asarray(dates) > step).astype(np.float64))
+        return np.stack(columns, axis=1)
+
+
+class DeformationModelFit:
+    """스택 변위 시계열의 픽셀별 모델 적합 → 파라미터/잔차 래스터
+
+    Example:
+        with StackStore.open() as store:
+            paths = DeformationModelFit(store).run()
+        # paths['velocity'], paths['annual_amplitude'], paths['step_20171115'], paths['residual_rms'] ...
+    """
+
+    def __init__(self, store: StackStore, model: DeformationModel = None, block_size: int = None):
+        """
+        Args:
+            store: SBAS 시계열(timeseries/displacement)이 있는 StackStore
+            model: 모델 구성 (기본값: 설정 파일 model 섹션)
+            block_size: 타일 크기 (기본값: stack.block_size)
+        """
+        if 'timeseries/displacement' not in store.h5:
+            raise ValueError(f"SBAS 변위 시계열이 없습니다: {store.path}")
+        config = get_config()
+        self.store = store
+        self.model = model or DeformationModel.from_config()
+        self.block_size = block_size
+        self.mask = ValidityMask.for_store(store)
+        self.write_residuals = config.get('model', 'write_residuals', default=False)
+        self.output_dir = config.project_root / config.get('model', 'output_dir', default='./outputs/model')
+
+        self.dates = store.dates
+        self.names = self.model.columns(self.dates)
+        self.G = self.model.design(self.dates)
+        if len(self.dates) < len(self.names):
+            raise ValueError(f"날짜 {len(self.dates)}개로 파라미터 {len(self.names)}개를 풀 수 없습니다")
+        if np.linalg.matrix_rank(self.G) < len(self.names):
+            raise ValueError(f"설계 행렬이 rank 부족입니다 ({', '.join(self.names)}) - 계절/계단 항을 줄이세요")
+        self._pinv: Dict[bytes, np.ndarray] = {}
+        self.full_pinv = np.linalg.pinv(self.G)
+
+    def _pattern_pinv(self, valid: np.ndarray):
+        """유효 날짜 패턴의 pinv (풀 수 없으면 None, 패턴별 캐시)"""
+        key = np.packbits(valid).tobytes()
+        if key not in self._pinv:
+            G = self.G[valid]
+            self._pinv[key] = np.linalg.pinv(G) if np.linalg.matrix_rank(G) == G.shape[1] else None
+        return self._pinv[key]
+
+    def fit(self, displacement: np.ndarray) -> np.ndarray:
+        """(T, n) 시계열 → (P, n) 파라미터 (풀 수 없는 픽셀은 NaN)"""
+        valid = np.isfinite(displacement)
+        complete = valid.all(axis=0)
+        params = np.full((len(self.names), displacement.shape[1]), np.nan)
+        if complete.any():
+            params[:, complete] = self.full_pinv @ displacement[:, complete]
+
+        partial = np.flatnonzero(~complete & (valid.sum(axis=0) >= len(self.names)))
+        if partial.size:
+            patterns, inverse = np.unique(valid[:, partial].T, axis=0, return_inverse=True)
+            for k, pattern in enumerate(patterns):
+                pinv = self._pattern_pinv(pattern)
+                if pinv is None:
+                    continue
+                pixels = partial[inverse.ravel() == k]
+                params[:, pixels] = pinv @ displacement[np.ix_(pattern, pixels)]
+        return params
+
+    def derived(self, params: np.ndarray) -> Dict[str, np.ndarray]:
+        """파라미터 → 출력 래스터 값 (계절 항은 진폭과 최대 시기(연중 일)로 변환)"""
+        values = dict(zip(self.names, params))
+        out = {'offset': values['offset'], 'velocity': values['velocity']}
+        for name, harmonic in HARMONICS.items():
+            if f"{name}_sin" not in values:
+                continue
+            a, b = values[f"{name}_sin"], values[f"{name}_cos"]
+            out[f"{name}_amplitude"] = np.hypot(a, b)
+            # a·sin(ωτ) + b·cos(ωτ) = A·cos(ωτ − φ), φ = atan2(a, b) → 첫 최대는 τ = φ / ω
+            period_days = 365.25 / harmonic
+            out[f"{name}_peak_day"] = np.mod(np.arctan2(a, b) / (2 * np.pi), 1.0) * period_days
+        for name in self.names:
+            if name.startswith('step_'):
+                out[name] = values[name]
+        return out
+
+    def output_names(self) -> List[str]:
+        return list(self.derived(np.zeros((len(self.names), 1))).keys()) + ['residual_rms', 'n_dates']
+
+    def run(self, output_dir: str = None) -> Dict[str, Path]:
+        """타일 단위 적합 후 래스터 기록 (mm, mm/yr, 일)
+
+        Returns:
+            {출력 이름: 래스터 경로} (write_residuals면 'residuals' 다중 밴드 래스터 포함)
+        """
+        output_dir = Path(output_dir or self.output_dir)
+        shape = dict(width=self.store.width, length=self.store.length, geotransform=self.store.geotransform)
+        rasters = {
+            name: IsceRaster.create(output_dir / f"{name}.geo", fill_value=np.nan, **shape)
+            for name in self.output_names()
+        }
+        if self.write_residuals:
+            rasters['residuals'] = IsceRaster.create(
+                output_dir / 'residuals.geo', bands=len(self.dates), scheme='BSQ', fill_value=np.nan, **shape
+            )
+
+        n_fitted = 0
+        for window in self.store.iter_windows(self.block_size, mask=self.mask):
+            displacement = self.store.read_stack('timeseries/displacement', window).astype(np.float64)
+            block_shape = displacement.shape[1:]
+            displacement = displacement.reshape(len(self.dates), -1)
+            if self.mask is not None:
+                displacement[:, ~self.mask.window(window).ravel()] = np.nan
+
+            params = self.fit(displacement)
+            residual = displacement - self.G @ params
+            with np.errstate(invalid='ignore'):
+                n_dates = np.isfinite(residual).sum(axis=0)
+                rms = np.sqrt(np.nansum(residual ** 2, axis=0) / n_dates)
+            solved = np.isfinite(params[0])
+            n_fitted += int(solved.sum())
+
+            values = self.derived(params)
+            values['residual_rms'] = np.where(solved, rms, np.nan)
+            values['n_dates'] = np.where(solved, n_dates, np.nan)
+            for name, value in values.items():
+                rasters[name].write_window(window, value.reshape(block_shape).astype(np.float32))
+            if self.write_residuals:
+                for band, layer in enumerate(residual.reshape((len(self.dates),) + block_shape), start=1):
+                    rasters['residuals'].write_window(window, layer.astype(np.float32), band=band)
+
+        for raster in rasters.values():
+            raster.flush()
+        with open(output_dir / 'model.json', 'w', encoding='utf-8') as f:
+            json.dump({
+                'dates': self.dates,
+                'parameters': self.names,
+                'outputs': list(rasters),
+                'units': 'mm (offset, amplitude, step, residual), mm/yr (velocity), day of year (peak_day)',
+            }, f, indent=2, ensure_ascii=False)
+        logger.info(
+            f"변형 모델 적합 완료: 픽셀 {n_fitted}개, 파라미터 {', '.join(self.names)} "
+            f"(날짜 패턴 pinv {len(self._pinv) + 1}개)"
+        )
+        return {name: raster.path for name, raster in rasters.items()}
+
+
+def main():
+    """메인 실행 함수"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="픽셀별 변형 모델(선형/계절/계단) 일괄 적합")
+    parser.add_argument('--store', default=None, help='스택 HDF5 경로')
+    parser.add_argument('--steps', nargs='*', default=None, help='계단 이벤트 날짜 YYYYMMDD (기본값: model.steps)')
+    parser.add_argument('--no-seasonal', action='store_true', help='연/반년 주기 항 제외')
+    parser.add_argument('--residuals', action='store_true', help='날짜별 잔차 래스터도 기록')
+    parser.add_argument('--output-dir', default=None, help='출력 디렉토리 (기본값: model.output_dir)')
+    args = parser.parse_args()
+
+    model = DeformationModel.from_config()
+    if args.steps is not None:
+        model.steps = args.steps
+    if args.no_seasonal:
+        model.annual = model.semiannual = False
+    with StackStore.open(args.store) as store:
+        fitter = DeformationModelFit(store, model)
+        fitter.write_residuals |= args.residuals
+        paths = fitter.run(args.output_dir)
+    for name, path in paths.items():
+        print(f"{name}: {path}")
+
+
+if __name__ == "__main__":
+    main()
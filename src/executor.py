@@ -0,0 +1,404 @@
+"""
+Pair Executor Module
+간섭쌍(topsApp) 처리를 실행 백엔드에 분배하는 실행기
+
+백엔드:
+    inprocess       현재 프로세스에서 순서대로 실행 (디버깅용)
+    process         로컬 프로세스 풀
+    ssh             공유 파일시스템을 쓰는 여러 노드에 SSH로 작업 전달
+    local_cluster   ssh 백엔드와 같은 워커 프로토콜을 로컬 서브프로세스로 실행 (다중 노드 대용)
+
+작업 단위는 pickle된 TaskPayload(Config 스냅샷 + PairSpec)이며, 워커는 스냅샷을
+전역 설정으로 설치한 뒤 run_topsapp을 실행합니다. 원격 노드는 `python -m src.executor --worker`
+로 표준입력에서 payload를 읽고 결과를 표준출력에 pickle로 씁니다.
+
+스케줄러는 모든 백엔드가 공유합니다.
+    - 재시도: 실패한 간섭쌍은 executor.retries번까지 다른 노드를 우선해 다시 배치
+    - 노드 장애: 연결 실패(NodeFailure) 노드는 제외하고 작업을 재배치 (재시도 횟수 미차감)
+    - 데이터 지역성: 입력 SAFE가 노드의 data_dirs 아래에 있거나 그 노드가 이미 처리한
+      장면이 많을수록 해당 노드에 우선 배치
+"""
+
+from abc import ABC, abstractmethod
+import argparse
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set
+import logging
+import pickle
+import shlex
+import subprocess
+import sys
+import time
+
+from . import config as config_module
+from .config import Config, get_config
+from .insar_processing import PairSpec, run_topsapp
+
+logger = logging.getLogger(__name__)
+
+# 워커가 `-m src.executor`를 실행할 코드 디렉토리 (공유 파일시스템에서 노드 간 같은 경로)
+CODE_ROOT = Path(__file__).resolve().parent.parent
+
+
+class NodeFailure(RuntimeError):
+    """작업 노드 자체의 장애 (연결 실패 등) - 작업은 다른 노드로 재배치"""
+
+
+@dataclass
+class TaskPayload:
+    """워커에 전달하는 작업 (pickle 직렬화)"""
+    config: Config
+    pair: PairSpec
+
+
+@dataclass
+class PairResult:
+    """간섭쌍 처리 결과"""
+    pair: PairSpec
+    work_dir: Optional[Path] = None
+    node: str = ''
+    attempts: int = 0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class WorkerNode:
+    """작업 노드 (동시 실행 슬롯 수와 지역 데이터 디렉토리)"""
+    name: str
+    slots: int = 1
+    data_dirs: List[str] = field(default_factory=list)
+    alive: bool = True
+    running: int = 0
+    scenes: Set[str] = field(default_factory=set)
+
+    @property
+    def free(self) -> bool:
+        return self.alive and self.running < self.slots
+
+    def locality(self, pair: PairSpec) -> int:
+        """입력 장면 중 이 노드에 가까운(data_dirs 아래 또는 이전에 처리한) 것의 수"""
+        score = 0
+        for path in pair.reference_safes + pair.secondary_safes:
+            if Path(path).name in self.scenes:
+                score += 1
+            elif any(str(path).startswith(str(d)) for d in self.data_dirs):
+                score += 1
+        return score
+
+
+def execute_payload(payload: bytes) -> dict:
+    """워커 측 실행: Config 스냅샷을 전역 설정으로 설치하고 topsApp 처리
+
+    Returns:
+        {'work_dir', 'elapsed'}
+    """
+    task: TaskPayload = pickle.loads(payload)
+    # get_config()가 스냅샷을 돌려주도록 전역 인스턴스 교체
+    config_module._config = task.config
+    start = time.time()
+    work_dir = run_topsapp(task.pair, config=task.config)
+    return {'work_dir': str(work_dir), 'elapsed': time.time() - start}
+
+
+class PairExecutor(ABC):
+    """간섭쌍 실행기 공통 스케줄러 (백엔드는 nodes와 _submit만 구현)
+
+    Example:
+        executor = create_executor()
+        for result in executor.run(pairs):
+            if result.ok:
+                ingest_interferogram(store, result.pair, result.work_dir)
+    """
+
+    name = 'base'
+
+    def __init__(self, nodes: Sequence[WorkerNode], retries: int = None, config: Config = None):
+        """
+        Args:
+            nodes: 작업 노드 목록
+            retries: 간섭쌍당 재시도 횟수 (기본값: executor.retries)
+            config: 워커에 전달할 설정 (기본값: 전역 설정)
+        """
+        self.config = config or get_config()
+        self.nodes = list(nodes)
+        if retries is None:
+            retries = self.config.get('executor', 'retries', default=2)
+        self.retries = retries
+
+    @abstractmethod
+    def _submit(self, node: WorkerNode, payload: bytes) -> Future:
+        """node에서 payload 실행 (Future 결과는 execute_payload 반환 dict, 연결 실패는 NodeFailure)"""
+
+    def shutdown(self):
+        """백엔드 자원 정리"""
+
+    def _place(self, pending: deque, tried: Dict[str, Set[str]]):
+        """빈 슬롯이 있는 노드와 간섭쌍 선택 (지역성 높고, 아직 실패하지 않았고, 덜 바쁜 노드 우선)"""
+        best = None
+        for node in self.nodes:
+            if not node.free:
+                continue
+            for position, pair in enumerate(pending):
+                key = (
+                    node.name not in tried.get(pair.key, ()),
+                    node.locality(pair),
+                    -node.running / node.slots,
+                    -position,
+                )
+                if best is None or key > best[0]:
+                    best = (key, node, position)
+        if best is None:
+            return None
+        _, node, position = best
+        pair = pending[position]
+        del pending[position]
+        return node, pair
+
+    def run(self, pairs: Sequence[PairSpec], configs: Dict[str, Config] = None) -> Iterator[PairResult]:
+        """간섭쌍을 노드에 분배해 실행하고 끝나는 순서대로 결과 반환
+
+        재시도까지 실패한 간섭쌍도 error가 채워진 PairResult로 반환됩니다.
+
+        Args:
+            pairs: 간섭쌍 (여러 스택이 섞여도 됨)
+            configs: 스택 이름(PairSpec.stack)별 워커 설정 (없는 스택은 self.config)
+        """
+        configs = configs or {}
+        pending = deque(pairs)
+        attempts: Dict[str, int] = {}
+        tried: Dict[str, Set[str]] = {}
+        running: Dict[Future, tuple] = {}
+        logger.info(f"간섭쌍 {len(pending)}개 실행 ({self.name}, 노드 {len(self.nodes)}개)")
+
+        try:
+            while pending or running:
+                while pending:
+                    placement = self._place(pending, tried)
+                    if placement is None:
+                        break
+                    node, pair = placement
+                    payload = pickle.dumps(TaskPayload(config=configs.get(pair.stack, self.config), pair=pair))
+                    node.running += 1
+                    running[self._submit(node, payload)] = (node, pair, time.time())
+
+                if not running:
+                    # 살아 있는 노드가 없어 더 배치할 수 없음
+                    for pair in pending:
+                        yield PairResult(pair=pair, attempts=attempts.get(pair.key, 0),
+                                         error="사용 가능한 작업 노드가 없습니다")
+                    return
+
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                for future in done:
+                    node, pair, started = running.pop(future)
+                    node.running -= 1
+                    try:
+                        output = future.result()
+                    except NodeFailure as e:
+                        node.alive = False
+                        logger.error(f"노드 장애로 제외: {node.name} ({e}) - {pair.key} 재배치")
+                        pending.appendleft(pair)
+                        continue
+                    except Exception as e:
+                        attempts[pair.key] = attempts.get(pair.key, 0) + 1
+                        tried.setdefault(pair.key, set()).add(node.name)
+                        if attempts[pair.key] <= self.retries:
+                            logger.warning(
+                                f"간섭쌍 처리 실패, 재시도 {attempts[pair.key]}/{self.retries}: "
+                                f"{pair.key} ({node.name}: {e})"
+                            )
+                            pending.append(pair)
+                        else:
+                            yield PairResult(pair=pair, node=node.name, attempts=attempts[pair.key],
+                                             elapsed=time.time() - started, error=str(e))
+                        continue
+
+                    node.scenes.update(Path(p).name for p in pair.reference_safes + pair.secondary_safes)
+                    yield PairResult(
+                        pair=pair,
+                        work_dir=Path(output['work_dir']),
+                        node=node.name,
+                        attempts=attempts.get(pair.key, 0) + 1,
+                        elapsed=output.get('elapsed', time.time() - started),
+                    )
+        finally:
+            self.shutdown()
+
+
+class InProcessExecutor(PairExecutor):
+    """현재 프로세스에서 순서대로 실행"""
+
+    name = 'inprocess'
+
+    def __init__(self, retries: int = None, config: Config = None):
+        super().__init__([WorkerNode('local')], retries, config)
+
+    def _submit(self, node: WorkerNode, payload: bytes) -> Future:
+        future = Future()
+        # execute_payload가 바꾼 전역 설정을 되돌림 (작업 공간처럼 설정을 바꿔 가며 실행하는 경우)
+        previous = config_module._config
+        try:
+            future.set_result(execute_payload(payload))
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            config_module._config = previous
+        return future
+
+
+class ProcessPoolPairExecutor(PairExecutor):
+    """로컬 프로세스 풀 실행 (워커 프로세스가 죽으면 풀을 다시 만들고 재시도)"""
+
+    name = 'process'
+
+    def __init__(self, workers: int = None, retries: int = None, config: Config = None):
+        config = config or get_config()
+        if workers is None:
+            workers = config.get('executor', 'workers', default=2)
+        super().__init__([WorkerNode('local', slots=workers)], retries, config)
+        self.workers = workers
+        self._pool = None
+
+    def _submit(self, node: WorkerNode, payload: bytes) -> Future:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            return self._pool.submit(execute_payload, payload)
+        except BrokenProcessPool:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            return self._pool.submit(execute_payload, payload)
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+class SSHExecutor(PairExecutor):
+    """공유 파일시스템 위의 여러 노드에 SSH로 작업 전달
+
+    각 노드에서 `cd <코드 디렉토리> && <python> -m src.executor --worker`를 실행하고
+    payload를 표준입력으로 보냅니다. ssh 종료 코드 255(연결 실패)는 노드 장애로 처리합니다.
+    """
+
+    name = 'ssh'
+    CONNECTION_FAILED = 255
+
+    def __init__(self, nodes: Sequence[WorkerNode] = None, retries: int = None, config: Config = None):
+        config = config or get_config()
+        if nodes is None:
+            nodes = [
+                WorkerNode(n['host'], slots=n.get('slots', 1), data_dirs=list(n.get('data_dirs') or []))
+                for n in config.get('executor', 'nodes', default=[])
+            ]
+        if not nodes:
+            raise ValueError("executor.nodes에 작업 노드가 없습니다")
+        super().__init__(nodes, retries, config)
+        self.python = config.get('executor', 'python', default='python')
+        self.ssh_options = list(config.get('executor', 'ssh_options', default=['-o', 'BatchMode=yes']))
+        self._threads = None
+
+    def command(self, node: WorkerNode) -> List[str]:
+        """노드에서 워커를 띄우는 명령"""
+        remote = f"cd {shlex.quote(str(CODE_ROOT))} && {self.python} -m src.executor --worker"
+        return ['ssh', *self.ssh_options, node.name, remote]
+
+    def _call(self, node: WorkerNode, payload: bytes) -> dict:
+        try:
+            result = subprocess.run(self.command(node), input=payload, capture_output=True, cwd=str(CODE_ROOT))
+        except OSError as e:
+            raise NodeFailure(str(e))
+        if result.returncode == self.CONNECTION_FAILED:
+            raise NodeFailure(result.stderr.decode(errors='replace').strip()[-500:])
+        if result.returncode != 0:
+            raise RuntimeError(
+                f"워커 비정상 종료 (code {result.returncode}): "
+                f"{result.stderr.decode(errors='replace').strip()[-500:]}"
+            )
+        output = pickle.loads(result.stdout)
+        if 'error' in output:
+            raise RuntimeError(output['error'])
+        return output
+
+    def _submit(self, node: WorkerNode, payload: bytes) -> Future:
+        if self._threads is None:
+            self._threads = ThreadPoolExecutor(max_workers=sum(n.slots for n in self.nodes))
+        return self._threads.submit(self._call, node, payload)
+
+    def shutdown(self):
+        if self._threads is not None:
+            self._threads.shutdown(wait=True)
+            self._threads = None
+
+
+class LocalClusterExecutor(SSHExecutor):
+    """로컬 서브프로세스로 다중 노드를 흉내 내는 실행기 (ssh 백엔드와 같은 워커 프로토콜)"""
+
+    name = 'local_cluster'
+
+    def __init__(self, n_nodes: int = None, slots: int = 1, retries: int = None, config: Config = None):
+        config = config or get_config()
+        if n_nodes is None:
+            n_nodes = config.get('executor', 'local_nodes', default=2)
+        nodes = [WorkerNode(f"local-{i}", slots=slots) for i in range(n_nodes)]
+        super().__init__(nodes, retries, config)
+        self.python = sys.executable
+
+    def command(self, node: WorkerNode) -> List[str]:
+        return [self.python, '-m', 'src.executor', '--worker']
+
+
+BACKENDS = {
+    'inprocess': InProcessExecutor,
+    'process': ProcessPoolPairExecutor,
+    'ssh': SSHExecutor,
+    'local_cluster': LocalClusterExecutor,
+}
+
+
+def create_executor(backend: str = None, config: Config = None, **kwargs) -> PairExecutor:
+    """설정의 executor.backend로 실행기 생성"""
+    config = config or get_config()
+    backend = backend or config.get('executor', 'backend', default='inprocess')
+    if backend not in BACKENDS:
+        raise ValueError(f"알 수 없는 executor backend: {backend} (가능: {', '.join(BACKENDS)})")
+    return BACKENDS[backend](config=config, **kwargs)
+
+
+def worker_main():
+    """원격/서브프로세스 워커: 표준입력 payload → 표준출력 결과 (pickle)"""
+    payload = sys.stdin.buffer.read()
+    out = sys.stdout.buffer
+    # 처리 중 출력이 결과 스트림에 섞이지 않도록 stdout을 stderr로 돌림
+    sys.stdout = sys.stderr
+    try:
+        result = execute_payload(payload)
+    except Exception as e:
+        result = {'error': f"{type(e).__name__}: {e}"}
+    out.write(pickle.dumps(result))
+    out.flush()
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="간섭쌍 처리 워커")
+    parser.add_argument('--worker', action='store_true', help='표준입력의 작업 payload 실행')
+    args = parser.parse_args()
+    if args.worker:
+        logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+        worker_main()
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
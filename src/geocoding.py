@@ -0,0 +1,182 @@
+"""
+Geocoding Index Module
+경위도 → 레이더/격자 픽셀 좌표 변환용 사전 계산 룩업 인덱스
+"""
+
+from pathlib import Path
+from typing import Tuple
+import logging
+
+import numpy as np
+
+from .config import get_config
+from .raster_io import IsceRaster
+
+logger = logging.getLogger(__name__)
+
+
+class GeocodingIndex:
+    """경위도 → (row, col) 룩업 인덱스
+
+    지오코딩된 스택은 affine 변환만으로 계산하고, 레이더 좌표 스택은
+    lat.rdr/lon.rdr로부터 만든 규칙 격자 룩업 테이블을 사용합니다.
+    어느 경우든 조회는 배열 연산 한 번으로 끝납니다.
+    """
+
+    def __init__(
+        self,
+        grid: Tuple[float, float, float, float],
+        shape: Tuple[int, int],
+        rows: np.ndarray = None,
+        cols: np.ndarray = None
+    ):
+        """
+        Args:
+            grid: (lon0, dlon, lat0, dlat) 격자 원점(모서리)과 간격
+            shape: 대상 스택 크기 (length, width)
+            rows, cols: 룩업 테이블 (None이면 affine 격자 = 스택 자체)
+        """
+        self.grid = tuple(float(v) for v in grid)
+        self.shape = tuple(int(v) for v in shape)
+        self.rows = rows
+        self.cols = cols
+
+    @classmethod
+    def from_geotransform(cls, geotransform, shape: Tuple[int, int]) -> 'GeocodingIndex':
+        """지오코딩된 스택용 인덱스"""
+        return cls(geotransform, shape)
+
+    @classmethod
+    def from_geometry(
+        cls,
+        lat_path: str,
+        lon_path: str,
+        spacing: float = None,
+        block_rows: int = 256,
+        max_fill_distance: float = 2.0
+    ) -> 'GeocodingIndex':
+        """레이더 좌표 geometry(lat.rdr, lon.rdr)로 룩업 테이블 생성
+
+        행 블록 단위로 읽어 각 레이더 픽셀을 격자 셀에 기록한 뒤,
+        빈 셀은 max_fill_distance 셀 이내의 가장 가까운 값으로 채웁니다.
+
+        Args:
+            lat_path: 위도 래스터 (ISCE lat.rdr)
+            lon_path: 경도 래스터 (ISCE lon.rdr)
+            spacing: 격자 간격 (도, 기본값: 픽셀 간격 중앙값)
+            block_rows: 한 번에 읽을 행 수
+            max_fill_distance: 빈 셀 채움 최대 거리 (셀 단위)
+        """
+        from scipy import ndimage
+
+        lat_raster = IsceRaster(lat_path)
+        lon_raster = IsceRaster(lon_path)
+        length, width = lat_raster.shape
+
+        # 1차 패스: 범위와 간격 추정
+        lat_min, lat_max = np.inf, -np.inf
+        lon_min, lon_max = np.inf, -np.inf
+        steps = []
+        for (_, _, lat), (_, _, lon) in zip(
+            lat_raster.iter_row_blocks(block_rows), lon_raster.iter_row_blocks(block_rows)
+        ):
+            valid = (lat != 0) & (lon != 0)
+            if not valid.any():
+                continue
+            lat_min, lat_max = min(lat_min, lat[valid].min()), max(lat_max, lat[valid].max())
+            lon_min, lon_max = min(lon_min, lon[valid].min()), max(lon_max, lon[valid].max())
+            if spacing is None and lat.shape[0] > 1:
+                steps.append(np.nanmedian(np.abs(np.diff(lat[:, ::16], axis=0))))
+                steps.append(np.nanmedian(np.abs(np.diff(lon[::16], axis=1))))
+
+        if spacing is None:
+            spacing = float(np.nanmedian(steps)) if steps else 1e-3
+        grid = (float(lon_min), spacing, float(lat_max), -spacing)
+        ny = int(np.ceil((lat_max - lat_min) / spacing)) + 1
+        nx = int(np.ceil((lon_max - lon_min) / spacing)) + 1
+        logger.info(f"geocoding 인덱스 생성: {nx} x {ny} 격자 (간격 {spacing:.6f}°)")
+
+        rows = np.full((ny, nx), -1, dtype=np.int32)
+        cols = np.full((ny, nx), -1, dtype=np.int32)
+
+        # 2차 패스: 레이더 픽셀 → 격자 셀
+        for (row0, row1, lat), (_, _, lon) in zip(
+            lat_raster.iter_row_blocks(block_rows), lon_raster.iter_row_blocks(block_rows)
+        ):
+            valid = (lat != 0) & (lon != 0)
+            gy = ((grid[2] - lat[valid]) / spacing).astype(np.int64)
+            gx = ((lon[valid] - grid[0]) / spacing).astype(np.int64)
+            rr, cc = np.nonzero(valid)
+            rows[gy, gx] = rr.astype(np.int32) + row0
+            cols[gy, gx] = cc.astype(np.int32)
+
+        # 빈 셀은 가까운 셀로 채움
+        empty = rows < 0
+        if empty.any():
+            distance, (iy, ix) = ndimage.distance_transform_edt(empty, return_indices=True)
+            fill = empty & (distance <= max_fill_distance)
+            rows[fill] = rows[iy[fill], ix[fill]]
+            cols[fill] = cols[iy[fill], ix[fill]]
+
+        return cls(grid, (length, width), rows, cols)
+
+    @classmethod
+    def load(cls, path: str = None) -> 'GeocodingIndex':
+        """저장된 인덱스 읽기 (.npz)"""
+        if path is None:
+            path = cls.default_path()
+        data = np.load(path)
+        rows = data['rows'] if 'rows' in data else None
+        cols = data['cols'] if 'cols' in data else None
+        return cls(tuple(data['grid']), tuple(data['shape']), rows, cols)
+
+    @staticmethod
+    def default_path() -> Path:
+        """설정 파일의 stack.geocoding_index"""
+        config = get_config()
+        return config.project_root / config.get(
+            'stack', 'geocoding_index', default='./data/processed/geocoding_index.npz'
+        )
+
+    def save(self, path: str = None) -> Path:
+        """인덱스 저장 (.npz)"""
+        path = Path(path or self.default_path())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        arrays = {'grid': np.array(self.grid), 'shape': np.array(self.shape)}
+        if self.rows is not None:
+            arrays['rows'] = self.rows
+            arrays['cols'] = self.cols
+        np.savez_compressed(path, **arrays)
+        return path
+
+    def lookup(self, lons, lats) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """경위도 배열 → 픽셀 좌표
+
+        Args:
+            lons, lats: 경도/위도 (스칼라 또는 배열)
+
+        Returns:
+            (rows, cols, valid) - valid가 False인 위치의 rows/cols는 0
+        """
+        lons = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lon0, dlon, lat0, dlat = self.grid
+
+        gx = np.floor((lons - lon0) / dlon).astype(np.int64)
+        gy = np.floor((lats - lat0) / dlat).astype(np.int64)
+
+        if self.rows is None:
+            ny, nx = self.shape
+        else:
+            ny, nx = self.rows.shape
+        valid = (gx >= 0) & (gx < nx) & (gy >= 0) & (gy < ny)
+        gx = np.where(valid, gx, 0)
+        gy = np.where(valid, gy, 0)
+
+        if self.rows is None:
+            return gy, gx, valid
+
+        rows = self.rows[gy, gx].astype(np.int64)
+        cols = self.cols[gy, gx].astype(np.int64)
+        valid &= rows >= 0
+        return np.where(valid, rows, 0), np.where(valid, cols, 0), valid
@@ -0,0 +1,533 @@
+"""
+GeoTIFF Export Module
+최종 제품(변위, 속도, coherence, 속도 불확실성)을 Cloud-Optimized GeoTIFF로 내보내기
+
+CogWriter는 행 블록을 스트리밍으로 받아 타일(기본 512 x 512)로 자르고, 오버뷰 피라미드의
+_LevelWriter 체인(src/visualization.py)으로 2배 축소 레벨을 동시에 만듭니다. 타일 압축
+(부동소수 predictor + deflate)은 스레드 풀에서 병렬로 실행되며(zlib은 압축 중 GIL을 놓음),
+압축된 타일은 레벨별 임시 스풀 파일에 쌓입니다. 레벨당 최대 타일 높이만큼의 행만 메모리에 둡니다.
+
+close()에서 COG 배치로 최종 파일을 조립합니다.
+
+    헤더 → IFD(원본, 오버뷰 1, 2, …) → 가장 작은 오버뷰 타일 … → 원본 타일
+
+IFD가 모두 앞에 있고 타일은 작은 오버뷰부터 놓이므로 GIS 도구가 HTTP Range 요청 몇 번으로
+원하는 창과 축소 레벨만 읽을 수 있습니다. 모든 값이 nodata인 타일은 압축한 nodata 타일 하나를
+IFD 바로 뒤에 한 번만 쓰고 모두 그 위치를 가리킵니다 (sparse=True면 offset 0으로 비워 두지만
+PIL/libtiff 등 일부 리더가 읽지 못함). 4 GB를 넘으면 BigTIFF로 씁니다.
+GeoTIFF 태그는 EPSG:4326 (PixelIsArea)입니다.
+"""
+
+import argparse
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+import logging
+import math
+import struct
+import tempfile
+import zlib
+
+import numpy as np
+
+from .config import get_config
+from .raster_io import IsceRaster
+from .stack import StackStore
+from .visualization import _LevelWriter
+
+logger = logging.getLogger(__name__)
+
+# TIFF 필드 타입: (코드, 바이트 수, struct 형식)
+SHORT = (3, 2, 'H')
+LONG = (4, 4, 'I')
+DOUBLE = (12, 8, 'd')
+ASCII = (2, 1, 's')
+LONG8 = (16, 8, 'Q')
+
+EXPORT_PRODUCTS = ('velocity', 'displacement', 'coherence', 'uncertainty')
+
+
+def float_predictor(tile: np.ndarray) -> np.ndarray:
+    """TIFF 부동소수 predictor (Predictor=3)
+
+    행마다 float32를 big-endian 바이트 평면(MSB 평면 먼저)으로 재배열한 뒤 바이트 차분합니다.
+    """
+    rows, cols = tile.shape
+    planes = np.ascontiguousarray(tile, dtype='>f4').view(np.uint8).reshape(rows, cols, 4)
+    planes = planes.transpose(0, 2, 1).reshape(rows, 4 * cols)
+    encoded = planes.copy()
+    encoded[:, 1:] -= planes[:, :-1]
+    return encoded
+
+
+def encode_tile(tile: np.ndarray, level: int = 6) -> bytes:
+    """타일 하나 압축 (predictor + deflate, 워커 스레드에서 실행)"""
+    return zlib.compress(float_predictor(tile).tobytes(), level)
+
+
+def overview_sizes(width: int, length: int, tile_size: int) -> List[Tuple[int, int]]:
+    """원본과 오버뷰 레벨 크기 [(width, length), ...] (한 타일에 들어갈 때까지 2배 축소)"""
+    sizes = [(width, length)]
+    while max(sizes[-1]) > tile_size:
+        w, h = sizes[-1]
+        sizes.append(((w + 1) // 2, (h + 1) // 2))
+    return sizes
+
+
+class _CogLevel(_LevelWriter):
+    """COG 한 해상도 레벨의 행 버퍼 (타일을 압축 풀에 넘김)"""
+
+    def __init__(self, writer: 'CogWriter', band: int, level: int, next_level=None):
+        super().__init__(None, level, writer.tile_size, next_level)
+        self.writer = writer
+        self.band = band
+
+    def _write_tile(self, tile_col: int, tile: np.ndarray):
+        self.writer._submit(self.zoom, self.band, self.tile_row, tile_col, tile)
+
+
+class CogWriter:
+    """행 블록 스트리밍 Cloud-Optimized GeoTIFF 작성기 (float32, 밴드 분리 배치)
+
+    밴드마다 행을 위에서부터 순서대로 넘기면 되고, 여러 밴드를 번갈아 넘겨도 됩니다.
+
+    Example:
+        with CogWriter('velocity.tif', width, length, geotransform=gt) as cog:
+            for row0, row1, block in raster.iter_row_blocks(512):
+                cog.write_rows(row0, block)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        width: int,
+        length: int,
+        bands: int = 1,
+        geotransform: Tuple[float, float, float, float] = None,
+        nodata: float = np.nan,
+        tile_size: int = None,
+        compression_level: int = None,
+        workers: int = None,
+        descriptions: Sequence[str] = None,
+        units: str = None,
+        bigtiff: bool = None,
+        sparse: bool = None
+    ):
+        """
+        Args:
+            path: 출력 .tif 경로
+            width, length: 열/행 수
+            bands: 밴드 수
+            geotransform: (lon0, dlon, lat0, dlat) - 원점은 왼쪽 위 픽셀의 모서리
+            nodata: 무효값 (GDAL_NODATA 태그, 가장자리 타일 채움값)
+            tile_size: 타일 크기 (기본값: output.geotiff.tile_size, 16의 배수)
+            compression_level: deflate 레벨 (기본값: output.geotiff.compression_level)
+            workers: 압축 스레드 수 (기본값: output.geotiff.workers)
+            descriptions: 밴드 설명 (예: 날짜)
+            units: 값 단위 (예: 'mm/yr')
+            bigtiff: BigTIFF 여부 (기본값: 4 GB를 넘을 때만)
+            sparse: nodata 타일을 offset 0으로 비워 둘지 (기본값: output.geotiff.sparse, false면 공유 nodata 타일)
+        """
+        cog_config = get_config().get('output', 'geotiff', default={}) or {}
+        self.path = Path(path)
+        self.width, self.length, self.bands = width, length, bands
+        self.geotransform = geotransform
+        self.nodata = float(nodata)
+        self.tile_size = tile_size or cog_config.get('tile_size', 512)
+        if self.tile_size % 16:
+            raise ValueError(f"TIFF 타일 크기는 16의 배수여야 합니다: {self.tile_size}")
+        self.compression_level = compression_level or cog_config.get('compression_level', 6)
+        self.workers = workers or cog_config.get('workers', 4)
+        self.descriptions = list(descriptions) if descriptions is not None else None
+        self.units = units
+        self.bigtiff = bigtiff
+        self.sparse = sparse if sparse is not None else cog_config.get('sparse', False)
+
+        self.sizes = overview_sizes(width, length, self.tile_size)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._spools = [tempfile.TemporaryFile(dir=self.path.parent) for _ in self.sizes]
+        self._spool_size = [0] * len(self.sizes)
+        # (레벨, 타일 인덱스) → (스풀 오프셋, 바이트 수); 비어 있는 타일은 기록하지 않음
+        self._tiles: Dict[Tuple[int, int], Tuple[int, int]] = {}
+        self._pool = ThreadPoolExecutor(max_workers=self.workers)
+        self._pending: deque = deque()
+        self._chains: Dict[int, _CogLevel] = {}
+        self._next_row: Dict[int, int] = {}
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    # ------------------------------------------------------------------
+    # 스트리밍 입력
+    # ------------------------------------------------------------------
+    def _tiles_across(self, level: int) -> Tuple[int, int]:
+        width, length = self.sizes[level]
+        return -(-width // self.tile_size), -(-length // self.tile_size)
+
+    def _chain(self, band: int) -> _CogLevel:
+        if band not in self._chains:
+            if band in self._next_row:
+                raise ValueError(f"이미 닫은 밴드입니다: {band}")
+            chain = None
+            for level in reversed(range(len(self.sizes))):
+                chain = _CogLevel(self, band, level, next_level=chain)
+            self._chains[band] = chain
+            self._next_row[band] = 0
+        return self._chains[band]
+
+    def write_rows(self, row0: int, block: np.ndarray, band: int = 1):
+        """band의 row0부터 행 블록 기록 (밴드마다 위에서부터 이어서)"""
+        if not 1 <= band <= self.bands:
+            raise ValueError(f"밴드 번호 범위 초과: {band} (1~{self.bands})")
+        chain = self._chain(band)
+        if row0 != self._next_row[band]:
+            raise ValueError(f"밴드 {band}는 {self._next_row[band]}행부터 이어서 기록해야 합니다 (요청: {row0})")
+        block = np.asarray(block, dtype=np.float32)
+        if block.ndim != 2 or block.shape[1] != self.width:
+            raise ValueError(f"행 블록 크기가 맞지 않습니다: {block.shape} (폭 {self.width})")
+        self._next_row[band] += block.shape[0]
+        chain.push(block)
+        if self._next_row[band] >= self.length:
+            self.close_band(band)
+
+    def close_band(self, band: int):
+        """밴드 입력 종료 (남은 행과 오버뷰 타일을 내보내고 버퍼 해제)"""
+        chain = self._chains.pop(band, None)
+        if chain is None:
+            return
+        if self._next_row[band] != self.length:
+            raise ValueError(f"밴드 {band}의 행이 부족합니다: {self._next_row[band]}/{self.length}")
+        chain.flush()
+
+    def _submit(self, level: int, band: int, tile_row: int, tile_col: int, tile: np.ndarray):
+        if np.isnan(self.nodata):
+            empty = np.isnan(tile).all()
+        else:
+            empty = (tile == self.nodata).all()
+        if empty:
+            return
+        if tile.shape != (self.tile_size, self.tile_size):
+            padded = np.full((self.tile_size, self.tile_size), self.nodata, dtype=np.float32)
+            padded[:tile.shape[0], :tile.shape[1]] = tile
+            tile = padded
+        across, down = self._tiles_across(level)
+        index = (band - 1) * across * down + tile_row * across + tile_col
+        self._pending.append((level, index, self._pool.submit(encode_tile, tile, self.compression_level)))
+        # 압축 대기 타일 수를 제한해 메모리 유지 (먼저 넣은 타일부터 스풀에 기록)
+        while self._pending and (len(self._pending) > 2 * self.workers or self._pending[0][2].done()):
+            self._drain_one()
+
+    def _drain_one(self):
+        level, index, future = self._pending.popleft()
+        data = future.result()
+        spool = self._spools[level]
+        spool.write(data)
+        self._tiles[(level, index)] = (self._spool_size[level], len(data))
+        self._spool_size[level] += len(data)
+
+    # ------------------------------------------------------------------
+    # 조립
+    # ------------------------------------------------------------------
+    def _tags(self, level: int, offsets: List[int], counts: List[int], big: bool) -> List[tuple]:
+        """IFD 태그 목록 [(태그, 타입, 값 목록)] (태그 번호 순)"""
+        width, length = self.sizes[level]
+        offset_type = LONG8 if big else LONG
+        tags = [
+            (254, LONG, [1 if level else 0]),            # NewSubfileType (오버뷰 = reduced resolution)
+            (256, LONG, [width]),
+            (257, LONG, [length]),
+            (258, SHORT, [32] * self.bands),             # BitsPerSample
+            (259, SHORT, [8]),                           # Compression: Deflate
+            (262, SHORT, [1]),                           # Photometric: BlackIsZero
+            (277, SHORT, [self.bands]),                  # SamplesPerPixel
+            (284, SHORT, [2 if self.bands > 1 else 1]),  # PlanarConfiguration (밴드 분리)
+            (317, SHORT, [3]),                           # Predictor: floating point
+            (322, SHORT, [self.tile_size]),
+            (323, SHORT, [self.tile_size]),
+            (324, offset_type, offsets),                 # TileOffsets
+            (325, offset_type, counts),                  # TileByteCounts
+            (339, SHORT, [3] * self.bands),              # SampleFormat: IEEE float
+        ]
+        if level == 0 and self.geotransform is not None:
+            lon0, dlon, lat0, dlat = self.geotransform
+            tags += [
+                (33550, DOUBLE, [dlon, -dlat, 0.0]),                 # ModelPixelScale
+                (33922, DOUBLE, [0.0, 0.0, 0.0, lon0, lat0, 0.0]),   # ModelTiepoint (왼쪽 위 모서리)
+                (34735, SHORT, [
+                    1, 1, 0, 3,            # GeoKeyDirectory 헤더 (키 3개)
+                    1024, 0, 1, 2,         # GTModelType: Geographic
+                    1025, 0, 1, 1,         # GTRasterType: PixelIsArea
+                    2048, 0, 1, 4326,      # GeographicType: EPSG:4326
+                ]),
+            ]
+        if level == 0 and (self.descriptions or self.units):
+            tags.append((42112, ASCII, [self._gdal_metadata().encode('utf-8') + b'\0']))
+        nodata = 'nan' if np.isnan(self.nodata) else repr(self.nodata)
+        tags.append((42113, ASCII, [nodata.encode('ascii') + b'\0']))   # GDAL_NODATA
+        return sorted(tags, key=lambda tag: tag[0])
+
+    def _gdal_metadata(self) -> str:
+        """GDAL_METADATA XML (밴드 설명, 단위)"""
+        items = []
+        for band in range(self.bands):
+            if self.descriptions:
+                items.append(f'<Item name="DESCRIPTION" sample="{band}" role="description">{self.descriptions[band]}</Item>')
+            if self.units:
+                items.append(f'<Item name="UNITTYPE" sample="{band}" role="unittype">{self.units}</Item>')
+        return '<GDALMetadata>' + ''.join(items) + '</GDALMetadata>'
+
+    @staticmethod
+    def _ifd_bytes(tags: List[tuple], ifd_offset: int, next_ifd: int, big: bool) -> bytes:
+        """IFD 하나와 그 뒤에 붙는 긴 태그 값 영역"""
+        entry_format, count_format, inline = ('<HHQ', '<Q', 8) if big else ('<HHI', '<I', 4)
+        header = struct.pack('<Q' if big else '<H', len(tags))
+        entries_size = len(header) + len(tags) * (inline + 12 if big else 12) + inline
+        extra = b''
+        entries = b''
+        for tag, (code, size, fmt), values in tags:
+            if fmt == 's':
+                raw = values[0]
+                count = len(raw)
+            else:
+                raw = struct.pack(f'<{len(values)}{fmt}', *values)
+                count = len(values)
+            entries += struct.pack(entry_format, tag, code, count)
+            if len(raw) <= inline:
+                entries += raw.ljust(inline, b'\0')
+            else:
+                entries += struct.pack(count_format, ifd_offset + entries_size + len(extra))
+                extra += raw + b'\0' * (len(raw) % 2)
+        return header + entries + struct.pack(count_format, next_ifd) + extra
+
+    def close(self) -> Path:
+        """남은 타일을 압축하고 COG 배치로 최종 파일 기록
+
+        Returns:
+            출력 경로
+        """
+        if self._closed:
+            return self.path
+        for band in list(self._chains):
+            self.close_band(band)
+        missing = [band for band in range(1, self.bands + 1) if band not in self._next_row]
+        if missing:
+            self.abort()
+            raise ValueError(f"기록하지 않은 밴드가 있습니다: {missing}")
+        while self._pending:
+            self._drain_one()
+        self._pool.shutdown()
+
+        n_tiles = [self.bands * math.prod(self._tiles_across(level)) for level in range(len(self.sizes))]
+        # 비어 있는 타일이 가리킬 공유 nodata 타일 (sparse면 offset 0)
+        empty_tile = b''
+        if not self.sparse and len(self._tiles) < sum(n_tiles):
+            empty_tile = encode_tile(
+                np.full((self.tile_size, self.tile_size), self.nodata, dtype=np.float32), self.compression_level
+            )
+        data_size = sum(self._spool_size) + len(empty_tile)
+        big = self.bigtiff
+        if big is None:
+            big = data_size + 64 * sum(n_tiles) + 65536 >= 2 ** 32
+
+        # 1) 태그 값 크기로 IFD 위치 계산 (오프셋 값은 크기에 영향 없음)
+        header_size = 16 if big else 8
+        ifd_offsets, position = [], header_size
+        for level, count in enumerate(n_tiles):
+            ifd_offsets.append(position)
+            position += len(self._ifd_bytes(self._tags(level, [0] * count, [0] * count, big), position, 0, big))
+
+        # 2) 타일 데이터 위치: 공유 nodata 타일, 가장 작은 오버뷰부터
+        empty_offset = position if empty_tile else 0
+        position += len(empty_tile)
+        data_start, tile_offsets = {}, {}
+        for level in reversed(range(len(self.sizes))):
+            data_start[level] = position
+            for index in range(n_tiles[level]):
+                if (level, index) in self._tiles:
+                    tile_offsets[(level, index)] = position
+                    position += self._tiles[(level, index)][1]
+
+        with open(self.path, 'wb') as f:
+            if big:
+                f.write(b'II' + struct.pack('<HHHQ', 43, 8, 0, ifd_offsets[0]))
+            else:
+                f.write(b'II' + struct.pack('<HI', 42, ifd_offsets[0]))
+            for level, count in enumerate(n_tiles):
+                offsets = [tile_offsets.get((level, i), empty_offset) for i in range(count)]
+                counts = [self._tiles.get((level, i), (0, len(empty_tile)))[1] for i in range(count)]
+                next_ifd = ifd_offsets[level + 1] if level + 1 < len(n_tiles) else 0
+                f.write(self._ifd_bytes(self._tags(level, offsets, counts, big), ifd_offsets[level], next_ifd, big))
+            f.write(empty_tile)
+            # 스풀에서 타일 인덱스 순서로 복사 (행 우선, 밴드별)
+            for level in reversed(range(len(self.sizes))):
+                spool = self._spools[level]
+                for index in range(n_tiles[level]):
+                    if (level, index) in self._tiles:
+                        offset, size = self._tiles[(level, index)]
+                        spool.seek(offset)
+                        f.write(spool.read(size))
+                spool.close()
+        self._closed = True
+
+        logger.info(
+            f"COG 기록: {self.path.name} ({self.width} x {self.length}, 밴드 {self.bands}개, "
+            f"오버뷰 {len(self.sizes) - 1}개, {position / 1024 ** 2:.1f} MB{', BigTIFF' if big else ''})"
+        )
+        return self.path
+
+    def abort(self):
+        """작성 중단 (임시 스풀 정리)"""
+        for future in (item[2] for item in self._pending):
+            future.cancel()
+        self._pending.clear()
+        self._pool.shutdown()
+        for spool in self._spools:
+            spool.close()
+        self._closed = True
+
+
+class CogExporter:
+    """스택 최종 제품을 COG로 내보내기
+
+    Example:
+        with StackStore.open() as store:
+            paths = CogExporter(store).run()
+        # paths['velocity'] = outputs/geotiff/velocity.tif
+    """
+
+    def __init__(self, store: StackStore, output_dir: str = None):
+        """
+        Args:
+            store: SBAS 시계열이 있는 StackStore
+            output_dir: 출력 디렉토리 (기본값: output.geotiff.output_dir)
+        """
+        config = get_config()
+        self.store = store
+        self.output_dir = Path(output_dir or config.project_root / config.get(
+            'output', 'geotiff', 'output_dir', default='./outputs/geotiff'
+        ))
+        self.tile_size = config.get('output', 'geotiff', 'tile_size', default=512)
+        self.uncertainty_path = config.project_root / config.get(
+            'uncertainty', 'output', default='./outputs/velocity_std.geo'
+        )
+        self.depth = int(store.h5.attrs['chunk_shape'][0])
+
+    def _writer(self, name: str, bands: int = 1, **kwargs) -> CogWriter:
+        return CogWriter(
+            self.output_dir / f"{name}.tif", self.store.width, self.store.length, bands,
+            geotransform=self.store.geotransform, **kwargs
+        )
+
+    def _row_blocks(self):
+        for row0 in range(0, self.store.length, self.tile_size):
+            yield row0, slice(row0, min(row0 + self.tile_size, self.store.length))
+
+    def velocity(self) -> Path:
+        """SBAS 선형 속도 (mm/yr)"""
+        dataset = self.store.h5['timeseries/velocity']
+        with self._writer('velocity', units='mm/yr') as cog:
+            for row0, rows in self._row_blocks():
+                cog.write_rows(row0, dataset[rows])
+        return cog.path
+
+    def displacement(self) -> Path:
+        """날짜별 누적 변위 (mm, 밴드 = 날짜) - 청크 깊이만큼의 밴드를 한 번에 읽어 스트리밍"""
+        dataset = self.store.h5['timeseries/displacement']
+        dates = self.store.dates
+        with self._writer('displacement', bands=len(dates), descriptions=dates, units='mm') as cog:
+            for start in range(0, len(dates), self.depth):
+                stop = min(start + self.depth, len(dates))
+                for row0, rows in self._row_blocks():
+                    block = dataset[start:stop, rows, :]
+                    for offset, layer in enumerate(block):
+                        cog.write_rows(row0, layer, band=start + offset + 1)
+        return cog.path
+
+    def coherence(self) -> Path:
+        """폐합 검사를 통과한 간섭도의 평균 coherence"""
+        n_ifgs = len(self.store.pairs)
+        keep = np.ones(n_ifgs, dtype=bool)
+        if 'qc/flagged' in self.store.h5:
+            flagged = self.store.h5['qc/flagged'][:]
+            keep[:len(flagged)] &= ~flagged
+        with self._writer('coherence') as cog:
+            for row0, rows in self._row_blocks():
+                window = (rows, slice(0, self.store.width))
+                total = np.zeros((rows.stop - rows.start, self.store.width))
+                n = np.zeros_like(total)
+                for start in range(0, n_ifgs, self.depth):
+                    use = keep[start:start + self.depth]
+                    if not use.any():
+                        continue
+                    coherence = self.store.read_stack('interferograms/coherence', window, index=slice(start, start + self.depth))
+                    coherence = coherence[use]
+                    finite = np.isfinite(coherence)
+                    total += np.where(finite, coherence, 0.0).sum(axis=0)
+                    n += finite.sum(axis=0)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    cog.write_rows(row0, np.where(n > 0, total / n, np.nan))
+        return cog.path
+
+    def uncertainty(self) -> Path:
+        """부트스트랩 속도 표준편차 (mm/yr, src/uncertainty.py 결과)"""
+        raster = IsceRaster(self.uncertainty_path)
+        if raster.shape != self.store.shape:
+            raise ValueError(f"속도 표준편차 래스터 크기가 스택과 다릅니다: {raster.shape} vs {self.store.shape}")
+        with self._writer('velocity_std', units='mm/yr') as cog:
+            for row0, _, block in raster.iter_row_blocks(self.tile_size):
+                cog.write_rows(row0, block)
+        return cog.path
+
+    def available(self) -> List[str]:
+        """내보낼 수 있는 제품"""
+        products = []
+        if 'timeseries/velocity' in self.store.h5:
+            products += ['velocity', 'displacement']
+        if len(self.store.pairs):
+            products.append('coherence')
+        if self.uncertainty_path.exists():
+            products.append('uncertainty')
+        return products
+
+    def run(self, products: Sequence[str] = None) -> Dict[str, Path]:
+        """제품별 COG 기록
+
+        Args:
+            products: 내보낼 제품 (기본값: 있는 제품 전체, EXPORT_PRODUCTS 중)
+
+        Returns:
+            {제품: 경로}
+        """
+        if products is None:
+            products = self.available()
+        unknown = sorted(set(products) - set(EXPORT_PRODUCTS))
+        if unknown:
+            raise ValueError(f"지원하지 않는 제품: {', '.join(unknown)} (가능: {', '.join(EXPORT_PRODUCTS)})")
+        return {product: getattr(self, product)() for product in products}
+
+
+def main():
+    """메인 실행 함수"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="최종 제품 Cloud-Optimized GeoTIFF 내보내기")
+    parser.add_argument('products', nargs='*', help=f"내보낼 제품 (기본값: 전체, {', '.join(EXPORT_PRODUCTS)})")
+    parser.add_argument('--store', default=None, help='스택 HDF5 경로')
+    parser.add_argument('--output-dir', default=None, help='출력 디렉토리 (기본값: output.geotiff.output_dir)')
+    args = parser.parse_args()
+
+    with StackStore.open(args.store) as store:
+        paths = CogExporter(store, args.output_dir).run(args.products or None)
+    for product, path in paths.items():
+        print(f"{product}: {path}")
+
+
+if __name__ == "__main__":
+    main()
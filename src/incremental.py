@@ -0,0 +1,411 @@
+"""
+Incremental Update Module
+새 Sentinel-1 촬영분만 반영하는 증분 스택 갱신
+
+흐름:
+    카탈로그 동기화 (새 장면만) → 새 날짜가 만드는 간섭쌍(네트워크 간선)만 선정
+    → (quick-look 선별) → 해당 간섭쌍만 topsApp 처리 → 스택 적재 → (유효 마스크 생성) → (대류권 보정) → 기준점 정규화 → 위상 폐합 검사 → SBAS 정규방정식에 누적 후 재풀이
+
+run()은 한 스택(catalog.stack 또는 orbit_direction에서 가장 큰 스택)만, run_stacks()는
+카탈로그의 모든 스택(방향, relative orbit, 프레임 구성)을 스택별 디렉토리에서 함께 갱신합니다.
+"""
+
+import argparse
+import copy
+import json
+from dataclasses import replace
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Sequence, Tuple
+import logging
+
+import pandas as pd
+from rich.console import Console
+from rich.table import Table
+
+from .atmosphere import TroposphericCorrection
+from .catalog import SceneCatalog
+from .closure import ClosureQC
+from .config import get_config, use_config
+from .executor import create_executor
+from .insar_processing import PairSpec, ingest_interferogram, ingest_los_geometry, pair_products
+from .masking import ValidityMask
+from .raster_io import IsceRaster
+from .raw_store import RawDataStore, scene_name
+from .referencing import ReferencePointNormalizer
+from .stack import StackStore
+from .time_series import IncrementalSBAS
+from .triage import PairTriage
+from .utils import create_interferogram_pairs
+
+console = Console()
+logger = logging.getLogger(__name__)
+
+
+def plan_new_pairs(
+    existing_dates: Sequence[str],
+    new_dates: Sequence[str],
+    max_days: int,
+    min_days: int = 0,
+    existing_pairs: Sequence[Sequence[str]] = ()
+) -> List[tuple]:
+    """새 날짜가 추가되며 생기는 간섭쌍만 반환
+
+    Args:
+        existing_dates: 이미 스택에 있는 날짜 ('YYYYMMDD')
+        new_dates: 새로 들어온 날짜
+        max_days: 최대 시간 기선
+        min_days: 최소 시간 기선
+        existing_pairs: 이미 처리된 간섭쌍
+
+    Returns:
+        [(reference, secondary), ...] 날짜순
+    """
+    new_dates = set(new_dates) - set(existing_dates)
+    all_dates = sorted(set(existing_dates) | new_dates)
+    parsed = [datetime.strptime(d, '%Y%m%d') for d in all_dates]
+    done = {tuple(p) for p in existing_pairs}
+
+    pairs = []
+    for reference, secondary in create_interferogram_pairs(parsed, max_temporal_baseline=max_days):
+        pair = (reference.strftime('%Y%m%d'), secondary.strftime('%Y%m%d'))
+        if (secondary - reference).days < min_days or pair in done:
+            continue
+        if pair[0] in new_dates or pair[1] in new_dates:
+            pairs.append(pair)
+    return pairs
+
+
+def safe_path(raw_dir: Path, title: str, config=None) -> Path:
+    """장면의 로컬 입력 경로
+
+    burst 부분 다운로드 모드면 .SAFE 디렉토리 (이미 받은 전체 zip이 있으면 그것을 사용)
+    """
+    config = config or get_config()
+    zip_path = Path(raw_dir) / f"{title}.zip"
+    if zip_path.exists() or not config.get('burst_subset', 'enabled', default=False):
+        return zip_path
+    return Path(raw_dir) / f"{title}.SAFE"
+
+
+class IncrementalUpdater:
+    """증분 스택 갱신 실행기"""
+
+    def __init__(self, config_path: str = None, retriever=None):
+        """
+        Args:
+            config_path: 설정 파일 경로
+            retriever: Sentinel1Retriever (기본값: 새로 생성)
+        """
+        self.config = get_config(config_path)
+        if retriever is None:
+            from .data_retrieval import Sentinel1Retriever
+            retriever = Sentinel1Retriever(config_path)
+        self.retriever = retriever
+        self.catalog = SceneCatalog()
+        self.raw_store = RawDataStore()
+        self.raw_dir = self.raw_store.raw_dir
+
+    def _stack_pairs(self) -> List[tuple]:
+        path = StackStore.default_path()
+        if not path.exists():
+            return []
+        with StackStore.open(path) as store:
+            return store.pairs
+
+    def _safe_path(self, title: str) -> Path:
+        return safe_path(self.raw_dir, title, self.config)
+
+    def _ensure_downloaded(self, titles: List[str]):
+        """처리에 필요한 장면 중 로컬에 없는 것만 다운로드"""
+        missing = [t for t in titles if not self._safe_path(t).exists()]
+        if not missing:
+            return
+        # 카탈로그 행에 다운로드 URL이 있으므로 재검색 없이 바로 다운로드
+        products_df = self.catalog.scenes[self.catalog.scenes['title'].isin(missing)]
+        others = sorted(set(missing) - set(products_df['title']))
+        if others:
+            refetched = self.retriever.search_granules(others)
+            products_df = pd.concat([products_df, refetched], ignore_index=True)
+        checksums = dict(zip(products_df['title'], products_df['md5sum']))
+        for path in self.retriever.download_products(products_df):
+            self.raw_store.register(path, checksums.get(scene_name(path)))
+
+    def plan(self, new_scenes) -> List[PairSpec]:
+        """새 장면으로 처리할 간섭쌍 선정"""
+        scenes = self.catalog.stack_scenes(name=self.config.get('catalog', 'stack'))
+        if scenes.empty:
+            return []
+        by_date = SceneCatalog.scenes_by_date(scenes)
+        new_titles = set(new_scenes['title']) if not new_scenes.empty else set()
+        new_dates = {d for d, titles in by_date.items() if new_titles & set(titles)}
+
+        existing_pairs = self._stack_pairs()
+        existing_dates = sorted({d for pair in existing_pairs for d in pair})
+        if not existing_dates:
+            # 스택이 비어 있으면 모든 날짜가 새 날짜
+            new_dates = set(by_date)
+
+        pairs = plan_new_pairs(
+            existing_dates,
+            new_dates,
+            max_days=self.config.get('insar', 'temporal_baseline', 'max_days', default=60),
+            min_days=self.config.get('insar', 'temporal_baseline', 'min_days', default=0),
+            existing_pairs=existing_pairs
+        )
+        # 새 날짜와 무관해 다시 선정되지 않는 이전 실패 간섭쌍을 함께 처리
+        done = {tuple(p) for p in existing_pairs} | set(pairs)
+        retry = [
+            pair for pair in self.failed_pairs()
+            if pair not in done and pair[0] in by_date and pair[1] in by_date
+        ]
+        if retry:
+            logger.info(f"이전에 실패한 간섭쌍 {len(retry)}개 다시 처리")
+            pairs = sorted(pairs + retry)
+        return [
+            PairSpec(
+                reference=reference,
+                secondary=secondary,
+                reference_safes=[str(self._safe_path(t)) for t in by_date[reference]],
+                secondary_safes=[str(self._safe_path(t)) for t in by_date[secondary]],
+            )
+            for reference, secondary in pairs
+        ]
+
+    @property
+    def failed_path(self) -> Path:
+        """topsApp 처리에 실패한 간섭쌍 기록 (스택별 처리 디렉토리)"""
+        return self.config.get_path('processed_dir') / 'failed_pairs.json'
+
+    def _load_failed(self) -> Dict[str, dict]:
+        if not self.failed_path.exists():
+            return {}
+        with open(self.failed_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def failed_pairs(self) -> List[tuple]:
+        """다시 처리할 실패 간섭쌍 (executor.failed_pair_runs번 실행 모두 실패하면 제외)"""
+        limit = self.config.get('executor', 'failed_pair_runs', default=3)
+        return [
+            (entry['reference'], entry['secondary'])
+            for entry in self._load_failed().values()
+            if entry['runs'] < limit
+        ]
+
+    def record_result(self, pair: PairSpec, ok: bool, error: str = None):
+        """간섭쌍 처리 결과 기록 (실패는 다음 실행의 plan()에서 다시 선정, 성공하면 기록 삭제)"""
+        failed = self._load_failed()
+        if ok:
+            if failed.pop(pair.name, None) is None:
+                return
+        else:
+            entry = failed.setdefault(pair.name, {'reference': pair.reference, 'secondary': pair.secondary, 'runs': 0})
+            entry['runs'] += 1
+            entry['error'] = error
+            if entry['runs'] >= self.config.get('executor', 'failed_pair_runs', default=3):
+                logger.error(f"간섭쌍 {pair.name}이(가) {entry['runs']}번 실행 모두 실패해 더 이상 다시 처리하지 않습니다")
+        self.failed_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.failed_path, 'w', encoding='utf-8') as f:
+            json.dump(failed, f, indent=2, ensure_ascii=False)
+
+    def _needs_mask(self, store: StackStore) -> bool:
+        """유효 마스크가 켜져 있고 아직 없으며 평균 coherence를 낼 만큼 간섭도가 쌓였는지"""
+        if not self.config.get('mask', 'enabled', default=True) or ValidityMask.exists(store):
+            return False
+        return len(store.pairs) >= self.config.get('mask', 'min_interferograms', default=5)
+
+    def run(self, dry_run: bool = False) -> Dict[str, int]:
+        """증분 갱신 실행
+
+        Args:
+            dry_run: True면 새 장면/간섭쌍만 보고하고 처리하지 않음
+
+        Returns:
+            {'new_scenes': n, 'new_pairs': n, 'rejected': n, 'processed': n, 'failed': n}
+        """
+        new_scenes = self.catalog.sync(self.retriever)
+        pairs = self.plan(new_scenes)
+        summary = {'new_scenes': len(new_scenes), 'new_pairs': len(pairs), 'rejected': 0, 'processed': 0, 'failed': 0}
+
+        if dry_run:
+            for pair in pairs:
+                console.print(f"  [cyan]{pair.name}[/cyan]")
+            return summary
+        self.catalog.save()
+        if pairs and self.config.get('triage', 'enabled', default=False):
+            # 다운로드/topsApp 전에 quick-look coherence로 제외하고 유망한 쌍부터 처리
+            selected = PairTriage(self.catalog, session=getattr(self.retriever, 'session', None)).select(pairs)
+            summary['rejected'] = len(pairs) - len(selected)
+            pairs = selected
+        if not pairs:
+            return summary
+
+        self._prepare(pairs)
+        # topsApp은 실행기(executor.backend)에 분배하고, 스택 적재는 이 프로세스에서 끝나는 순서대로
+        summary['processed'] = self.integrate(self._execute(pairs, summary))
+        self.raw_store.enforce_budget()
+        return summary
+
+    def _prepare(self, pairs: List[PairSpec]):
+        """입력 장면 다운로드 후 처리 전까지 예산 초과로 삭제되지 않도록 고정"""
+        self.raw_store.scan()
+        titles = sorted({scene_name(p) for pair in pairs for p in pair.reference_safes + pair.secondary_safes})
+        self._ensure_downloaded(titles)
+        for pair in pairs:
+            self.raw_store.pin(pair.reference_safes + pair.secondary_safes, owner=pair.key)
+        self.raw_store.touch([p for pair in pairs for p in pair.reference_safes + pair.secondary_safes])
+
+    def for_stack(self, name: str) -> 'IncrementalUpdater':
+        """스택 하나의 갱신기 (카탈로그/원시 데이터 저장소/검색기는 공유, use_config 블록 안에서만 사용)"""
+        updater = copy.copy(self)
+        updater.config = self.config.for_stack(name)
+        return updater
+
+    def run_stacks(self, dry_run: bool = False) -> Dict[str, Dict[str, int]]:
+        """카탈로그의 모든 스택 증분 갱신
+
+        스택마다 간섭쌍을 선정한 뒤 모든 스택의 간섭쌍을 한 실행기에 함께 분배하고
+        (워커는 스택별 설정으로 실행), 끝난 간섭쌍은 스택별 디렉토리의 스택에 적재합니다.
+
+        Args:
+            dry_run: True면 스택별 새 간섭쌍만 보고하고 처리하지 않음
+
+        Returns:
+            {스택 이름: {'new_scenes', 'new_pairs', 'rejected', 'processed', 'failed'}}
+        """
+        new_scenes = self.catalog.sync(self.retriever)
+        new_titles = set(new_scenes['title']) if not new_scenes.empty else set()
+        updaters, pairs, summary = {}, {}, {}
+        for stack in self.catalog.stacks():
+            updater = updaters[stack.name] = self.for_stack(stack.name)
+            with use_config(updater.config):
+                pairs[stack.name] = [replace(pair, stack=stack.name) for pair in updater.plan(new_scenes)]
+            summary[stack.name] = {
+                'new_scenes': int(stack.scenes['title'].isin(new_titles).sum()),
+                'new_pairs': len(pairs[stack.name]), 'rejected': 0, 'processed': 0, 'failed': 0,
+            }
+
+        if dry_run:
+            for name, stack_pairs in pairs.items():
+                for pair in stack_pairs:
+                    console.print(f"  [cyan]{pair.name}[/cyan] → {name}")
+            return summary
+        self.catalog.save()
+        if self.config.get('triage', 'enabled', default=False):
+            session = getattr(self.retriever, 'session', None)
+            for name, updater in updaters.items():
+                if pairs[name]:
+                    with use_config(updater.config):
+                        selected = PairTriage(self.catalog, session=session).select(pairs[name])
+                    summary[name]['rejected'] = len(pairs[name]) - len(selected)
+                    pairs[name] = selected
+
+        all_pairs = [pair for stack_pairs in pairs.values() for pair in stack_pairs]
+        if not all_pairs:
+            return summary
+        logger.info(f"topsApp 처리 {len(all_pairs)}개 (스택 {sum(1 for p in pairs.values() if p)}개)")
+        self._prepare(all_pairs)
+
+        finished: Dict[str, List[Tuple[PairSpec, Path]]] = {name: [] for name in updaters}
+        configs = {name: updater.config for name, updater in updaters.items()}
+        for result in create_executor().run(all_pairs, configs=configs):
+            pair = result.pair
+            # 실패한 간섭쌍은 기록해 두고 다음 실행에서 다시 선정하므로 고정은 바로 해제
+            self.raw_store.unpin(pair.key)
+            updaters[pair.stack].record_result(pair, result.ok, result.error)
+            if not result.ok:
+                logger.error(f"간섭쌍 처리 실패 ({pair.key}, {result.node}): {result.error}")
+                summary[pair.stack]['failed'] += 1
+                continue
+            finished[pair.stack].append((pair, result.work_dir))
+
+        for name, updater in updaters.items():
+            if finished[name]:
+                with use_config(updater.config):
+                    summary[name]['processed'] = updater.integrate(finished[name])
+        self.raw_store.enforce_budget()
+        return summary
+
+    def _execute(self, pairs: List[PairSpec], summary: Dict[str, int]) -> Iterator[Tuple[PairSpec, Path]]:
+        """실행기 결과 중 성공한 간섭쌍을 끝나는 순서대로 반환 (실패는 summary에 집계)"""
+        for result in create_executor().run(pairs):
+            pair = result.pair
+            # 실패한 간섭쌍은 기록해 두고 다음 실행에서 다시 선정하므로 고정은 바로 해제
+            self.raw_store.unpin(pair.key)
+            self.record_result(pair, result.ok, result.error)
+            if not result.ok:
+                logger.error(f"간섭쌍 처리 실패 ({pair.name}, {result.node}): {result.error}")
+                summary['failed'] += 1
+                continue
+            yield pair, result.work_dir
+
+    def integrate(self, finished: Iterable[Tuple[PairSpec, Path]]) -> int:
+        """처리된 간섭쌍을 스택에 적재하고 후속 단계(마스크, 대류권, 기준점, 폐합 검사, SBAS) 실행
+
+        finished는 끝나는 순서대로 소비하므로 실행기 결과를 그대로 넘기면 처리와 적재가 겹칩니다.
+
+        Args:
+            finished: (간섭쌍, 지오코딩 제품이 있는 작업 디렉토리)
+
+        Returns:
+            적재한 간섭쌍 수
+        """
+        store_path = StackStore.default_path()
+        store = StackStore.open(store_path, 'r+') if store_path.exists() else None
+        new_indices = []
+        try:
+            for pair, work_dir in finished:
+                if store is None:
+                    unw = IsceRaster(pair_products(work_dir)['unwrapped_phase'])
+                    store = StackStore.create(unw.length, unw.width, store_path, unw.geotransform)
+                new_indices.append(ingest_interferogram(store, pair, work_dir))
+                ingest_los_geometry(store, work_dir)
+
+            if new_indices and self._needs_mask(store):
+                ValidityMask.build(store)
+            if new_indices and self.config.get('atmosphere', 'enabled', default=False):
+                TroposphericCorrection(store).apply(new_indices)
+            if new_indices:
+                ReferencePointNormalizer(store).apply(new_indices)
+                # 폐합 검사로 새로 제외된 간섭도 중 이미 누적된 것은 정규방정식에서 제거
+                flagged = ClosureQC(store).run(new_indices)
+                sbas = IncrementalSBAS(store)
+                sbas.remove(flagged)
+                # 새 간섭도뿐 아니라 제외가 풀렸거나 이전 실행에서 누적되지 못한 간섭도도 함께 반영
+                sbas.accumulate()
+                sbas.solve()
+        finally:
+            if store is not None:
+                store.close()
+        return len(new_indices)
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="새 촬영분만 반영하는 증분 스택 갱신")
+    parser.add_argument('--dry-run', action='store_true', help='처리할 간섭쌍만 출력')
+    parser.add_argument('--all-stacks', action='store_true',
+                        help='카탈로그의 모든 스택(방향, relative orbit, 프레임 구성)을 스택별 디렉토리에서 갱신')
+    args = parser.parse_args()
+
+    console.print("[bold cyan]증분 스택 갱신[/bold cyan]\n")
+    if not args.all_stacks:
+        summary = IncrementalUpdater().run(dry_run=args.dry_run)
+        console.print(
+            f"\n[green]새 장면 {summary['new_scenes']}개, 새 간섭쌍 {summary['new_pairs']}개, "
+            f"제외 {summary['rejected']}개, 처리 {summary['processed']}개, 실패 {summary['failed']}개[/green]"
+        )
+        return
+
+    summary = IncrementalUpdater().run_stacks(dry_run=args.dry_run)
+    table = Table(title="스택별 갱신 결과" + (" (dry-run)" if args.dry_run else ""))
+    table.add_column("스택", style="cyan")
+    for column in ("새 장면", "새 간섭쌍", "제외", "처리", "실패"):
+        table.add_column(column, justify="right")
+    for name, counts in summary.items():
+        table.add_row(name, *(str(counts[key]) for key in ('new_scenes', 'new_pairs', 'rejected', 'processed', 'failed')))
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+"""
+InSAR Processing Module
+ISCE2 topsApp.py 기반 간섭쌍 처리 및 결과의 스택 적재
+"""
+
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List
+import logging
+
+import numpy as np
+
+from .config import get_config
+from .raster_io import IsceRaster
+from .stack import StackStore
+
+logger = logging.getLogger(__name__)
+
+
+# topsApp에서 지오코딩할 제품 (merged/ 기준, 결과는 <name>.geo)
+GEOCODE_PRODUCTS = {
+    'unwrapped_phase': 'filt_topophase.unw',
+    'coherence': 'phsig.cor',
+    'los': 'los.rdr',
+}
+
+
+@dataclass
+class PairSpec:
+    """간섭쌍 처리 단위"""
+    reference: str                                   # YYYYMMDD
+    secondary: str                                   # YYYYMMDD
+    reference_safes: List[str] = field(default_factory=list)
+    secondary_safes: List[str] = field(default_factory=list)
+    stack: str = ''                                  # 처리 스택 이름 (여러 스택을 한 실행기로 처리할 때)
+
+    @property
+    def name(self) -> str:
+        return f"{self.reference}_{self.secondary}"
+
+    @property
+    def key(self) -> str:
+        """스택 간에도 겹치지 않는 식별자"""
+        return f"{self.stack}/{self.name}" if self.stack else self.name
+
+
+def get_aoi_bbox(config=None) -> List[float]:
+    """AOI를 ISCE bbox 형식 [min_lat, max_lat, min_lon, max_lon]으로 반환"""
+    config = config or get_config()
+    aoi = config.get('aoi')
+    return [aoi['min_lat'], aoi['max_lat'], aoi['min_lon'], aoi['max_lon']]
+
+
+def create_topsapp_xml(
+    pair: PairSpec,
+    output_dir: Path,
+    roi_bbox: List[float] = None,
+    config=None
+) -> Path:
+    """ISCE2 topsApp.xml 설정 파일 생성
+
+    모든 간섭쌍이 같은 격자로 지오코딩되도록 geocode bounding box를 AOI로 고정합니다.
+
+    Args:
+        pair: 간섭쌍
+        output_dir: 출력 디렉토리
+        roi_bbox: 처리 영역 [min_lat, max_lat, min_lon, max_lon] (기본값: AOI)
+        config: Config 객체 (기본값: 전역 설정)
+
+    Returns:
+        생성된 XML 경로
+    """
+    config = config or get_config()
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    if roi_bbox is None:
+        roi_bbox = get_aoi_bbox(config)
+
+    range_looks = config.get('insar', 'multilook', 'range', default=9)
+    azimuth_looks = config.get('insar', 'multilook', 'azimuth', default=3)
+    filter_strength = config.get('insar', 'filter', 'strength', default=0.5)
+    geocode_list = [f"merged/{name}" for name in GEOCODE_PRODUCTS.values()]
+
+    xml_content = f"""<?xml version="1.0" encoding="UTF-8"?>
+<topsApp>
+  <component name="topsinsar">
+    <property name="Sensor name">SENTINEL1</property>
+
+    <component name="reference">
+      <property name="output directory">{output_dir.resolve()}/reference</property>
+      <property name="safe">{[str(Path(p).resolve()) for p in pair.reference_safes]}</property>
+    </component>
+
+    <component name="secondary">
+      <property name="output directory">{output_dir.resolve()}/secondary</property>
+      <property name="safe">{[str(Path(p).resolve()) for p in pair.secondary_safes]}</property>
+    </component>
+
+    <property name="region of interest">{roi_bbox}</property>
+    <property name="geocode bounding box">{roi_bbox}</property>
+
+    <property name="do unwrap">True</property>
+    <property name="unwrapper name">snaphu_mcf</property>
+    <property name="azimuth looks">{azimuth_looks}</property>
+    <property name="range looks">{range_looks}</property>
+    <property name="filter strength">{filter_strength}</property>
+
+    <property name="geocode list">{geocode_list}</property>
+  </component>
+</topsApp>
+"""
+
+    xml_path = output_dir / 'topsApp.xml'
+    with open(xml_path, 'w', encoding='utf-8') as f:
+        f.write(xml_content)
+    return xml_path
+
+
+def find_topsapp() -> Path:
+    """topsApp.py 경로 찾기"""
+    try:
+        import isce
+    except ImportError:
+        raise ImportError(
+            "ISCE2가 필요합니다.\n"
+            "설치: conda install -c conda-forge isce2"
+        )
+    topsapp_path = Path(isce.__path__[0]) / 'applications' / 'topsApp.py'
+    if not topsapp_path.exists():
+        raise FileNotFoundError(f"topsApp.py를 찾을 수 없습니다: {topsapp_path}")
+    return topsapp_path
+
+
+def pair_work_dir(pair: PairSpec, config=None) -> Path:
+    """간섭쌍 작업 디렉토리 (processed_dir/pairs/<ref>_<sec>)"""
+    config = config or get_config()
+    return config.get_path('processed_dir') / 'pairs' / pair.name
+
+
+def pair_products(pair_dir: Path) -> Dict[str, Path]:
+    """간섭쌍 작업 디렉토리의 지오코딩 제품 경로"""
+    merged = Path(pair_dir) / 'merged'
+    return {key: merged / f"{name}.geo" for key, name in GEOCODE_PRODUCTS.items()}
+
+
+def is_pair_processed(pair_dir: Path) -> bool:
+    """topsApp 결과(unw, cor)가 이미 있는지 확인"""
+    products = pair_products(pair_dir)
+    return products['unwrapped_phase'].exists() and products['coherence'].exists()
+
+
+def run_topsapp(pair: PairSpec, work_dir: Path = None, roi_bbox: List[float] = None, config=None) -> Path:
+    """간섭쌍 하나를 topsApp.py로 처리
+
+    이미 결과가 있으면 건너뜁니다. 로그는 <work_dir>/topsApp.log에 기록됩니다.
+
+    Returns:
+        작업 디렉토리 경로
+    """
+    work_dir = Path(work_dir or pair_work_dir(pair, config))
+    if is_pair_processed(work_dir):
+        logger.info(f"이미 처리된 간섭쌍: {pair.name}")
+        return work_dir
+
+    xml_path = create_topsapp_xml(pair, work_dir, roi_bbox=roi_bbox, config=config)
+    topsapp_path = find_topsapp()
+    logger.info(f"topsApp 처리 시작: {pair.name} ({work_dir})")
+
+    with open(work_dir / 'topsApp.log', 'w', encoding='utf-8') as log_file:
+        result = subprocess.run(
+            [sys.executable, str(topsapp_path), str(xml_path)],
+            cwd=str(work_dir),
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            env=os.environ.copy()
+        )
+    if result.returncode != 0 or not is_pair_processed(work_dir):
+        raise RuntimeError(
+            f"topsApp 처리 실패: {pair.name} (return code {result.returncode}, "
+            f"로그: {work_dir / 'topsApp.log'})"
+        )
+    logger.info(f"topsApp 처리 완료: {pair.name}")
+    return work_dir
+
+
+def ingest_interferogram(store: StackStore, pair: PairSpec, pair_dir: Path, block_rows: int = 256) -> int:
+    """topsApp 지오코딩 결과를 스택에 행 블록 단위로 적재
+
+    ISCE는 무효 영역을 0으로 기록하므로 NaN으로 바꿔 저장합니다.
+
+    Returns:
+        스택 내 간섭도 인덱스
+    """
+    products = pair_products(pair_dir)
+    unw = IsceRaster(products['unwrapped_phase'])
+    cor = IsceRaster(products['coherence'])
+    if unw.shape != store.shape or cor.shape != store.shape:
+        raise ValueError(
+            f"간섭도 크기가 스택과 다릅니다: {pair.name} {unw.shape} vs {store.shape} "
+            "(geocode bounding box가 같은지 확인하세요)"
+        )
+
+    index = store.add_interferogram(pair.reference, pair.secondary)
+    cols = slice(0, store.width)
+    for (row0, row1, amplitude), (_, _, phase), (_, _, coherence) in zip(
+        unw.iter_row_blocks(block_rows, band=1),
+        unw.iter_row_blocks(block_rows, band=2),
+        cor.iter_row_blocks(block_rows, band=1),
+    ):
+        invalid = (phase == 0) & (amplitude == 0)
+        window = (slice(row0, row1), cols)
+        store.write_stack('interferograms/unwrapped_phase', window, np.where(invalid, np.nan, phase), index)
+        store.write_stack('interferograms/amplitude', window, np.where(invalid, np.nan, amplitude), index)
+        store.write_stack('interferograms/coherence', window, np.where(coherence == 0, np.nan, coherence), index)
+
+    logger.info(f"스택 적재 완료: {pair.name} (index {index})")
+    return index
+
+
+def ingest_los_geometry(store: StackStore, pair_dir: Path, block_rows: int = 256) -> bool:
+    """los.rdr.geo의 입사각/방위각을 /geometry/incidence, /geometry/azimuth로 적재
+
+    ISCE los.rdr 밴드 1은 입사각, 밴드 2는 지표→위성 LOS 방위각(북쪽 기준 반시계, 도)입니다.
+    같은 스택의 간섭쌍은 궤도 기하가 같으므로 한 번만 적재합니다.
+
+    Returns:
+        새로 적재했으면 True
+    """
+    if store.has_geometry('incidence') and store.has_geometry('azimuth'):
+        return False
+    los_path = pair_products(pair_dir)['los']
+    if not los_path.exists():
+        logger.warning(f"LOS 기하 파일이 없습니다: {los_path}")
+        return False
+    los = IsceRaster(los_path)
+    if los.shape != store.shape:
+        raise ValueError(f"LOS 기하 크기가 스택과 다릅니다: {los.shape} vs {store.shape}")
+
+    cols = slice(0, store.width)
+    for (row0, row1, incidence), (_, _, azimuth) in zip(
+        los.iter_row_blocks(block_rows, band=1),
+        los.iter_row_blocks(block_rows, band=2),
+    ):
+        invalid = (incidence == 0) & (azimuth == 0)
+        window = (slice(row0, row1), cols)
+        store.write_geometry('incidence', window, np.where(invalid, np.nan, incidence))
+        store.write_geometry('azimuth', window, np.where(invalid, np.nan, azimuth))
+    logger.info(f"LOS 기하 적재 완료: {los_path}")
+    return True
@@ -0,0 +1,289 @@
+"""
+Validity Mask Module
+육지 폴리곤과 스택 평균 coherence로 만든 스택 단위 유효 픽셀 마스크
+
+한 번 만들어 스택의 /mask 그룹에 저장하고 블록 단위 단계가 공유합니다.
+
+    /mask/bits         (L, ceil(W/8)) uint8   행마다 np.packbits로 압축한 비트마스크
+    /mask/row_offsets  (L+1,)         int64   행 r의 유효 구간은 runs[row_offsets[r]:row_offsets[r+1]]
+    /mask/runs         (R, 2)         int32   유효 열 구간 [start, end)
+
+StackStore.iter_windows(mask=...)는 구간 인덱스만으로 유효 픽셀이 없는 블록을 건너뛰고
+위아래의 무효 행을 잘라낸 윈도우를 돌려주므로, 바다 블록은 읽지도 계산하지도 않습니다.
+"""
+
+import argparse
+import json
+from pathlib import Path
+from typing import Optional, Tuple
+import logging
+
+import numpy as np
+
+from .config import get_config
+from .stack import StackStore, Window
+
+logger = logging.getLogger(__name__)
+
+
+def load_land_polygon(path: str):
+    """육지 폴리곤 읽기 (GeoJSON geometry/Feature/FeatureCollection 또는 WKT, 경위도)"""
+    try:
+        import shapely
+        from shapely.geometry import shape
+    except ImportError:
+        raise ImportError(
+            "육지 마스크에는 shapely 패키지가 필요합니다.\n"
+            "설치: conda install -c conda-forge shapely"
+        )
+    text = Path(path).read_text(encoding='utf-8')
+    if text.lstrip().startswith('{'):
+        data = json.loads(text)
+        if data.get('type') == 'FeatureCollection':
+            geometries = [shape(f['geometry']) for f in data['features']]
+        elif data.get('type') == 'Feature':
+            geometries = [shape(data['geometry'])]
+        else:
+            geometries = [shape(data)]
+        polygon = shapely.union_all(geometries)
+    else:
+        polygon = shapely.from_wkt(text)
+    shapely.prepare(polygon)
+    return polygon
+
+
+def row_runs(valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(h, W) bool → 행별 구간 수 (h,)와 구간 (R, 2) [start, end) (행 우선 순서)"""
+    padded = np.zeros((valid.shape[0], valid.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = valid
+    edges = np.diff(padded, axis=1)
+    start_rows, starts = np.nonzero(edges == 1)
+    _, ends = np.nonzero(edges == -1)
+    counts = np.bincount(start_rows, minlength=valid.shape[0])
+    return counts, np.stack([starts, ends], axis=1).astype(np.int32)
+
+
+class ValidityMask:
+    """스택 유효 픽셀 마스크 (비트마스크 + 행 구간 인덱스)
+
+    Example:
+        with StackStore.open(mode='r+') as store:
+            mask = ValidityMask.build(store, land_polygon='configs/korea_land.geojson')
+            for window in store.iter_windows(mask=mask):
+                valid = mask.window(window)
+    """
+
+    def __init__(self, store: StackStore):
+        self.store = store
+        self.group = store.h5['mask']
+        self.width = int(self.group.attrs['width'])
+        self.row_offsets = self.group['row_offsets'][:]
+        self.runs = self.group['runs'][:]
+
+    @classmethod
+    def exists(cls, store: StackStore) -> bool:
+        return 'mask' in store.h5
+
+    @classmethod
+    def for_store(cls, store: StackStore) -> Optional['ValidityMask']:
+        """설정에서 켜져 있고 스택에 마스크가 있으면 로드 (없으면 None)"""
+        if not get_config().get('mask', 'enabled', default=True) or not cls.exists(store):
+            return None
+        return cls(store)
+
+    @classmethod
+    def build(
+        cls,
+        store: StackStore,
+        land_polygon: str = None,
+        coherence_threshold: float = None,
+        block_rows: int = None
+    ) -> 'ValidityMask':
+        """육지 폴리곤 ∩ (평균 coherence ≥ 임계값)으로 마스크 생성 (기존 마스크 대체)
+
+        전체 폭 행 블록마다 간섭도를 청크 깊이 단위로 읽어 평균 coherence를 계산합니다.
+
+        Args:
+            store: 쓰기 가능한 StackStore
+            land_polygon: 육지 폴리곤 파일 (기본값: mask.land_polygon, 없으면 육지 조건 생략)
+            coherence_threshold: 평균 coherence 최소값 (기본값: mask.coherence_threshold)
+            block_rows: 행 블록 크기 (기본값: stack.block_size)
+        """
+        config = get_config()
+        if land_polygon is None and config.get('mask', 'land_polygon'):
+            land_polygon = config.project_root / config.get('mask', 'land_polygon')
+        if coherence_threshold is None:
+            coherence_threshold = config.get('mask', 'coherence_threshold', default=0.2)
+        if block_rows is None:
+            block_rows = config.get('stack', 'block_size', default=256)
+
+        polygon = None
+        if land_polygon is not None:
+            if store.geotransform is None:
+                raise ValueError("육지 폴리곤 마스크는 지오코딩된 스택에서만 사용할 수 있습니다")
+            polygon = load_land_polygon(land_polygon)
+            import shapely
+            lon0, dlon, lat0, dlat = store.geotransform
+            lons = lon0 + (np.arange(store.width) + 0.5) * dlon
+
+        previous = cls(store) if cls.exists(store) else None
+        # 기준점/대류권 보정이 마스크 안에서만 적용되었으면 마스크 밖 위상은 보정되지 않은 채 남아 있음
+        masked_corrections = previous is not None and bool(previous.group.attrs.get('masked_corrections', False))
+        n_bytes = -(-store.width // 8)
+        packed = np.zeros((store.length, n_bytes), dtype=np.uint8)
+
+        n_ifgs = len(store.pairs)
+        depth = int(store.h5.attrs['chunk_shape'][0])
+        counts, runs = [], []
+        grown = 0
+        for row0 in range(0, store.length, block_rows):
+            row1 = min(row0 + block_rows, store.length)
+            window = (slice(row0, row1), slice(0, store.width))
+            total = np.zeros((row1 - row0, store.width))
+            n = np.zeros((row1 - row0, store.width))
+            for start in range(0, n_ifgs, depth):
+                coherence = store.read_stack('interferograms/coherence', window, index=slice(start, start + depth))
+                finite = np.isfinite(coherence)
+                total += np.where(finite, coherence, 0.0).sum(axis=0)
+                n += finite.sum(axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                valid = (n > 0) & (total / n >= coherence_threshold)
+            if polygon is not None:
+                lats = lat0 + (np.arange(row0, row1) + 0.5) * dlat
+                grid_lons, grid_lats = np.meshgrid(lons, lats)
+                valid &= shapely.contains_xy(polygon, grid_lons, grid_lats)
+
+            if previous is not None:
+                grown += int((valid & ~previous.window(window)).sum())
+            packed[row0:row1] = np.packbits(valid, axis=1)
+            row_counts, row_run = row_runs(valid)
+            counts.append(row_counts)
+            runs.append(row_run)
+
+        if grown and masked_corrections:
+            # 새로 유효해지는 픽셀은 보정되지 않은 위상으로 역산되므로 거부 (보정은 위상을 덮어써 되돌릴 수 없음)
+            raise ValueError(
+                f"마스크 안에서만 보정된 스택의 마스크를 넓힐 수 없습니다 (새 유효 픽셀 {grown}개) - "
+                "기존 마스크보다 엄격한 조건으로 다시 만들거나 간섭도를 새 스택에 다시 적재하세요"
+            )
+
+        generation = int(previous.group.attrs.get('generation', 1)) + 1 if previous is not None else 1
+        expanded_at = generation if grown else (
+            int(previous.group.attrs.get('expanded_at', 0)) if previous is not None else 0
+        )
+        if previous is not None:
+            del store.h5['mask']
+        group = store.h5.create_group('mask')
+        group.create_dataset(
+            'bits', data=packed,
+            chunks=(min(block_rows, store.length), n_bytes),
+        )
+        counts = np.concatenate(counts) if counts else np.zeros(0, dtype=np.int64)
+        group.create_dataset('row_offsets', data=np.concatenate([[0], np.cumsum(counts)]).astype(np.int64))
+        group.create_dataset('runs', data=np.concatenate(runs) if runs else np.zeros((0, 2), dtype=np.int32))
+        group.attrs['width'] = store.width
+        group.attrs['coherence_threshold'] = coherence_threshold
+        group.attrs['land_polygon'] = str(land_polygon or '')
+        group.attrs['n_interferograms'] = n_ifgs
+        group.attrs['generation'] = generation  # 재생성마다 증가 (/sbas가 누적 당시 세대를 기록)
+        group.attrs['expanded_at'] = expanded_at  # 마지막으로 넓어진 세대 (이전 세대의 정규방정식은 재누적)
+        group.attrs['masked_corrections'] = masked_corrections
+
+        mask = cls(store)
+        logger.info(
+            f"유효 마스크 생성: 유효 픽셀 {mask.valid_pixels} / {store.length * store.width} "
+            f"({mask.valid_pixels / max(store.length * store.width, 1):.1%}), 구간 {len(mask.runs)}개"
+        )
+        mask.clear_outside(block_rows)
+        return mask
+
+    def mark_corrections(self):
+        """기준점/대류권 보정을 마스크 안에서만 적용했음을 기록 (이후 마스크를 넓히는 재생성 거부)"""
+        if not self.group.attrs.get('masked_corrections', False):
+            self.group.attrs['masked_corrections'] = True
+
+    def clear_outside(self, block_rows: int = None):
+        """마스크 밖 픽셀의 기존 시계열/속도를 NaN으로 덮어씀
+
+        역산은 마스크 안만 기록하므로, 이전 역산 뒤에 마스크가 생기거나 더 엄격하게 바뀌면
+        마스크 밖에 남은 값이 내보내기·모델 적합에 그대로 쓰이지 않게 합니다.
+        """
+        if 'timeseries' not in self.store.h5:
+            return
+        group = self.store.h5['timeseries']
+        spatial = (self.store.length, self.store.width)
+        datasets = [
+            group[name] for name in ('displacement', 'velocity')
+            if name in group and group[name].shape[-2:] == spatial
+        ]
+        if not datasets:
+            return
+        if block_rows is None:
+            block_rows = get_config().get('stack', 'block_size', default=256)
+        depth = int(self.store.h5.attrs['chunk_shape'][0])
+
+        for row0 in range(0, self.store.length, block_rows):
+            window = (slice(row0, min(row0 + block_rows, self.store.length)), slice(0, self.store.width))
+            outside = ~self.window(window)
+            if not outside.any():
+                continue
+            for dataset in datasets:
+                if dataset.ndim == 2:
+                    block = dataset[window[0], window[1]]
+                    block[outside] = np.nan
+                    dataset[window[0], window[1]] = block
+                    continue
+                for start in range(0, dataset.shape[0], depth):
+                    block = dataset[start:start + depth, window[0], window[1]]
+                    block[:, outside] = np.nan
+                    dataset[start:start + depth, window[0], window[1]] = block
+
+    @property
+    def valid_pixels(self) -> int:
+        return int((self.runs[:, 1] - self.runs[:, 0]).sum()) if len(self.runs) else 0
+
+    def _runs_in(self, window: Window) -> Tuple[np.ndarray, np.ndarray]:
+        """윈도우 행 범위의 (구간 행 번호, 구간) - 열 범위와 겹치는 것만"""
+        row0, row1 = window[0].start or 0, window[0].stop
+        col0, col1 = window[1].start or 0, window[1].stop if window[1].stop is not None else self.width
+        lo, hi = self.row_offsets[row0], self.row_offsets[row1]
+        runs = self.runs[lo:hi]
+        rows = np.repeat(np.arange(row0, row1), np.diff(self.row_offsets[row0:row1 + 1]))
+        overlap = (runs[:, 0] < col1) & (runs[:, 1] > col0)
+        return rows[overlap], runs[overlap]
+
+    def trim(self, window: Window) -> Optional[Window]:
+        """유효 픽셀이 있는 행 범위로 윈도우를 줄임 (하나도 없으면 None)"""
+        rows, _ = self._runs_in(window)
+        if rows.size == 0:
+            return None
+        return slice(int(rows[0]), int(rows[-1]) + 1), window[1]
+
+    def window(self, window: Window) -> np.ndarray:
+        """윈도우의 유효 여부 bool 배열 (필요한 바이트 열만 읽어 unpack)"""
+        col0 = window[1].start or 0
+        col1 = window[1].stop if window[1].stop is not None else self.width
+        byte0, byte1 = col0 // 8, -(-col1 // 8)
+        packed = self.group['bits'][window[0], byte0:byte1]
+        return np.unpackbits(packed, axis=1).astype(bool)[:, col0 - byte0 * 8:col1 - byte0 * 8]
+
+    def row(self, row: int) -> np.ndarray:
+        """행 하나의 유효 구간 (R, 2) [start, end)"""
+        return self.runs[self.row_offsets[row]:self.row_offsets[row + 1]]
+
+
+def main():
+    """메인 실행 함수"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="스택 유효 픽셀 마스크 생성")
+    parser.add_argument('--store', default=None, help='스택 HDF5 경로')
+    parser.add_argument('--land-polygon', default=None, help='육지 폴리곤 (GeoJSON 또는 WKT, 기본값: mask.land_polygon)')
+    parser.add_argument('--coherence-threshold', type=float, default=None, help='평균 coherence 최소값')
+    args = parser.parse_args()
+
+    with StackStore.open(args.store, 'r+') as store:
+        ValidityMask.build(store, args.land_polygon, args.coherence_threshold)
+
+
+if __name__ == "__main__":
+    main()
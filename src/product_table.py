@@ -0,0 +1,202 @@
+"""
+Product Table Module
+ASF 검색 결과를 열 단위(columnar) 제품 테이블로 관리
+
+ASF 제품 객체를 행마다 들고 있지 않고 필요한 속성만 타입이 정해진 열로 보관합니다.
+    title, url, md5sum   문자열
+    date                 ISO 시각 문자열 (기존 열 호환)
+    timestamp            int64 (UTC epoch ns, 정렬/그룹/간섭쌍 계산용)
+    path, track          범주형(category) 정수
+    direction            범주형 문자열
+    size_mb              float32
+
+다운로드에 제품 객체가 필요하면 rehydrate_products()로 그때 다시 조회합니다.
+Parquet 저장/읽기는 pyarrow가 있을 때만 가능합니다.
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+PRODUCT_COLUMNS = ['title', 'date', 'timestamp', 'path', 'track', 'direction', 'size_mb', 'url', 'md5sum']
+
+# ASF 검색 결과 속성 → 열
+_PROPERTY_COLUMNS = {
+    'title': 'sceneName',
+    'date': 'startTime',
+    'path': 'pathNumber',
+    'direction': 'flightDirection',
+    'url': 'url',
+    'md5sum': 'md5sum',
+}
+
+# 플랫폼별 relative orbit 기준 absolute orbit 오프셋 (relative = (absolute - offset) % 175 + 1)
+ORBIT_OFFSETS = {'S1A': 73, 'S1B': 27, 'S1C': 172}
+
+
+def empty_table() -> pd.DataFrame:
+    """열과 타입만 있는 빈 제품 테이블"""
+    return normalize_table(pd.DataFrame({column: [] for column in PRODUCT_COLUMNS}))
+
+
+def _category(values) -> pd.Categorical:
+    return pd.Categorical(pd.to_numeric(pd.Series(values), errors='coerce').astype('Int16'))
+
+
+def normalize_table(df: pd.DataFrame) -> pd.DataFrame:
+    """열 타입 정리 (JSON/CSV에서 읽은 테이블도 같은 타입으로 맞춤)"""
+    df = df.copy()
+    if 'timestamp' not in df.columns or df['timestamp'].isna().any():
+        df['timestamp'] = pd.to_datetime(df['date'], utc=True, format='ISO8601').dt.as_unit('ns').astype('int64') if len(df) else []
+    df['timestamp'] = df['timestamp'].astype('int64')
+    for column in ('path', 'track'):
+        if column in df.columns:
+            df[column] = _category(df[column])
+    if 'direction' in df.columns:
+        df['direction'] = df['direction'].astype('category')
+    if 'size_mb' in df.columns:
+        df['size_mb'] = df['size_mb'].astype('float32')
+    for column in ('title', 'date', 'url'):
+        if column in df.columns:
+            df[column] = df[column].astype(object)
+    if 'md5sum' not in df.columns:
+        df['md5sum'] = None
+    return df
+
+
+def relative_orbit(platform: str, absolute_orbit) -> int:
+    """absolute orbit → relative orbit (1-175)
+
+    Args:
+        platform: 'S1A'/'S1B'/'S1C' 또는 그렇게 시작하는 장면 이름
+        absolute_orbit: absolute orbit number
+
+    Returns:
+        relative orbit (알 수 없는 플랫폼이나 orbit이 없으면 None)
+    """
+    offset = ORBIT_OFFSETS.get(str(platform or '')[:3].upper())
+    if offset is None or absolute_orbit is None or pd.isna(absolute_orbit):
+        return None
+    return (int(absolute_orbit) - offset) % 175 + 1
+
+
+def results_to_table(results: Iterable) -> pd.DataFrame:
+    """ASF 검색 결과 → 제품 테이블 (속성을 열 단위로 모아 한 번에 생성)
+
+    Args:
+        results: ASFSearchResults 또는 ASFProduct 목록
+    """
+    properties = [r.properties for r in results]
+    if not properties:
+        return empty_table()
+
+    columns = {
+        column: [p.get(key) for p in properties]
+        for column, key in _PROPERTY_COLUMNS.items()
+    }
+    # track은 relative orbit (1-175): ASF pathNumber를 우선하고, 없으면 플랫폼별 absolute orbit 오프셋으로 계산
+    columns['track'] = [
+        p.get('pathNumber') if p.get('pathNumber') is not None
+        else relative_orbit(p.get('sceneName'), p.get('orbit'))
+        for p in properties
+    ]
+    columns['path'] = [path if path is not None else track for path, track in zip(columns['path'], columns['track'])]
+    columns['size_mb'] = np.array([p.get('bytes') or 0 for p in properties], dtype=np.float64) / (1024**2)
+    columns['direction'] = [d if d is not None else 'N/A' for d in columns['direction']]
+    columns['url'] = [u or '' for u in columns['url']]
+    return normalize_table(pd.DataFrame(columns))[PRODUCT_COLUMNS]
+
+
+def pair_candidates(
+    timestamps: np.ndarray,
+    target_days: float,
+) -> np.ndarray:
+    """모든 (i < j) 조합의 시간 간격과 목표 간격의 차이 행렬 (NumPy 브로드캐스팅)
+
+    Args:
+        timestamps: int64 epoch ns (날짜순 정렬)
+        target_days: 목표 시간 기선 (일)
+
+    Returns:
+        (n, n) 차이 행렬 (i >= j는 inf)
+    """
+    days = (timestamps[None, :] - timestamps[:, None]) / 86400e9
+    diff = np.abs(days - target_days)
+    diff[np.tril_indices(len(timestamps))] = np.inf
+    return diff
+
+
+def rehydrate_products(titles: Sequence[str]) -> Dict[str, object]:
+    """장면 이름으로 ASF 제품 객체 재조회 (다운로드 직전에만 호출)
+
+    Returns:
+        {title: ASFProduct}
+    """
+    import asf_search as asf
+
+    if not titles:
+        return {}
+    results = asf.granule_search(list(titles))
+    return {
+        r.properties['sceneName']: r
+        for r in results
+        if r.properties.get('processingLevel') == 'SLC'
+    }
+
+
+# ----------------------------------------------------------------------
+# Parquet
+# ----------------------------------------------------------------------
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError(
+            "Parquet 저장에는 pyarrow 패키지가 필요합니다.\n"
+            "설치: pip install pyarrow"
+        )
+
+
+def save_parquet(df: pd.DataFrame, path: str, metadata: Dict[str, str] = None):
+    """제품 테이블을 Parquet으로 저장 (범주형 열은 dictionary 인코딩)
+
+    Args:
+        df: 제품 테이블
+        path: 저장 경로
+        metadata: 스키마 메타데이터로 함께 저장할 문자열 값 (예: last_sync)
+    """
+    _require_pyarrow()
+    table = pa.Table.from_pandas(df.reset_index(drop=True), preserve_index=False)
+    if metadata:
+        merged = dict(table.schema.metadata or {})
+        merged.update({k.encode(): str(v).encode() for k, v in metadata.items()})
+        table = table.replace_schema_metadata(merged)
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    pq.write_table(table, str(path))
+
+
+def load_parquet(path: str, columns: List[str] = None):
+    """Parquet 제품 테이블 읽기
+
+    Returns:
+        (제품 테이블, 스키마 메타데이터 dict)
+    """
+    _require_pyarrow()
+    table = pq.read_table(str(path), columns=columns)
+    metadata = {
+        k.decode(): v.decode()
+        for k, v in (table.schema.metadata or {}).items()
+        if k != b'pandas'
+    }
+    return normalize_table(table.to_pandas()), metadata
@@ -0,0 +1,296 @@
+"""
+ISCE Raster I/O Module
+ISCE2 바이너리 래스터(.xml 메타데이터 + raw binary)를 메모리 맵으로 읽기/쓰기
+"""
+
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+import xml.etree.ElementTree as ET
+
+import numpy as np
+
+
+# ISCE data_type → NumPy dtype
+ISCE_DTYPES = {
+    'BYTE': np.uint8,
+    'SHORT': np.int16,
+    'INT': np.int32,
+    'FLOAT': np.float32,
+    'DOUBLE': np.float64,
+    'CFLOAT': np.complex64,
+    'CDOUBLE': np.complex128,
+}
+
+# NumPy dtype → GDAL VRT 데이터 타입
+_VRT_DTYPES = {
+    'BYTE': 'Byte',
+    'SHORT': 'Int16',
+    'INT': 'Int32',
+    'FLOAT': 'Float32',
+    'DOUBLE': 'Float64',
+    'CFLOAT': 'CFloat32',
+    'CDOUBLE': 'CFloat64',
+}
+
+
+def _find_property(root: ET.Element, name: str) -> Optional[str]:
+    """ISCE XML에서 property 값 찾기 (대소문자 무시)"""
+    name = name.lower()
+    for prop in root.iter('property'):
+        if prop.get('name', '').lower() == name:
+            value = prop.find('value')
+            return value.text.strip() if value is not None and value.text else None
+    return None
+
+
+def _find_coordinate(root: ET.Element, name: str) -> Optional[Tuple[float, float]]:
+    """coordinate1/coordinate2 컴포넌트에서 (startingvalue, delta) 읽기"""
+    for comp in root.iter('component'):
+        if comp.get('name', '').lower() == name:
+            start = _find_property(comp, 'startingvalue')
+            delta = _find_property(comp, 'delta')
+            if start is None or delta is None:
+                return None
+            return float(start), float(delta)
+    return None
+
+
+def _isce_data_type(dtype) -> str:
+    dtype = np.dtype(dtype)
+    for name, value in ISCE_DTYPES.items():
+        if np.dtype(value) == dtype:
+            return name
+    raise ValueError(f"ISCE 래스터로 쓸 수 없는 데이터 타입: {dtype}")
+
+
+def write_isce_xml(
+    path: Path,
+    width: int,
+    length: int,
+    data_type: str = 'FLOAT',
+    bands: int = 1,
+    scheme: str = 'BIL',
+    geotransform: Tuple[float, float, float, float] = None
+) -> Path:
+    """ISCE 래스터 메타데이터(<path>.xml)와 GDAL용 <path>.vrt 작성
+
+    Args:
+        path: 바이너리 파일 경로
+        width, length: 열/행 수
+        data_type: ISCE 데이터 타입 ('FLOAT' 등)
+        bands: 밴드 수
+        scheme: 밴드 배치 ('BIL', 'BIP', 'BSQ')
+        geotransform: (lon0, dlon, lat0, dlat) 지오코딩된 래스터면 지정
+    """
+    path = Path(path)
+    root = ET.Element('imageFile')
+
+    def add_property(parent, name, value):
+        prop = ET.SubElement(parent, 'property', name=name)
+        ET.SubElement(prop, 'value').text = str(value)
+
+    for name, value in (
+        ('width', width), ('length', length), ('number_bands', bands),
+        ('data_type', data_type), ('scheme', scheme), ('byte_order', 'l'),
+        ('file_name', path.name), ('access_mode', 'read'),
+    ):
+        add_property(root, name, value)
+    if geotransform is not None:
+        lon0, dlon, lat0, dlat = geotransform
+        for name, start, delta, size in (('coordinate1', lon0, dlon, width), ('coordinate2', lat0, dlat, length)):
+            comp = ET.SubElement(root, 'component', name=name)
+            add_property(comp, 'startingvalue', repr(float(start)))
+            add_property(comp, 'delta', repr(float(delta)))
+            add_property(comp, 'size', size)
+            add_property(comp, 'endingvalue', repr(float(start + delta * size)))
+    ET.indent(root)
+    xml_path = path.with_name(path.name + '.xml')
+    ET.ElementTree(root).write(str(xml_path), encoding='utf-8', xml_declaration=True)
+
+    # GDAL에서 바로 열 수 있도록 raw VRT도 작성
+    itemsize = np.dtype(ISCE_DTYPES[data_type]).itemsize
+    lines = [f'<VRTDataset rasterXSize="{width}" rasterYSize="{length}">']
+    if geotransform is not None:
+        lon0, dlon, lat0, dlat = geotransform
+        lines.append('  <SRS>EPSG:4326</SRS>')
+        lines.append(f'  <GeoTransform>{lon0!r}, {dlon!r}, 0.0, {lat0!r}, 0.0, {dlat!r}</GeoTransform>')
+    for band in range(bands):
+        if scheme == 'BSQ':
+            offset, pixel, line = band * itemsize * width * length, itemsize, itemsize * width
+        elif scheme == 'BIL':
+            offset, pixel, line = band * itemsize * width, itemsize, itemsize * width * bands
+        else:
+            offset, pixel, line = band * itemsize, itemsize * bands, itemsize * width * bands
+        lines += [
+            f'  <VRTRasterBand dataType="{_VRT_DTYPES[data_type]}" band="{band + 1}" subClass="VRTRawRasterBand">',
+            f'    <SourceFilename relativeToVRT="1">{path.name}</SourceFilename>',
+            '    <ByteOrder>LSB</ByteOrder>',
+            f'    <ImageOffset>{offset}</ImageOffset>',
+            f'    <PixelOffset>{pixel}</PixelOffset>',
+            f'    <LineOffset>{line}</LineOffset>',
+            '  </VRTRasterBand>',
+        ]
+    lines.append('</VRTDataset>')
+    path.with_name(path.name + '.vrt').write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return xml_path
+
+
+class IsceRaster:
+    """ISCE2 래스터 파일 (읽기 전용 메모리 맵)
+
+    전체 배열을 메모리에 올리지 않고 행 블록 단위로 읽을 수 있습니다.
+
+    Example:
+        raster = IsceRaster('merged/filt_topophase.unw.geo')
+        for row0, row1, block in raster.iter_row_blocks(512, band=2):
+            ...
+    """
+
+    def __init__(self, path: str, mode: str = 'r'):
+        """
+        Args:
+            path: 바이너리 파일 경로 (같은 위치에 <path>.xml 필요)
+            mode: 메모리 맵 모드 ('r' 읽기 전용, 'r+' 쓰기)
+        """
+        self.path = Path(path)
+        self.mode = mode
+        xml_path = self.path.with_name(self.path.name + '.xml')
+        if not xml_path.exists():
+            raise FileNotFoundError(f"ISCE XML 메타데이터를 찾을 수 없습니다: {xml_path}")
+
+        root = ET.parse(str(xml_path)).getroot()
+        self.width = int(_find_property(root, 'width'))
+        self.length = int(_find_property(root, 'length'))
+        self.bands = int(_find_property(root, 'number_bands') or 1)
+        self.data_type = (_find_property(root, 'data_type') or 'FLOAT').upper()
+        self.scheme = (_find_property(root, 'scheme') or 'BIP').upper()
+
+        if self.data_type not in ISCE_DTYPES:
+            raise ValueError(f"지원하지 않는 데이터 타입: {self.data_type}")
+        self.dtype = np.dtype(ISCE_DTYPES[self.data_type])
+
+        # 지오코딩된 제품이면 coordinate1 = 경도, coordinate2 = 위도
+        lon = _find_coordinate(root, 'coordinate1')
+        lat = _find_coordinate(root, 'coordinate2')
+        self.geotransform = None
+        if lon is not None and lat is not None and self._is_geocoded(self.path.name):
+            self.geotransform = (lon[0], lon[1], lat[0], lat[1])
+
+        self._memmap = None
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        width: int,
+        length: int,
+        dtype=np.float32,
+        bands: int = 1,
+        scheme: str = 'BIL',
+        geotransform: Tuple[float, float, float, float] = None,
+        fill_value: float = None
+    ) -> 'IsceRaster':
+        """새 ISCE 래스터 생성 (쓰기 모드로 열림, 블록 단위로 write_rows/write_window)
+
+        Args:
+            path: 바이너리 파일 경로 (.xml, .vrt 함께 생성)
+            width, length: 열/행 수
+            dtype: NumPy 데이터 타입
+            bands: 밴드 수
+            scheme: 밴드 배치
+            geotransform: (lon0, dlon, lat0, dlat)
+            fill_value: 초기값 (기본값: 0, 희소 파일로 생성)
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data_type = _isce_data_type(dtype)
+        with open(path, 'wb') as f:
+            f.truncate(width * length * bands * np.dtype(dtype).itemsize)
+        write_isce_xml(path, width, length, data_type, bands, scheme, geotransform)
+        raster = cls(path, mode='r+')
+        if fill_value is not None:
+            raster._open()[:] = fill_value
+        return raster
+
+    @staticmethod
+    def _is_geocoded(name: str) -> bool:
+        """지오코딩 제품(.geo) 또는 DEM(.dem, .dem.wgs84)인지 확인"""
+        return name.endswith('.geo') or '.dem' in name
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """(length, width)"""
+        return self.length, self.width
+
+    def _open(self) -> np.memmap:
+        if self._memmap is None:
+            if self.scheme == 'BSQ':
+                shape = (self.bands, self.length, self.width)
+            elif self.scheme == 'BIL':
+                shape = (self.length, self.bands, self.width)
+            else:
+                shape = (self.length, self.width, self.bands)
+            self._memmap = np.memmap(self.path, dtype=self.dtype, mode=self.mode, shape=shape)
+        return self._memmap
+
+    def band(self, band: int = 1) -> np.ndarray:
+        """밴드 하나의 (length, width) 메모리 맵 뷰 (1부터 시작)
+
+        Args:
+            band: 밴드 번호 (1-based)
+
+        Returns:
+            디스크를 직접 참조하는 2D 뷰
+        """
+        if not 1 <= band <= self.bands:
+            raise ValueError(f"밴드 번호 범위 초과: {band} (1~{self.bands})")
+        data = self._open()
+        if self.scheme == 'BSQ':
+            return data[band - 1]
+        if self.scheme == 'BIL':
+            return data[:, band - 1, :]
+        return data[:, :, band - 1]
+
+    def read_rows(self, row0: int, row1: int, band: int = 1) -> np.ndarray:
+        """[row0, row1) 행 구간 읽기 (메모리 복사본)"""
+        return np.array(self.band(band)[row0:row1])
+
+    def iter_row_blocks(
+        self,
+        block_rows: int,
+        band: int = 1
+    ) -> Iterator[Tuple[int, int, np.ndarray]]:
+        """행 블록 단위 순차 읽기
+
+        Args:
+            block_rows: 블록당 행 수
+            band: 밴드 번호 (1-based)
+
+        Yields:
+            (row0, row1, block) 튜플
+        """
+        view = self.band(band)
+        for row0 in range(0, self.length, block_rows):
+            row1 = min(row0 + block_rows, self.length)
+            yield row0, row1, np.array(view[row0:row1])
+
+    def write_window(self, window: Tuple[slice, slice], block: np.ndarray, band: int = 1):
+        """(행 slice, 열 slice) 윈도우에 블록 기록 ('r+' 모드)"""
+        if self.mode == 'r':
+            raise ValueError(f"읽기 전용으로 연 래스터입니다: {self.path}")
+        self.band(band)[window[0], window[1]] = block
+
+    def write_rows(self, row0: int, block: np.ndarray, band: int = 1):
+        """row0부터 행 블록 기록"""
+        self.write_window((slice(row0, row0 + block.shape[0]), slice(None)), block, band)
+
+    def flush(self):
+        if self._memmap is not None and self.mode != 'r':
+            self._memmap.flush()
+
+    def pixel_to_lonlat(self, rows: np.ndarray, cols: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """픽셀 중심 좌표 → 경위도 (지오코딩된 제품만)"""
+        if self.geotransform is None:
+            raise ValueError(f"지오코딩되지 않은 래스터입니다: {self.path}")
+        lon0, dlon, lat0, dlat = self.geotransform
+        return lon0 + (np.asarray(cols) + 0.5) * dlon, lat0 + (np.asarray(rows) + 0.5) * dlat
@@ -0,0 +1,285 @@
+"""
+Raw Data Store Module
+디스크 예산을 지키는 원시 SLC zip 저장소 (LRU 삭제, 고정, 중복 제거)
+
+raw_data_dir의 zip(또는 burst 부분 다운로드로 만든 .SAFE 디렉토리)마다 크기, md5,
+마지막 사용 시각, 고정(pin)한 간섭쌍을 JSON 인덱스에 기록합니다. 예산(raw_store.budget_gb)을 넘으면 처리 대기 중인
+간섭쌍이 고정하지 않은 장면부터 오래 쓰지 않은 순서로 삭제합니다.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+import hashlib
+import json
+import logging
+import re
+import shutil
+import threading
+
+from .config import get_config
+from .utils import format_file_size
+
+logger = logging.getLogger(__name__)
+
+# Sentinel-1 SLC 장면 이름 (다운로드 시 붙는 ' (1)', '.1' 등 접미사 제외)
+SCENE_PATTERN = re.compile(
+    r'S1[A-D]_[A-Z0-9]{2}_SLC__1S[A-Z]{2}_\d{8}T\d{6}_\d{8}T\d{6}_\d{6}_[0-9A-F]{6}_[0-9A-F]{4}'
+)
+
+
+def scene_name(path: Path) -> Optional[str]:
+    """파일 이름 → 장면 이름 (형식이 다르면 None)"""
+    match = SCENE_PATTERN.search(Path(path).name)
+    return match.group(0) if match else None
+
+
+def disk_size(path: Path) -> int:
+    """실제 디스크 사용량 (sparse 파일은 할당된 블록만, 디렉토리는 합계)"""
+    path = Path(path)
+    files = [p for p in path.rglob('*') if p.is_file()] if path.is_dir() else [path]
+    return sum(p.stat().st_blocks * 512 for p in files)
+
+
+def _remove(path: Path):
+    if path.is_dir():
+        shutil.rmtree(path)
+    else:
+        path.unlink(missing_ok=True)
+
+
+def file_md5(path: Path, chunk_size: int = 8 * 1024**2) -> str:
+    """파일 md5 (블록 단위 스트리밍)"""
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RawDataStore:
+    """원시 SLC zip 저장소
+
+    Example:
+        store = RawDataStore()
+        store.scan()
+        store.pin(pair.reference_safes + pair.secondary_safes, owner=pair.name)
+        ...
+        store.unpin(pair.name)
+        store.enforce_budget()
+    """
+
+    def __init__(self, raw_dir: str = None, budget_gb: float = None):
+        """
+        Args:
+            raw_dir: 원시 데이터 디렉토리 (기본값: paths.raw_data_dir)
+            budget_gb: 디스크 예산 (GB, 기본값: raw_store.budget_gb, None이면 무제한)
+        """
+        self.config = get_config()
+        self.raw_dir = Path(raw_dir) if raw_dir else self.config.get_path('raw_data_dir')
+        if budget_gb is None:
+            budget_gb = self.config.get('raw_store', 'budget_gb')
+        self.budget_bytes = int(budget_gb * 1024**3) if budget_gb else None
+        self.index_path = self.raw_dir / self.config.get('raw_store', 'index_name', default='index.json')
+        self.scenes: Dict[str, Dict] = {}
+        self._lock = threading.RLock()
+        if self.index_path.exists():
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.scenes = json.load(f).get('scenes', {})
+
+    def save(self):
+        """인덱스 저장"""
+        with self._lock:
+            self.raw_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self.index_path.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'scenes': self.scenes}, f, indent=2, ensure_ascii=False)
+            tmp.replace(self.index_path)
+
+    @staticmethod
+    def _now() -> str:
+        return datetime.now().isoformat(timespec='milliseconds')
+
+    # ------------------------------------------------------------------
+    # 등록/조회
+    # ------------------------------------------------------------------
+    def path_for(self, title: str) -> Path:
+        """장면의 표준 zip 경로"""
+        return self.raw_dir / f"{title}.zip"
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(entry['size'] for entry in self.scenes.values())
+
+    def register(self, path: str, md5sum: str = None) -> Optional[str]:
+        """다운로드된 zip 등록
+
+        같은 장면이 이미 있으면(이름 또는 md5가 같으면) 새 파일을 중복으로 보고 삭제합니다.
+
+        Args:
+            path: zip 경로
+            md5sum: ASF가 제공한 md5 (있으면 중복 판정에 사용)
+
+        Returns:
+            장면 이름 (인식할 수 없는 파일이면 None)
+        """
+        path = Path(path)
+        title = scene_name(path)
+        if title is None:
+            logger.warning(f"장면 이름 형식이 아닌 파일은 관리하지 않습니다: {path.name}")
+            return None
+
+        with self._lock:
+            existing = self.scenes.get(title)
+            if existing is None and md5sum:
+                same_content = self._find_md5(md5sum)
+                if same_content is not None:
+                    title, existing = same_content, self.scenes[same_content]
+            if existing is not None and Path(existing['path']) != path and Path(existing['path']).exists():
+                logger.info(f"중복 다운로드 삭제: {path.name} (기존: {Path(existing['path']).name})")
+                _remove(path)
+                existing['last_used'] = self._now()
+                self.save()
+                return title
+
+            stat = path.stat()
+            self.scenes[title] = {
+                'path': str(path),
+                'size': disk_size(path),
+                'mtime': stat.st_mtime,
+                'md5': md5sum.lower() if md5sum else None,
+                'added': self._now(),
+                'last_used': self._now(),
+                'pinned_by': (existing or {}).get('pinned_by', []),
+            }
+            self.save()
+        return title
+
+    def _find_md5(self, md5sum: str) -> Optional[str]:
+        md5sum = md5sum.lower()
+        for title, entry in self.scenes.items():
+            if entry.get('md5') == md5sum:
+                return title
+        return None
+
+    def touch(self, titles: Iterable[str]):
+        """장면 사용 시각 갱신 (처리 입력으로 쓰일 때 호출)"""
+        with self._lock:
+            now = self._now()
+            for title in titles:
+                title = scene_name(Path(title)) or title
+                if title in self.scenes:
+                    self.scenes[title]['last_used'] = now
+            self.save()
+
+    def scan(self, checksums: bool = False) -> List[Path]:
+        """디렉토리의 zip을 인덱스와 맞추고 중복 파일 삭제
+
+        Args:
+            checksums: True면 md5가 없는 파일도 해시를 계산해 내용 중복까지 찾음
+
+        Returns:
+            삭제한 중복 파일 목록
+        """
+        removed = []
+        with self._lock:
+            # 사라진 파일은 인덱스에서 제거
+            for title in [t for t, e in self.scenes.items() if not Path(e['path']).exists()]:
+                del self.scenes[title]
+
+            # 표준 이름('<title>.zip')을 먼저 보아 접미사가 붙은 사본이 중복으로 처리되게 함
+            # (같은 장면의 zip과 부분 SAFE가 함께 있으면 완전한 zip을 남김)
+            paths = sorted(
+                list(self.raw_dir.glob('*.zip')) + list(self.raw_dir.glob('*.SAFE')),
+                key=lambda p: (p.name not in (f"{scene_name(p)}.zip", f"{scene_name(p)}.SAFE"), p.is_dir(), p.name)
+            )
+            for path in paths:
+                title = scene_name(path)
+                if title is None:
+                    continue
+                entry = self.scenes.get(title)
+                if entry is not None and Path(entry['path']) != path:
+                    # 같은 장면 이름의 두 번째 파일 (예: '<title> (1).zip')
+                    logger.info(f"중복 장면 삭제: {path.name}")
+                    _remove(path)
+                    removed.append(path)
+                    continue
+                if entry is None:
+                    self.register(path)
+
+            if checksums:
+                seen = {}
+                for title, entry in sorted(self.scenes.items()):
+                    path = Path(entry['path'])
+                    if path.is_dir():
+                        continue
+                    if entry.get('md5') is None or entry.get('mtime') != path.stat().st_mtime:
+                        entry['md5'] = file_md5(path)
+                        entry['mtime'] = path.stat().st_mtime
+                    if entry['md5'] not in seen:
+                        seen[entry['md5']] = title
+                        continue
+                    logger.info(f"내용이 같은 중복 파일 삭제: {path.name} (= {seen[entry['md5']]})")
+                    path.unlink()
+                    removed.append(path)
+                    del self.scenes[title]
+            self.save()
+        return removed
+
+    # ------------------------------------------------------------------
+    # 고정/삭제
+    # ------------------------------------------------------------------
+    def pin(self, titles: Iterable[str], owner: str):
+        """처리 대기 중인 간섭쌍이 쓰는 장면 고정 (삭제 대상에서 제외)
+
+        Args:
+            titles: 장면 이름 또는 zip 경로
+            owner: 고정 주체 (간섭쌍 이름 등)
+        """
+        with self._lock:
+            for title in titles:
+                title = scene_name(Path(title)) or title
+                entry = self.scenes.get(title)
+                if entry is not None and owner not in entry['pinned_by']:
+                    entry['pinned_by'].append(owner)
+            self.save()
+
+    def unpin(self, owner: str):
+        """owner가 건 고정 해제"""
+        with self._lock:
+            for entry in self.scenes.values():
+                if owner in entry['pinned_by']:
+                    entry['pinned_by'].remove(owner)
+            self.save()
+
+    def enforce_budget(self, budget_bytes: int = None) -> List[str]:
+        """예산을 넘으면 고정되지 않은 장면을 오래 쓰지 않은 순서로 삭제
+
+        Returns:
+            삭제한 장면 이름 목록
+        """
+        budget = budget_bytes if budget_bytes is not None else self.budget_bytes
+        if budget is None:
+            return []
+
+        evicted = []
+        with self._lock:
+            total = self.total_bytes
+            candidates = sorted(
+                (t for t, e in self.scenes.items() if not e['pinned_by']),
+                key=lambda t: self.scenes[t]['last_used']
+            )
+            for title in candidates:
+                if total <= budget:
+                    break
+                entry = self.scenes.pop(title)
+                _remove(Path(entry['path']))
+                total -= entry['size']
+                evicted.append(title)
+                logger.info(f"예산 초과로 삭제: {title} ({format_file_size(entry['size'])})")
+            if total > budget:
+                logger.warning(
+                    f"고정된 장면만으로 예산 초과: {format_file_size(total)} > {format_file_size(budget)}"
+                )
+            self.save()
+        return evicted
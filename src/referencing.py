@@ -0,0 +1,188 @@
+"""
+Spatial Referencing Module
+기준점(reference point) 기준 간섭도 정규화
+
+sbas.reference_point(경위도)를 geocoding 인덱스로 픽셀 위치로 바꾸거나,
+지정이 없으면 평균 coherence가 가장 높은 안정 영역을 자동으로 고릅니다.
+기준점 주변 창의 강건 평균(median)을 간섭도마다 구해 한 번의 블록 스트리밍으로
+모든 간섭도에서 뺍니다.
+"""
+
+from typing import Sequence, Tuple
+import logging
+import warnings
+
+import numpy as np
+
+from .config import get_config
+from .geocoding import GeocodingIndex
+from .masking import ValidityMask
+from .stack import StackStore
+
+logger = logging.getLogger(__name__)
+
+
+def _window_sum(array: np.ndarray, size: int) -> np.ndarray:
+    """size x size 이동 창 합 (누적합 기반, 'valid' 영역만)"""
+    padded = np.pad(array, ((1, 0), (1, 0)))
+    csum = padded.cumsum(axis=0).cumsum(axis=1)
+    return csum[size:, size:] - csum[:-size, size:] - csum[size:, :-size] + csum[:-size, :-size]
+
+
+class ReferencePointNormalizer:
+    """기준점 정규화 단계
+
+    Example:
+        with StackStore.open(mode='r+') as store:
+            ReferencePointNormalizer(store).apply()
+    """
+
+    def __init__(self, store: StackStore, radius: int = None, block_size: int = None):
+        """
+        Args:
+            store: 쓰기 가능한 StackStore
+            radius: 기준 창 반경 (픽셀, 기본값: sbas.reference_radius)
+            block_size: 블록 처리 단위 (기본값: stack.block_size)
+        """
+        self.config = get_config()
+        self.store = store
+        self.radius = radius if radius is not None else self.config.get('sbas', 'reference_radius', default=5)
+        self.block_size = block_size
+        self.mask = ValidityMask.for_store(store)
+        self.group = store.h5.require_group('reference')
+
+    # ------------------------------------------------------------------
+    # 기준점 선정
+    # ------------------------------------------------------------------
+    def locate(self, lon: float = None, lat: float = None, index: GeocodingIndex = None) -> Tuple[int, int]:
+        """경위도 기준점 → 픽셀 (geocoding 인덱스 사용)
+
+        Args:
+            lon, lat: 기준점 (기본값: sbas.reference_point)
+            index: geocoding 인덱스 (기본값: 저장된 인덱스 또는 스택 geotransform)
+        """
+        if lon is None or lat is None:
+            point = self.config.get('sbas', 'reference_point', default={}) or {}
+            lon, lat = point.get('lon'), point.get('lat')
+        if lon is None or lat is None:
+            raise ValueError("sbas.reference_point가 설정되지 않았습니다")
+
+        if index is None:
+            if GeocodingIndex.default_path().exists():
+                index = GeocodingIndex.load()
+            elif self.store.geotransform is not None:
+                index = GeocodingIndex.from_geotransform(self.store.geotransform, self.store.shape)
+            else:
+                raise FileNotFoundError("geocoding 인덱스가 없습니다 (s1-query --build-index로 생성)")
+        rows, cols, valid = index.lookup(lon, lat)
+        if not valid[0]:
+            raise ValueError(f"기준점이 스택 영역 밖입니다: ({lon}, {lat})")
+        return int(rows[0]), int(cols[0])
+
+    def _locate_or_auto(self) -> Tuple[int, int]:
+        """설정 기준점 위치, 스택 영역 밖이면 coherence 기반 자동 선정 (작업 공간 AOI 등)"""
+        try:
+            return self.locate()
+        except ValueError as e:
+            logger.warning(f"{e} - coherence 기반 자동 선정으로 대체합니다")
+            return self.auto_select()
+
+    def auto_select(self, min_valid_fraction: float = 0.9) -> Tuple[int, int]:
+        """평균 coherence가 가장 높은 창의 중심 자동 선정
+
+        블록마다 간섭도 평균 coherence를 구하고 창 평균이 최대인 위치를 찾습니다.
+        창이 블록 경계를 넘지 않도록 블록 내부에서만 찾습니다.
+        """
+        size = 2 * self.radius + 1
+        best_score, best = -np.inf, None
+        for window in self.store.iter_windows(self.block_size, mask=self.mask):
+            coherence = self.store.read_stack('interferograms/coherence', window)
+            phase_valid = np.isfinite(self.store.read_stack('interferograms/unwrapped_phase', window)).all(axis=0)
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                mean_coh = np.nan_to_num(np.where(phase_valid, np.nanmean(coherence, axis=0), 0.0))
+            if self.mask is not None:
+                mean_coh = np.where(self.mask.window(window), mean_coh, 0.0)
+            if min(mean_coh.shape) < size:
+                continue
+
+            score = _window_sum(mean_coh, size) / size ** 2
+            valid_fraction = _window_sum(phase_valid.astype(np.float64), size) / size ** 2
+            score[valid_fraction < min_valid_fraction] = -np.inf
+            r, c = np.unravel_index(np.argmax(score), score.shape)
+            if score[r, c] > best_score:
+                best_score = score[r, c]
+                best = (window[0].start + r + self.radius, window[1].start + c + self.radius)
+
+        if best is None:
+            raise ValueError("자동 기준점을 찾을 수 없습니다 (유효 픽셀 부족)")
+        logger.info(f"자동 기준점: 픽셀 {best}, 평균 coherence {best_score:.3f}")
+        return best
+
+    # ------------------------------------------------------------------
+    # 적용
+    # ------------------------------------------------------------------
+    def reference_values(self, row: int, col: int) -> np.ndarray:
+        """간섭도별 기준 창 median (N,)"""
+        window = (
+            slice(max(row - self.radius, 0), min(row + self.radius + 1, self.store.length)),
+            slice(max(col - self.radius, 0), min(col + self.radius + 1, self.store.width)),
+        )
+        phase = self.store.read_stack('interferograms/unwrapped_phase', window)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # 전부 NaN인 간섭도 → NaN
+            return np.nanmedian(phase.reshape(phase.shape[0], -1), axis=1)
+
+    @property
+    def referenced(self) -> np.ndarray:
+        """간섭도별 기준점 정규화 여부"""
+        done = np.zeros(len(self.store.pairs), dtype=bool)
+        flags = self.group.attrs.get('referenced', [])
+        done[:len(flags)] = flags
+        return done
+
+    def apply(self, indices: Sequence[int] = None, row: int = None, col: int = None, auto: bool = None):
+        """기준 창 median을 간섭도마다 빼서 스택에 덮어씀 (블록 스트리밍 1회)
+
+        기준점은 한 번 정해지면 스택에 저장되어 이후 증분 간섭도에도 같은 위치를 씁니다.
+
+        Args:
+            indices: 대상 간섭도 (기본값: 아직 정규화되지 않은 전부)
+            row, col: 기준 픽셀 직접 지정
+            auto: True면 coherence 기반 자동 선정 (기본값: 설정에 기준점이 없을 때)
+        """
+        done = self.referenced
+        if indices is None:
+            indices = np.flatnonzero(~done)
+        indices = np.asarray([i for i in indices if not done[i]], dtype=np.int64)
+        if indices.size == 0:
+            logger.info("정규화할 간섭도가 없습니다")
+            return
+
+        if row is None or col is None:
+            if 'pixel' in self.group.attrs:
+                row, col = (int(v) for v in self.group.attrs['pixel'])
+            else:
+                if auto is None:
+                    auto = not self.config.get('sbas', 'reference_point')
+                row, col = self.auto_select() if auto else self._locate_or_auto()
+        self.group.attrs['pixel'] = (row, col)
+
+        offsets = self.reference_values(row, col)[indices]
+        bad = ~np.isfinite(offsets)
+        if bad.any():
+            logger.warning(f"기준 창에 유효 값이 없는 간섭도 {bad.sum()}개 - 보정하지 않음")
+            offsets = np.where(bad, 0.0, offsets)
+
+        for window in self.store.iter_windows(self.block_size, mask=self.mask):
+            phase = self.store.read_stack('interferograms/unwrapped_phase', window, index=indices)
+            self.store.write_stack(
+                'interferograms/unwrapped_phase', window,
+                phase - offsets[:, None, None], index=indices
+            )
+
+        done[indices[~bad]] = True
+        self.group.attrs['referenced'] = done
+        if self.mask is not None:
+            self.mask.mark_corrections()
+        logger.info(f"기준점 정규화 완료: 픽셀 ({row}, {col}), 간섭도 {indices.size}개")
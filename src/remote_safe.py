@@ -0,0 +1,593 @@
+"""
+Remote SAFE Module
+원격 Sentinel-1 SAFE zip에서 AOI burst만 HTTP Range 요청으로 받아 부분 SAFE 생성
+
+zip 중앙 디렉토리(EOCD/zip64)와 annotation XML만 먼저 읽어 AOI와 겹치는 burst를
+찾고, 측정 TIFF에서는 해당 burst 행의 strip 바이트 구간만 받습니다. 결과는 원본과
+같은 오프셋을 갖는 sparse 파일로 기록되므로 TIFF/annotation 메타데이터가 그대로
+유효하고, 받지 않은 burst는 0(디스크에서는 hole)으로 남습니다.
+
+Example:
+    retriever = BurstSubsetRetriever(session=asf_session)
+    safe_dir = retriever.fetch(row['url'], row['title'], raw_dir)
+"""
+
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence, Tuple
+import json
+import logging
+import os
+import shutil
+import struct
+import threading
+import time
+import xml.etree.ElementTree as ET
+import zlib
+
+import numpy as np
+from shapely.geometry import MultiPoint, box
+
+from .config import get_config
+from .utils import format_file_size
+
+logger = logging.getLogger(__name__)
+
+
+# ----------------------------------------------------------------------
+# 전송 계층 (테스트에서는 FileRangeReader나 다른 구현을 주입)
+# ----------------------------------------------------------------------
+class RangeReader(ABC):
+    """바이트 구간 읽기 인터페이스 (구현은 read와 size 제공)"""
+
+    size: int = 0
+
+    def __init__(self):
+        self.bytes_read = 0
+        self._count_lock = threading.Lock()
+
+    def _count(self, nbytes: int):
+        with self._count_lock:
+            self.bytes_read += nbytes
+
+    @abstractmethod
+    def read(self, offset: int, length: int) -> bytes:
+        """offset부터 length 바이트 읽기 (_count로 전송량 집계)"""
+
+
+class FileRangeReader(RangeReader):
+    """로컬 파일 구간 읽기 (이미 받은 zip 또는 테스트용)"""
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = Path(path)
+        self.size = self.path.stat().st_size
+
+    def read(self, offset: int, length: int) -> bytes:
+        with open(self.path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(length)
+        self._count(len(data))
+        return data
+
+
+class HttpRangeReader(RangeReader):
+    """HTTP Range 요청 구간 읽기
+
+    ASF 다운로드 URL은 Earthdata 인증 후 서명된 URL로 리다이렉트되므로
+    첫 요청에서 최종 URL을 확정하고 이후 요청은 그 URL로 바로 보냅니다.
+    """
+
+    def __init__(self, url: str, session=None, retries: int = 3, timeout: int = 120):
+        """
+        Args:
+            url: 원격 파일 URL
+            session: requests.Session (ASFSession 포함, 기본값: 새 세션)
+            retries: 구간별 재시도 횟수
+            timeout: 요청 타임아웃 (초)
+        """
+        super().__init__()
+        import requests
+
+        self.session = session or requests.Session()
+        self.retries = retries
+        self.timeout = timeout
+        response = self.session.get(url, headers={'Range': 'bytes=0-0'}, allow_redirects=True, timeout=timeout)
+        response.raise_for_status()
+        if response.status_code != 206 or 'Content-Range' not in response.headers:
+            raise IOError(f"서버가 Range 요청을 지원하지 않습니다: {url}")
+        self.url = response.url
+        self.size = int(response.headers['Content-Range'].rsplit('/', 1)[1])
+
+    def read(self, offset: int, length: int) -> bytes:
+        headers = {'Range': f"bytes={offset}-{offset + length - 1}"}
+        for attempt in range(1, self.retries + 1):
+            try:
+                response = self.session.get(self.url, headers=headers, timeout=self.timeout)
+                response.raise_for_status()
+                if response.status_code == 206 and len(response.content) == length:
+                    self._count(length)
+                    return response.content
+                raise IOError(f"잘못된 Range 응답 (status {response.status_code}, {len(response.content)} bytes)")
+            except Exception as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"Range 요청 재시도 ({attempt}/{self.retries}): {e}")
+                time.sleep(2 ** attempt)
+
+
+# ----------------------------------------------------------------------
+# zip 중앙 디렉토리
+# ----------------------------------------------------------------------
+_EOCD_SIG = b'PK\x05\x06'
+_ZIP64_LOCATOR_SIG = b'PK\x06\x07'
+_ZIP64_EOCD_SIG = b'PK\x06\x06'
+_CENTRAL_SIG = b'PK\x01\x02'
+_LOCAL_HEADER = struct.Struct('<IHHHHHIIIHH')
+_CENTRAL_HEADER = struct.Struct('<IHHHHHHIIIHHHHHII')
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+
+@dataclass
+class ZipMember:
+    """zip 멤버 (data_offset은 로컬 헤더를 읽은 뒤 채워짐)"""
+    name: str
+    method: int
+    compressed_size: int
+    size: int
+    header_offset: int
+    data_offset: int = None
+
+
+def _parse_zip64_extra(extra: bytes, size: int, compressed: int, offset: int) -> Tuple[int, int, int]:
+    pos = 0
+    while pos + 4 <= len(extra):
+        tag, length = struct.unpack_from('<HH', extra, pos)
+        if tag == 0x0001:
+            values = iter(struct.unpack_from(f'<{length // 8}Q', extra, pos + 4))
+            if size == 0xFFFFFFFF:
+                size = next(values)
+            if compressed == 0xFFFFFFFF:
+                compressed = next(values)
+            if offset == 0xFFFFFFFF:
+                offset = next(values)
+            break
+        pos += 4 + length
+    return size, compressed, offset
+
+
+def read_central_directory(reader: RangeReader) -> Dict[str, ZipMember]:
+    """원격 zip의 중앙 디렉토리 읽기 (zip64 지원)
+
+    Returns:
+        {멤버 이름: ZipMember}
+    """
+    tail_size = min(reader.size, 65536 + 22 + 20)
+    tail_offset = reader.size - tail_size
+    tail = reader.read(tail_offset, tail_size)
+    pos = tail.rfind(_EOCD_SIG)
+    if pos < 0:
+        raise ValueError("zip EOCD를 찾을 수 없습니다")
+    _, _, _, _, n_entries, cd_size, cd_offset, _ = struct.unpack_from('<IHHHHIIH', tail, pos)
+
+    if n_entries == 0xFFFF or cd_size == 0xFFFFFFFF or cd_offset == 0xFFFFFFFF:
+        locator = pos - 20
+        if locator < 0 or tail[locator:locator + 4] != _ZIP64_LOCATOR_SIG:
+            raise ValueError("zip64 EOCD locator를 찾을 수 없습니다")
+        eocd64_offset = struct.unpack_from('<Q', tail, locator + 8)[0]
+        record = reader.read(eocd64_offset, 56)
+        if record[:4] != _ZIP64_EOCD_SIG:
+            raise ValueError("zip64 EOCD 레코드가 잘못되었습니다")
+        n_entries, cd_size, cd_offset = struct.unpack_from('<QQQ', record, 32)
+
+    if cd_offset >= tail_offset:
+        directory = tail[cd_offset - tail_offset:cd_offset - tail_offset + cd_size]
+    else:
+        directory = reader.read(cd_offset, cd_size)
+
+    members = {}
+    pos = 0
+    for _ in range(n_entries):
+        if directory[pos:pos + 4] != _CENTRAL_SIG:
+            raise ValueError("중앙 디렉토리 항목이 잘못되었습니다")
+        fields = _CENTRAL_HEADER.unpack_from(directory, pos)
+        method, compressed, size = fields[4], fields[8], fields[9]
+        name_len, extra_len, comment_len, offset = fields[10], fields[11], fields[12], fields[16]
+        start = pos + _CENTRAL_HEADER.size
+        name = directory[start:start + name_len].decode('utf-8')
+        extra = directory[start + name_len:start + name_len + extra_len]
+        size, compressed, offset = _parse_zip64_extra(extra, size, compressed, offset)
+        members[name] = ZipMember(name, method, compressed, size, offset)
+        pos = start + name_len + extra_len + comment_len
+    return members
+
+
+def resolve_data_offset(reader: RangeReader, member: ZipMember) -> int:
+    """로컬 헤더를 읽어 멤버 데이터 시작 오프셋 계산"""
+    if member.data_offset is None:
+        header = reader.read(member.header_offset, _LOCAL_HEADER.size)
+        fields = _LOCAL_HEADER.unpack(header)
+        member.data_offset = member.header_offset + _LOCAL_HEADER.size + fields[9] + fields[10]
+    return member.data_offset
+
+
+def read_member(reader: RangeReader, member: ZipMember) -> bytes:
+    """멤버 전체 읽기 (stored/deflate)"""
+    offset = resolve_data_offset(reader, member)
+    data = reader.read(offset, member.compressed_size) if member.compressed_size else b''
+    if member.method == ZIP_DEFLATED:
+        return zlib.decompressobj(-15).decompress(data)
+    if member.method != ZIP_STORED:
+        raise ValueError(f"지원하지 않는 압축 방식 ({member.method}): {member.name}")
+    return data
+
+
+# ----------------------------------------------------------------------
+# TIFF strip 배치
+# ----------------------------------------------------------------------
+_TIFF_TYPE_SIZES = {1: 1, 2: 1, 3: 2, 4: 4, 5: 8, 6: 1, 7: 1, 8: 2, 9: 4, 10: 8, 11: 4, 12: 8, 16: 8, 17: 8, 18: 8}
+_TIFF_TYPE_CODES = {1: 'B', 3: 'H', 4: 'I', 8: 'h', 9: 'i', 16: 'Q', 17: 'q'}
+
+
+@dataclass
+class TiffLayout:
+    """비압축 strip TIFF의 데이터 배치"""
+    width: int
+    length: int
+    bits_per_sample: int
+    sample_format: int
+    samples_per_pixel: int
+    rows_per_strip: int
+    strip_offsets: np.ndarray
+    strip_byte_counts: np.ndarray
+
+    @property
+    def is_complex_int16(self) -> bool:
+        """Sentinel-1 SLC 형식 (SampleFormat 5 = 복소 정수, 실수/허수 각 16bit)"""
+        return self.sample_format == 5 and self.bits_per_sample == 32
+
+    def strips_for_rows(self, row0: int, row1: int) -> np.ndarray:
+        """[row0, row1) 행을 포함하는 strip 인덱스"""
+        return np.arange(row0 // self.rows_per_strip, (row1 - 1) // self.rows_per_strip + 1)
+
+    def data_ranges(self, row0: int, row1: int) -> List[Tuple[int, int]]:
+        """[row0, row1) 행의 (TIFF 내 오프셋, 길이) 목록 (연속 구간 병합)"""
+        strips = self.strips_for_rows(row0, row1)
+        return merge_ranges(zip(self.strip_offsets[strips].tolist(), self.strip_byte_counts[strips].tolist()))
+
+
+def merge_ranges(ranges, gap: int = 0) -> List[Tuple[int, int]]:
+    """(offset, length) 구간을 정렬하고 gap 이하로 떨어진 구간은 병합"""
+    merged = []
+    for offset, length in sorted(ranges):
+        if merged and offset <= merged[-1][0] + merged[-1][1] + gap:
+            start = merged[-1][0]
+            merged[-1] = (start, max(merged[-1][1], offset + length - start))
+        else:
+            merged.append((offset, length))
+    return merged
+
+
+def read_tiff_layout(read: Callable[[int, int], bytes]) -> TiffLayout:
+    """TIFF/BigTIFF 첫 IFD에서 strip 배치 읽기
+
+    Args:
+        read: (offset, length) → bytes (TIFF 파일 기준 오프셋)
+    """
+    header = read(0, 16)
+    endian = {b'II': '<', b'MM': '>'}.get(header[:2])
+    if endian is None:
+        raise ValueError("TIFF 헤더가 아닙니다")
+    version = struct.unpack_from(endian + 'H', header, 2)[0]
+    if version == 42:
+        ifd_offset = struct.unpack_from(endian + 'I', header, 4)[0]
+        count_fmt, entry_fmt, entry_size, inline = 'H', 'HHII', 12, 4
+    elif version == 43:
+        ifd_offset = struct.unpack_from(endian + 'Q', header, 8)[0]
+        count_fmt, entry_fmt, entry_size, inline = 'Q', 'HHQQ', 20, 8
+    else:
+        raise ValueError(f"지원하지 않는 TIFF 버전: {version}")
+
+    count_size = struct.calcsize(count_fmt)
+    n_entries = struct.unpack(endian + count_fmt, read(ifd_offset, count_size))[0]
+    entries = read(ifd_offset + count_size, n_entries * entry_size)
+
+    tags = {}
+    for i in range(n_entries):
+        tag, dtype, count, value = struct.unpack_from(endian + entry_fmt, entries, i * entry_size)
+        if dtype not in _TIFF_TYPE_CODES:
+            continue
+        nbytes = _TIFF_TYPE_SIZES[dtype] * count
+        if nbytes <= inline:
+            raw = entries[i * entry_size + entry_size - inline:][:nbytes]
+        else:
+            raw = read(value, nbytes)
+        tags[tag] = np.frombuffer(raw, dtype=np.dtype(endian + _TIFF_TYPE_CODES[dtype]), count=count)
+
+    if 322 in tags:
+        raise ValueError("타일 TIFF는 지원하지 않습니다 (strip TIFF만 가능)")
+    if int(tags.get(259, [1])[0]) != 1:
+        raise ValueError("압축된 TIFF는 구간 읽기를 지원하지 않습니다")
+    length = int(tags[257][0])
+    return TiffLayout(
+        width=int(tags[256][0]),
+        length=length,
+        bits_per_sample=int(tags.get(258, [8])[0]),
+        sample_format=int(tags.get(339, [1])[0]),
+        samples_per_pixel=int(tags.get(277, [1])[0]),
+        rows_per_strip=int(tags.get(278, [length])[0]),
+        strip_offsets=tags[273].astype(np.int64),
+        strip_byte_counts=tags[279].astype(np.int64),
+    )
+
+
+# ----------------------------------------------------------------------
+# annotation / burst
+# ----------------------------------------------------------------------
+@dataclass
+class BurstInfo:
+    """annotation의 burst 하나"""
+    swath: str
+    polarization: str
+    index: int
+    first_line: int
+    lines: int
+    footprint: object                               # shapely Polygon (경위도)
+    annotation: str                                 # zip 멤버 이름
+    measurement: str                                # zip 멤버 이름
+
+
+def _text(root: ET.Element, path: str, default=None):
+    node = root.find(path)
+    return node.text.strip() if node is not None and node.text else default
+
+
+def parse_bursts(xml_bytes: bytes, annotation: str, measurement: str) -> List[BurstInfo]:
+    """annotation XML → burst 목록 (geolocation grid로 burst 경계 다각형 계산)"""
+    root = ET.fromstring(xml_bytes)
+    swath = _text(root, 'adsHeader/swath', '')
+    polarization = _text(root, 'adsHeader/polarisation', '')
+    lines_per_burst = int(_text(root, 'swathTiming/linesPerBurst', '0'))
+    bursts = root.findall('swathTiming/burstList/burst')
+
+    grid = np.array([
+        (float(_text(p, 'line')), float(_text(p, 'latitude')), float(_text(p, 'longitude')))
+        for p in root.findall('geolocationGrid/geolocationGridPointList/geolocationGridPoint')
+    ])
+    if not len(bursts) or not len(grid):
+        return []
+    grid_lines = np.unique(grid[:, 0])
+
+    result = []
+    for k in range(len(bursts)):
+        first, last = k * lines_per_burst, (k + 1) * lines_per_burst - 1
+        # burst 경계에 가장 가까운 격자 행 두 개 사이의 점들
+        top = grid_lines[np.argmin(np.abs(grid_lines - first))]
+        bottom = grid_lines[np.argmin(np.abs(grid_lines - last))]
+        if bottom <= top:
+            bottom = grid_lines[min(np.searchsorted(grid_lines, top) + 1, len(grid_lines) - 1)]
+        points = grid[(grid[:, 0] >= top) & (grid[:, 0] <= bottom)]
+        result.append(BurstInfo(
+            swath=swath.upper(),
+            polarization=polarization.upper(),
+            index=k,
+            first_line=first,
+            lines=lines_per_burst,
+            footprint=MultiPoint(points[:, [2, 1]].tolist()).convex_hull,
+            annotation=annotation,
+            measurement=measurement,
+        ))
+    return result
+
+
+class RemoteSafe:
+    """원격(또는 로컬) SAFE zip 구간 읽기"""
+
+    def __init__(self, reader: RangeReader):
+        self.reader = reader
+        self.members = read_central_directory(reader)
+        self._layouts: Dict[str, TiffLayout] = {}
+        self._bursts: List[BurstInfo] = None
+
+    @property
+    def safe_name(self) -> str:
+        return next(iter(self.members)).split('/')[0]
+
+    def annotation_members(self) -> List[str]:
+        """swath별 product annotation (calibration/noise 제외)"""
+        return sorted(
+            name for name in self.members
+            if '/annotation/' in name and name.endswith('.xml') and name.count('/') == 2
+        )
+
+    def measurement_for(self, annotation: str) -> str:
+        return annotation.replace('/annotation/', '/measurement/')[:-4] + '.tiff'
+
+    def bursts(self) -> List[BurstInfo]:
+        """모든 swath/편파의 burst 목록"""
+        if self._bursts is None:
+            self._bursts = []
+            for name in self.annotation_members():
+                xml_bytes = read_member(self.reader, self.members[name])
+                self._bursts.extend(parse_bursts(xml_bytes, name, self.measurement_for(name)))
+        return self._bursts
+
+    def select_bursts(self, aoi_bbox: Sequence[float], polarization: str = None) -> List[BurstInfo]:
+        """AOI와 겹치는 burst
+
+        Args:
+            aoi_bbox: [min_lat, max_lat, min_lon, max_lon]
+            polarization: 'VV' 등 (기본값: 전체)
+        """
+        min_lat, max_lat, min_lon, max_lon = aoi_bbox
+        aoi = box(min_lon, min_lat, max_lon, max_lat)
+        return [
+            b for b in self.bursts()
+            if b.footprint.intersects(aoi) and (polarization is None or b.polarization == polarization.upper())
+        ]
+
+    def tiff_layout(self, measurement: str) -> TiffLayout:
+        """측정 TIFF의 strip 배치 (zip 안에 비압축으로 저장된 경우만)"""
+        if measurement not in self._layouts:
+            member = self.members[measurement]
+            if member.method != ZIP_STORED:
+                raise ValueError(f"압축된 측정 파일은 구간 읽기를 할 수 없습니다: {measurement}")
+            base = resolve_data_offset(self.reader, member)
+            self._layouts[measurement] = read_tiff_layout(lambda o, n: self.reader.read(base + o, n))
+        return self._layouts[measurement]
+
+    def read_lines(self, measurement: str, row0: int, row1: int) -> np.ndarray:
+        """측정 TIFF의 [row0, row1) 행 읽기 → (rows, width) complex64 (SLC) 또는 원래 형식"""
+        layout = self.tiff_layout(measurement)
+        base = self.members[measurement].data_offset
+        strips = layout.strips_for_rows(row0, row1)
+        raw = b''.join(
+            self.reader.read(base + offset, length)
+            for offset, length in layout.data_ranges(row0, row1)
+        )
+        first_row = int(strips[0]) * layout.rows_per_strip
+        if layout.is_complex_int16:
+            pairs = np.frombuffer(raw, dtype='<i2').reshape(-1, layout.width, 2)
+            block = pairs[..., 0].astype(np.float32) + 1j * pairs[..., 1].astype(np.float32)
+        else:
+            block = np.frombuffer(raw, dtype=np.dtype(f'<u{layout.bits_per_sample // 8}')).reshape(-1, layout.width)
+        return block[row0 - first_row:row1 - first_row]
+
+
+# ----------------------------------------------------------------------
+# 부분 SAFE 생성
+# ----------------------------------------------------------------------
+class BurstSubsetRetriever:
+    """AOI burst만 담은 부분 SAFE 생성기"""
+
+    def __init__(self, session=None, reader_factory: Callable[[str], RangeReader] = None):
+        """
+        Args:
+            session: HTTP 세션 (ASFSession)
+            reader_factory: url → RangeReader (기본값: HttpRangeReader, 테스트용 주입 가능)
+        """
+        self.config = get_config()
+        self.reader_factory = reader_factory or (lambda url: HttpRangeReader(url, session=session))
+        self.workers = self.config.get('burst_subset', 'workers', default=4)
+        self.chunk_bytes = int(self.config.get('burst_subset', 'chunk_mb', default=16) * 1024**2)
+        self.polarization = self.config.get('sentinel1', 'polarization')
+
+    def _copy_ranges(self, reader: RangeReader, base: int, ranges: List[Tuple[int, int]], fd: int):
+        """원격 구간을 같은 오프셋으로 로컬 파일에 기록 (청크 단위 병렬)"""
+        chunks = [
+            (offset + pos, min(self.chunk_bytes, length - pos))
+            for offset, length in ranges
+            for pos in range(0, length, self.chunk_bytes)
+        ]
+
+        def copy(chunk):
+            offset, length = chunk
+            os.pwrite(fd, reader.read(base + offset, length), offset)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(copy, chunks))
+
+    def _write_measurement(self, safe: RemoteSafe, measurement: str, bursts: List[BurstInfo], path: Path):
+        member = safe.members[measurement]
+        layout = safe.tiff_layout(measurement)
+
+        # strip 데이터 외의 구간(헤더, IFD, 태그 배열)은 모두 받아 TIFF 구조를 그대로 유지
+        data = merge_ranges(zip(layout.strip_offsets.tolist(), layout.strip_byte_counts.tolist()))
+        metadata, cursor = [], 0
+        for offset, length in data:
+            if offset > cursor:
+                metadata.append((cursor, offset - cursor))
+            cursor = max(cursor, offset + length)
+        if cursor < member.size:
+            metadata.append((cursor, member.size - cursor))
+
+        wanted = [r for b in bursts for r in layout.data_ranges(b.first_line, b.first_line + b.lines)]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as f:
+            f.truncate(member.size)  # sparse 파일: 받지 않은 burst는 hole
+        fd = os.open(path, os.O_WRONLY)
+        try:
+            self._copy_ranges(safe.reader, member.data_offset, merge_ranges(metadata + wanted), fd)
+        finally:
+            os.close(fd)
+
+    def fetch(
+        self,
+        url: str,
+        title: str = None,
+        output_dir: str = None,
+        aoi_bbox: Sequence[float] = None
+    ) -> Path:
+        """AOI burst만 담은 <title>.SAFE 디렉토리 생성
+
+        Args:
+            url: SAFE zip URL
+            title: 장면 이름 (기본값: zip 안의 SAFE 이름)
+            output_dir: 출력 디렉토리 (기본값: paths.raw_data_dir)
+            aoi_bbox: [min_lat, max_lat, min_lon, max_lon] (기본값: AOI)
+
+        Returns:
+            생성된 SAFE 디렉토리 경로
+        """
+        if aoi_bbox is None:
+            aoi = self.config.get('aoi')
+            aoi_bbox = [aoi['min_lat'], aoi['max_lat'], aoi['min_lon'], aoi['max_lon']]
+        output_dir = Path(output_dir) if output_dir else self.config.get_path('raw_data_dir')
+
+        reader = self.reader_factory(url)
+        safe = RemoteSafe(reader)
+        safe_dir = output_dir / safe.safe_name
+        if title and not safe.safe_name.startswith(title):
+            raise ValueError(f"zip 내용이 장면과 다릅니다: {title} vs {safe.safe_name}")
+
+        selected = safe.select_bursts(aoi_bbox, self.polarization)
+        if not selected:
+            raise ValueError(f"AOI와 겹치는 burst가 없습니다: {safe.safe_name}")
+        by_measurement: Dict[str, List[BurstInfo]] = {}
+        for burst in selected:
+            by_measurement.setdefault(burst.measurement, []).append(burst)
+
+        # 임시 디렉토리에 만든 뒤 완성되면 이름을 바꿔, 중단된 전송이 빈 구멍(0)이 있는
+        # SAFE로 남아 다운로드된 장면처럼 보이지 않게 함
+        staging = output_dir / f"{safe.safe_name}.partial"
+        if staging.exists():
+            shutil.rmtree(staging)
+        try:
+            for name, member in safe.members.items():
+                if name.endswith('/'):
+                    continue
+                path = staging / name
+                if '/measurement/' in name:
+                    self._write_measurement(safe, name, by_measurement.get(name, []), path)
+                else:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    path.write_bytes(read_member(reader, member))
+
+            summary = {
+                'url': url,
+                'aoi_bbox': list(aoi_bbox),
+                'bursts': {
+                    Path(m).name: [b.index for b in bursts] for m, bursts in by_measurement.items()
+                },
+                'bytes_read': reader.bytes_read,
+                'zip_size': reader.size,
+            }
+            with open(staging / safe.safe_name / 'subset.json', 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2)
+
+            if safe_dir.exists():
+                shutil.rmtree(safe_dir)
+            os.replace(staging / safe.safe_name, safe_dir)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging)
+
+        logger.info(
+            f"부분 SAFE 생성: {safe_dir.name} (burst {len(selected)}개, "
+            f"전송 {format_file_size(reader.bytes_read)} / 전체 {format_file_size(reader.size)})"
+        )
+        return safe_dir
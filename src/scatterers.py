@@ -0,0 +1,267 @@
+"""
+Scatterer Candidate Module
+스택 전체 통계로 PS/DS(영구/분산 산란체) 후보 픽셀 선정
+
+블록마다 간섭도를 청크 깊이 단위로 한 번만 읽으며 Welford(Chan 병합) 방식의
+이동 평균/분산을 갱신합니다. 스택 전체를 메모리에 올리지 않습니다.
+
+    진폭 분산 지수    D_A = σ_A / μ_A               (작을수록 안정적인 점 산란체)
+    평균 coherence    간섭도 coherence의 시간 평균   (분산 산란체 판정)
+    시간 coherence    |Σ exp(j(φ − φ_model))| / n   (SBAS 해가 있을 때만, φ_model은 변위 시계열로 재구성)
+
+결과는 전체 래스터가 아니라 후보 픽셀 좌표와 통계만 담은 희소 인덱스(.npz)이며,
+이후 단계는 ScattererCandidates.iter_windows()로 블록별 후보만 순회합니다.
+"""
+
+import argparse
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Tuple
+import logging
+
+import numpy as np
+
+from .config import get_config
+from .masking import ValidityMask
+from .stack import StackStore
+from .time_series import phase_to_mm
+
+logger = logging.getLogger(__name__)
+
+PS = 1
+DS = 2
+
+
+class RunningMoments:
+    """픽셀별 평균/분산 누적 (NaN 제외, 배치 단위 Welford-Chan 병합)"""
+
+    def __init__(self, size: int):
+        self.count = np.zeros(size, dtype=np.int64)
+        self.mean = np.zeros(size, dtype=np.float64)
+        self.m2 = np.zeros(size, dtype=np.float64)
+
+    def update(self, batch: np.ndarray):
+        """(n, size) 배치 병합"""
+        valid = ~np.isnan(batch)
+        n_b = valid.sum(axis=0)
+        values = np.where(valid, batch, 0.0).astype(np.float64)
+        mean_b = values.sum(axis=0) / np.maximum(n_b, 1)
+        m2_b = (np.where(valid, values - mean_b, 0.0) ** 2).sum(axis=0)
+
+        n = self.count + n_b
+        safe_n = np.maximum(n, 1)
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / safe_n
+        self.m2 += m2_b + delta ** 2 * self.count * n_b / safe_n
+        self.count = n
+
+    @property
+    def std(self) -> np.ndarray:
+        """표본 표준편차 (표본 2개 미만이면 NaN)"""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.count > 1, np.sqrt(self.m2 / (self.count - 1)), np.nan)
+
+
+@dataclass
+class ScattererCandidates:
+    """PS/DS 후보 희소 인덱스 (행 우선 픽셀 순서로 정렬)"""
+    shape: Tuple[int, int]
+    rows: np.ndarray
+    cols: np.ndarray
+    kind: np.ndarray                  # PS=1, DS=2
+    amplitude_dispersion: np.ndarray
+    mean_coherence: np.ndarray
+    temporal_coherence: np.ndarray    # SBAS 해가 없으면 NaN
+    n_samples: np.ndarray
+
+    FIELDS = ('rows', 'cols', 'kind', 'amplitude_dispersion', 'mean_coherence', 'temporal_coherence', 'n_samples')
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @staticmethod
+    def default_path() -> Path:
+        """설정 파일의 scatterers.output"""
+        config = get_config()
+        return config.project_root / config.get(
+            'scatterers', 'output', default='./data/processed/scatterer_candidates.npz'
+        )
+
+    def save(self, path: str = None) -> Path:
+        """후보 인덱스 저장 (.npz)"""
+        path = Path(path or self.default_path())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, shape=np.array(self.shape), **{f: getattr(self, f) for f in self.FIELDS})
+        return path
+
+    @classmethod
+    def load(cls, path: str = None) -> 'ScattererCandidates':
+        """저장된 후보 인덱스 읽기 (.npz)"""
+        data = np.load(path or cls.default_path())
+        return cls(shape=tuple(int(v) for v in data['shape']), **{f: data[f] for f in cls.FIELDS})
+
+    def mask(self) -> np.ndarray:
+        """후보 위치 bool 래스터 (시각화용, 처리 단계는 iter_windows 사용)"""
+        mask = np.zeros(self.shape, dtype=bool)
+        mask[self.rows, self.cols] = True
+        return mask
+
+    def iter_windows(self, block_size: int = None) -> Iterator[Tuple[Tuple[slice, slice], np.ndarray]]:
+        """후보가 있는 블록만 순회 (StackStore.iter_windows와 같은 윈도우 경계)
+
+        Yields:
+            (window, 후보 인덱스 배열) - 블록 안 후보의 rows/cols 등을 고르는 인덱스
+        """
+        if block_size is None:
+            block_size = get_config().get('stack', 'block_size', default=256)
+        n_block_cols = -(-self.shape[1] // block_size)
+        block_ids = (self.rows // block_size) * n_block_cols + self.cols // block_size
+        order = np.argsort(block_ids, kind='stable')
+        unique_ids, starts = np.unique(block_ids[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+        for block_id, start, end in zip(unique_ids.tolist(), starts.tolist(), ends.tolist()):
+            row0 = (block_id // n_block_cols) * block_size
+            col0 = (block_id % n_block_cols) * block_size
+            window = (
+                slice(row0, min(row0 + block_size, self.shape[0])),
+                slice(col0, min(col0 + block_size, self.shape[1])),
+            )
+            yield window, order[start:end]
+
+
+class ScattererSelector:
+    """스택 스트리밍 통계 기반 PS/DS 후보 선정
+
+    Example:
+        with StackStore.open() as store:
+            candidates = ScattererSelector(store).run()
+        candidates.save()
+    """
+
+    def __init__(self, store: StackStore, block_size: int = None):
+        """
+        Args:
+            store: StackStore
+            block_size: 블록 처리 단위 (기본값: stack.block_size)
+        """
+        config = get_config()
+        self.store = store
+        self.block_size = block_size
+        self.mask = ValidityMask.for_store(store)
+        self.amplitude_dispersion = config.get('scatterers', 'amplitude_dispersion', default=0.25)
+        self.min_coherence = config.get('scatterers', 'min_coherence', default=0.5)
+        self.min_temporal_coherence = config.get('scatterers', 'min_temporal_coherence', default=0.7)
+        self.min_valid_fraction = config.get('scatterers', 'min_valid_fraction', default=0.8)
+        self.wavelength = config.get('sbas', 'wavelength', default=0.0555)
+
+    def _indices(self) -> np.ndarray:
+        """통계에 사용할 간섭도 (폐합 검사에서 제외된 것은 뺌)"""
+        keep = np.ones(len(self.store.pairs), dtype=bool)
+        if 'qc/flagged' in self.store.h5:
+            flagged = self.store.h5['qc/flagged'][:]
+            keep[:len(flagged)] &= ~flagged
+        return np.flatnonzero(keep)
+
+    def _model_operator(self, indices: np.ndarray):
+        """간섭도 → (reference, secondary) 시계열 날짜 인덱스 (SBAS 해가 없거나 날짜가 없으면 None)"""
+        if 'timeseries/displacement' not in self.store.h5:
+            return None
+        date_index = {d: i for i, d in enumerate(self.store.dates)}
+        pairs = [self.store.pairs[i] for i in indices]
+        if not all(r in date_index and s in date_index for r, s in pairs):
+            return None
+        return np.array([[date_index[r], date_index[s]] for r, s in pairs], dtype=np.int64)
+
+    def run(self) -> ScattererCandidates:
+        """블록 단위 한 번의 스트리밍 패스로 통계를 계산하고 후보 선정"""
+        indices = self._indices()
+        if indices.size == 0:
+            raise ValueError("후보 선정에 사용할 간섭도가 없습니다")
+        pair_dates = self._model_operator(indices)
+        if pair_dates is None:
+            logger.info("SBAS 변위 시계열이 없어 시간 coherence 없이 선정합니다")
+        scale = phase_to_mm(self.wavelength)
+        depth = int(self.store.h5.attrs['chunk_shape'][0])
+
+        parts = []
+        for window in self.store.iter_windows(self.block_size, mask=self.mask):
+            block_shape = (window[0].stop - window[0].start, window[1].stop - window[1].start)
+            size = block_shape[0] * block_shape[1]
+            amplitude = RunningMoments(size)
+            coherence = RunningMoments(size)
+            phasor = np.zeros(size, dtype=np.complex128)
+            n_phase = np.zeros(size, dtype=np.int64)
+            model = None
+            if pair_dates is not None:
+                model = self.store.read_stack('timeseries/displacement', window).reshape(-1, size) / scale
+
+            # 청크 깊이 단위로 읽어 같은 청크를 한 번만 압축 해제
+            for start in range(0, len(indices), depth):
+                batch = indices[start:start + depth]
+                amplitude.update(self.store.read_stack('interferograms/amplitude', window, index=batch).reshape(-1, size))
+                coherence.update(self.store.read_stack('interferograms/coherence', window, index=batch).reshape(-1, size))
+                if model is not None:
+                    phase = self.store.read_stack('interferograms/unwrapped_phase', window, index=batch).reshape(-1, size)
+                    dates = pair_dates[start:start + depth]
+                    residual = phase - (model[dates[:, 1]] - model[dates[:, 0]])
+                    valid = ~np.isnan(residual)
+                    phasor += np.where(valid, np.exp(1j * np.where(valid, residual, 0.0)), 0.0).sum(axis=0)
+                    n_phase += valid.sum(axis=0)
+
+            with np.errstate(invalid='ignore', divide='ignore'):
+                dispersion = amplitude.std / amplitude.mean
+                temporal = np.where(n_phase > 0, np.abs(phasor) / n_phase, np.nan)
+            enough = amplitude.count >= self.min_valid_fraction * len(indices)
+            if self.mask is not None:
+                enough &= self.mask.window(window).ravel()
+            is_ps = enough & (dispersion <= self.amplitude_dispersion)
+            is_ds = enough & ~is_ps & (coherence.mean >= self.min_coherence)
+            if model is not None:
+                stable = temporal >= self.min_temporal_coherence
+                is_ps &= stable
+                is_ds &= stable
+
+            selected = np.flatnonzero(is_ps | is_ds)
+            if selected.size == 0:
+                continue
+            local_rows, local_cols = np.divmod(selected, block_shape[1])
+            parts.append({
+                'rows': (local_rows + window[0].start).astype(np.int32),
+                'cols': (local_cols + window[1].start).astype(np.int32),
+                'kind': np.where(is_ps[selected], PS, DS).astype(np.uint8),
+                'amplitude_dispersion': dispersion[selected].astype(np.float32),
+                'mean_coherence': coherence.mean[selected].astype(np.float32),
+                'temporal_coherence': temporal[selected].astype(np.float32),
+                'n_samples': amplitude.count[selected].astype(np.uint16),
+            })
+
+        columns = {
+            field: np.concatenate([p[field] for p in parts]) if parts else np.empty(0, dtype=dtype)
+            for field, dtype in zip(ScattererCandidates.FIELDS,
+                                    (np.int32, np.int32, np.uint8, np.float32, np.float32, np.float32, np.uint16))
+        }
+        order = np.lexsort((columns['cols'], columns['rows']))
+        candidates = ScattererCandidates(shape=self.store.shape, **{k: v[order] for k, v in columns.items()})
+        n_ps = int((candidates.kind == PS).sum())
+        logger.info(
+            f"PS/DS 후보 선정: PS {n_ps}개, DS {len(candidates) - n_ps}개 "
+            f"(전체 {self.store.length * self.store.width}픽셀, 간섭도 {len(indices)}개)"
+        )
+        return candidates
+
+
+def main():
+    """메인 실행 함수"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="스택 통계 기반 PS/DS 후보 선정")
+    parser.add_argument('--store', default=None, help='스택 HDF5 경로')
+    parser.add_argument('--output', default=None, help='후보 인덱스 경로 (.npz, 기본값: scatterers.output)')
+    args = parser.parse_args()
+
+    with StackStore.open(args.store) as store:
+        candidates = ScattererSelector(store).run()
+    print(candidates.save(args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Stack Store Module
+간섭도 스택과 SBAS 시계열을 청크 단위 HDF5 파일 하나로 관리
+
+구조:
+    /interferograms/pairs            (N, 2)    'YYYYMMDD' 날짜 쌍
+    /interferograms/unwrapped_phase  (N, L, W) float32 (radians)
+    /interferograms/coherence        (N, L, W) float32
+    /interferograms/amplitude        (N, L, W) float32
+    /timeseries/dates                (T,)      'YYYYMMDD'
+    /timeseries/displacement         (T, L, W) float32 (mm, 첫 날짜 기준)
+    /timeseries/velocity             (L, W)    float32 (mm/yr)
+    /geometry/<name>                 (L, W)    float32 (height, incidence 등)
+    /mask/...                        유효 픽셀 비트마스크 (src/masking.py)
+
+모든 3D 데이터셋은 (시간, 행, 열) 청크로 저장되고 첫 축으로 확장 가능하므로
+픽셀/블록 단위 읽기와 새 간섭도 추가가 전체 파일을 다시 쓰지 않고 가능합니다.
+"""
+
+from pathlib import Path
+from typing import Iterator, List, Sequence, Tuple
+import logging
+
+import h5py
+import numpy as np
+
+from .config import get_config
+
+logger = logging.getLogger(__name__)
+
+Window = Tuple[slice, slice]
+
+IFG_DATASETS = ('unwrapped_phase', 'coherence', 'amplitude')
+
+
+def _encode_dates(dates: Sequence[str]) -> np.ndarray:
+    return np.array([str(d).replace('-', '')[:8] for d in dates], dtype='S8')
+
+
+def _decode_dates(values: np.ndarray) -> List[str]:
+    return [v.decode('ascii') for v in values]
+
+
+class StackStore:
+    """간섭도/시계열 스택 저장소 (HDF5)
+
+    Example:
+        with StackStore.open() as store:
+            for window in store.iter_windows():
+                phase = store.read_stack('interferograms/unwrapped_phase', window)
+    """
+
+    def __init__(self, path: str, mode: str = 'r', cache_mb: int = 64):
+        """
+        Args:
+            path: HDF5 파일 경로
+            mode: h5py 파일 모드 ('r', 'r+', 'w')
+            cache_mb: HDF5 청크 캐시 크기 (MB)
+        """
+        self.path = Path(path)
+        self.h5 = h5py.File(self.path, mode, rdcc_nbytes=cache_mb * 1024**2, rdcc_nslots=10007)
+
+    @staticmethod
+    def default_path() -> Path:
+        """설정 파일의 stack.store_path"""
+        config = get_config()
+        return config.project_root / config.get('stack', 'store_path', default='./data/processed/stack.h5')
+
+    @classmethod
+    def open(cls, path: str = None, mode: str = 'r') -> 'StackStore':
+        """기존 스택 열기"""
+        return cls(path or cls.default_path(), mode)
+
+    @classmethod
+    def create(
+        cls,
+        length: int,
+        width: int,
+        path: str = None,
+        geotransform: Tuple[float, float, float, float] = None,
+        chunk_shape: Tuple[int, int, int] = None
+    ) -> 'StackStore':
+        """새 스택 생성 (기존 파일 덮어쓰기)
+
+        Args:
+            length: 행 수
+            width: 열 수
+            path: 파일 경로 (기본값: stack.store_path)
+            geotransform: (lon0, dlon, lat0, dlat) 지오코딩된 스택이면 지정
+            chunk_shape: (시간, 행, 열) 청크 크기
+        """
+        if chunk_shape is None:
+            chunk_shape = tuple(get_config().get('stack', 'chunk_shape', default=[16, 64, 64]))
+        path = Path(path or cls.default_path())
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        store = cls(path, 'w')
+        store.h5.attrs['length'] = length
+        store.h5.attrs['width'] = width
+        store.h5.attrs['chunk_shape'] = chunk_shape
+        if geotransform is not None:
+            store.h5.attrs['geotransform'] = geotransform
+
+        ifg = store.h5.create_group('interferograms')
+        ifg.create_dataset('pairs', shape=(0, 2), maxshape=(None, 2), dtype='S8')
+        for name in IFG_DATASETS:
+            store._create_cube(ifg, name, 0)
+        ts = store.h5.create_group('timeseries')
+        ts.create_dataset('dates', shape=(0,), maxshape=(None,), dtype='S8')
+        logger.info(f"스택 생성: {path} ({width} x {length})")
+        return store
+
+    def _create_cube(self, group: h5py.Group, name: str, depth: int) -> h5py.Dataset:
+        chunk_t, chunk_r, chunk_c = (int(v) for v in self.h5.attrs['chunk_shape'])
+        return group.create_dataset(
+            name,
+            shape=(depth, self.length, self.width),
+            maxshape=(None, self.length, self.width),
+            chunks=(chunk_t, min(chunk_r, self.length), min(chunk_c, self.width)),
+            dtype='float32',
+            fillvalue=np.nan,
+        )
+
+    def _create_plane(self, group: h5py.Group, name: str) -> h5py.Dataset:
+        return group.create_dataset(
+            name,
+            shape=(self.length, self.width),
+            chunks=tuple(min(c, s) for c, s in zip((256, 256), self.shape)),
+            dtype='float32',
+            fillvalue=np.nan,
+        )
+
+    def close(self):
+        self.h5.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ------------------------------------------------------------------
+    # 메타데이터
+    # ------------------------------------------------------------------
+    @property
+    def length(self) -> int:
+        return int(self.h5.attrs['length'])
+
+    @property
+    def width(self) -> int:
+        return int(self.h5.attrs['width'])
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.length, self.width
+
+    @property
+    def geotransform(self):
+        value = self.h5.attrs.get('geotransform')
+        return tuple(float(v) for v in value) if value is not None else None
+
+    @property
+    def pairs(self) -> List[Tuple[str, str]]:
+        """간섭쌍 목록 [(reference, secondary), ...]"""
+        return [tuple(_decode_dates(p)) for p in self.h5['interferograms/pairs'][:]]
+
+    @property
+    def dates(self) -> List[str]:
+        """시계열 날짜 목록"""
+        return _decode_dates(self.h5['timeseries/dates'][:])
+
+    # ------------------------------------------------------------------
+    # 쓰기
+    # ------------------------------------------------------------------
+    def add_interferogram(self, reference: str, secondary: str) -> int:
+        """간섭쌍 슬롯 추가 (데이터는 write_stack으로 블록 단위 기록)
+
+        Returns:
+            추가된 간섭도 인덱스
+        """
+        pair = tuple(_decode_dates(_encode_dates([reference, secondary])))
+        if pair in self.pairs:
+            raise ValueError(f"이미 스택에 있는 간섭쌍입니다: {pair[0]}_{pair[1]}")
+
+        group = self.h5['interferograms']
+        index = group['pairs'].shape[0]
+        group['pairs'].resize(index + 1, axis=0)
+        group['pairs'][index] = _encode_dates(pair)
+        for name in IFG_DATASETS:
+            group[name].resize(index + 1, axis=0)
+        return index
+
+    def set_dates(self, dates: Sequence[str]):
+        """시계열 날짜 설정
+
+        늦게 공개된 장면으로 기존 날짜 사이에 날짜가 끼어들 수 있으므로 변위 값은
+        날짜 축과 함께 옮기지 않습니다 - 호출하는 쪽(SBAS solve)이 전부 다시 기록합니다.
+        """
+        encoded = _encode_dates(dates)
+        group = self.h5['timeseries']
+        existing = group['dates'][:]
+        if len(existing) and not np.array_equal(encoded[:len(existing)], existing):
+            logger.info("시계열 날짜 사이에 새 날짜가 들어왔습니다 - 변위를 전부 다시 기록합니다")
+
+        group['dates'].resize(len(encoded), axis=0)
+        group['dates'][:] = encoded
+        if 'displacement' not in group:
+            self._create_cube(group, 'displacement', len(encoded))
+        else:
+            group['displacement'].resize(len(encoded), axis=0)
+        if 'velocity' not in group:
+            self._create_plane(group, 'velocity')
+
+    def write_stack(self, dataset: str, window: Window, data: np.ndarray, index=slice(None)):
+        """3D 데이터셋의 윈도우에 블록 기록
+
+        Args:
+            dataset: 'interferograms/unwrapped_phase' 등 데이터셋 경로
+            window: (행 slice, 열 slice)
+            data: (N, h, w) 또는 index가 정수이면 (h, w)
+            index: 첫 축 인덱스 (기본값: 전체, 정수 목록 가능)
+        """
+        if isinstance(index, (list, np.ndarray)):
+            index = np.asarray(index)
+            order = np.argsort(index)
+            self.h5[dataset][index[order].tolist(), window[0], window[1]] = np.asarray(data)[order]
+            return
+        self.h5[dataset][index, window[0], window[1]] = data
+
+    def write_geometry(self, name: str, window: Window, data: np.ndarray):
+        """/geometry/<name> 2D 래스터의 윈도우에 블록 기록 (없으면 생성)"""
+        group = self.h5.require_group('geometry')
+        if name not in group:
+            self._create_plane(group, name)
+        group[name][window[0], window[1]] = data
+
+    # ------------------------------------------------------------------
+    # 읽기
+    # ------------------------------------------------------------------
+    def has_geometry(self, name: str) -> bool:
+        return f"geometry/{name}" in self.h5
+
+    def read_geometry(self, name: str, window: Window) -> np.ndarray:
+        """/geometry/<name> 2D 래스터의 윈도우 읽기"""
+        return self.h5[f"geometry/{name}"][window[0], window[1]]
+
+    def iter_windows(self, block_size: int = None, mask=None) -> Iterator[Window]:
+        """블록 처리용 윈도우 순회 (청크 경계에 정렬)
+
+        Args:
+            block_size: 블록 한 변 크기 (기본값: stack.block_size)
+            mask: ValidityMask - 유효 픽셀이 없는 블록은 건너뛰고 무효 행을 잘라낸 윈도우 반환
+        """
+        if block_size is None:
+            block_size = get_config().get('stack', 'block_size', default=256)
+        for row0 in range(0, self.length, block_size):
+            for col0 in range(0, self.width, block_size):
+                window = (
+                    slice(row0, min(row0 + block_size, self.length)),
+                    slice(col0, min(col0 + block_size, self.width)),
+                )
+                if mask is not None:
+                    window = mask.trim(window)
+                    if window is None:
+                        continue
+                yield window
+
+    def read_stack(self, dataset: str, window: Window, index=slice(None)) -> np.ndarray:
+        """3D 데이터셋의 윈도우 읽기 → (N, h, w)"""
+        if isinstance(index, (list, np.ndarray)):
+            # h5py fancy indexing은 정렬된 고유 인덱스만 지원
+            index = np.asarray(index)
+            order = np.argsort(index)
+            block = self.h5[dataset][np.sort(index).tolist(), window[0], window[1]]
+            out = np.empty_like(block)
+            out[order] = block
+            return out
+        return self.h5[dataset][index, window[0], window[1]]
+
+    def read_pixels(self, dataset: str, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """픽셀 목록의 전체 시간축 값 읽기 (필요한 청크만 한 번씩 읽음)
+
+        Args:
+            dataset: 3D 데이터셋 경로 (예: 'timeseries/displacement')
+            rows, cols: 픽셀 좌표 배열
+
+        Returns:
+            (N, n_points) 배열
+        """
+        ds = self.h5[dataset]
+        rows = np.asarray(rows, dtype=np.int64)
+        cols = np.asarray(cols, dtype=np.int64)
+        out = np.full((ds.shape[0], rows.size), np.nan, dtype=np.float32)
+        if rows.size == 0 or ds.shape[0] == 0:
+            return out
+
+        _, chunk_r, chunk_c = ds.chunks
+        chunk_ids = (rows // chunk_r) * ((self.width + chunk_c - 1) // chunk_c) + cols // chunk_c
+        order = np.argsort(chunk_ids, kind='stable')
+        sorted_ids = chunk_ids[order]
+        boundaries = np.flatnonzero(np.diff(sorted_ids)) + 1
+
+        for group in np.split(order, boundaries):
+            row0 = int(rows[group[0]] // chunk_r) * chunk_r
+            col0 = int(cols[group[0]] // chunk_c) * chunk_c
+            block = ds[:, row0:row0 + chunk_r, col0:col0 + chunk_c]
+            out[:, group] = block[:, rows[group] - row0, cols[group] - col0]
+        return out
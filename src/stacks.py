@@ -0,0 +1,151 @@
+"""
+Stack Partitioning Module
+검색 결과를 (궤도 방향, relative orbit, 프레임 구성) 단위의 처리 스택으로 분할
+
+같은 track의 프레임은 매 촬영마다 거의 같은 시각(하루 중 초)에 시작하므로
+촬영 시각을 catalog.stacks.frame_tolerance_s 이내로 묶어 프레임을 구분하고,
+날짜마다 있는 프레임 조합(프레임 구성)이 같은 날짜끼리 한 스택으로 묶습니다.
+
+    D134_212305           하강 궤도 track 134, 21:23:05 시작 프레임 1개
+    A061_093012-093037    상승 궤도 track 61, 연속 프레임 2개 (topsApp에 함께 입력)
+
+스택 이름은 설정 파생(Config.for_stack)의 디렉토리 이름으로 쓰입니다.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .config import get_config
+
+logger = logging.getLogger(__name__)
+
+_DAY_NS = 86400 * 1_000_000_000
+
+
+@dataclass
+class SceneStack:
+    """처리 스택 (같은 방향, 같은 relative orbit, 같은 프레임 구성)"""
+    direction: str
+    relative_orbit: int
+    frames: Tuple[int, ...]          # 프레임별 첫 촬영의 시작 시각 (하루 중 초, 오름차순)
+    scenes: pd.DataFrame             # 제품 테이블 행 (날짜순)
+
+    @property
+    def name(self) -> str:
+        starts = '-'.join(
+            f"{s // 3600:02d}{s % 3600 // 60:02d}{s % 60:02d}" for s in self.frames
+        )
+        return f"{str(self.direction)[:1].upper()}{int(self.relative_orbit):03d}_{starts}"
+
+    @property
+    def dates(self) -> List[str]:
+        return sorted(set(pd.to_datetime(self.scenes['date']).dt.strftime('%Y%m%d')))
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+
+def seconds_of_day(timestamps: np.ndarray) -> np.ndarray:
+    """epoch ns → 하루 중 초 (UTC)"""
+    return (np.asarray(timestamps, dtype=np.int64) % _DAY_NS) // 1_000_000_000
+
+
+def cluster_frames(seconds: np.ndarray, tolerance: float) -> np.ndarray:
+    """촬영 시각을 tolerance 이내 간격으로 이어지는 묶음(프레임)으로 분류
+
+    Args:
+        seconds: 하루 중 초
+        tolerance: 같은 프레임으로 볼 최대 간격 (초)
+
+    Returns:
+        장면별 프레임 번호 (이른 시각의 프레임부터 0, 1, ...)
+    """
+    seconds = np.asarray(seconds, dtype=np.int64)
+    labels = np.zeros(seconds.size, dtype=np.int64)
+    if seconds.size:
+        order = np.argsort(seconds, kind='stable')
+        labels[order] = np.concatenate([[0], np.cumsum(np.diff(seconds[order]) > tolerance)])
+    return labels
+
+
+def partition_scenes(
+    scenes: pd.DataFrame,
+    frame_tolerance: float = None,
+    min_dates: int = None,
+) -> List[SceneStack]:
+    """제품 테이블을 처리 스택으로 분할
+
+    Args:
+        scenes: 제품 테이블 (direction, track, timestamp 열)
+        frame_tolerance: 같은 프레임으로 볼 촬영 시각 차이 (초, 기본값: catalog.stacks.frame_tolerance_s)
+        min_dates: 스택으로 인정할 최소 날짜 수 (기본값: catalog.stacks.min_dates)
+
+    Returns:
+        날짜가 많은 순서의 스택 목록
+    """
+    config = get_config()
+    if frame_tolerance is None:
+        frame_tolerance = config.get('catalog', 'stacks', 'frame_tolerance_s', default=10)
+    if min_dates is None:
+        min_dates = config.get('catalog', 'stacks', 'min_dates', default=2)
+    if scenes.empty:
+        return []
+
+    stacks = []
+    # relative orbit을 모르는 장면(track 결측)은 스택에 넣지 않음
+    known = scenes[scenes['track'].notna() & scenes['direction'].notna()]
+    for (direction, track), group in known.groupby(['direction', 'track'], observed=True, sort=True):
+        group = group.sort_values('timestamp')
+        seconds = seconds_of_day(group['timestamp'].to_numpy())
+        labels = cluster_frames(seconds, frame_tolerance)
+        dates = pd.to_datetime(group['timestamp'].to_numpy(), utc=True).strftime('%Y%m%d')
+        frame_sets: Dict[str, Tuple[int, ...]] = {
+            date: tuple(sorted(set(labels[dates == date].tolist())))
+            for date in np.unique(dates)
+        }
+        by_set: Dict[Tuple[int, ...], List[str]] = {}
+        for date, frame_set in frame_sets.items():
+            by_set.setdefault(frame_set, []).append(date)
+
+        for frame_set, set_dates in by_set.items():
+            if len(set_dates) < min_dates:
+                logger.debug(
+                    f"스택 후보 제외 ({direction} {track}, 프레임 {len(frame_set)}개): 날짜 {len(set_dates)}개"
+                )
+                continue
+            members = np.isin(dates, set_dates)
+            # 스택 이름이 새 촬영분으로 바뀌지 않도록 프레임마다 가장 이른 촬영의 시각 사용
+            frames = tuple(int(seconds[members & (labels == k)][0]) for k in frame_set)
+            stacks.append(SceneStack(
+                direction=str(direction),
+                relative_orbit=int(track),
+                frames=frames,
+                scenes=group[members].reset_index(drop=True),
+            ))
+
+    stacks.sort(key=lambda s: (-len(s), s.name))
+    for stack in stacks:
+        logger.debug(f"스택 {stack.name}: 날짜 {len(stack)}개, 장면 {len(stack.scenes)}개")
+    return stacks
+
+
+def select_stack(stacks: Sequence[SceneStack], name: str = None, direction: str = None,
+                 relative_orbit=None) -> SceneStack:
+    """이름 또는 (방향, relative orbit) 조건으로 스택 선택 (조건이 맞는 것 중 날짜가 가장 많은 스택)
+
+    Returns:
+        스택 (없으면 None)
+    """
+    for stack in stacks:
+        if name is not None and stack.name != name:
+            continue
+        if direction is not None and stack.direction != direction:
+            continue
+        if relative_orbit is not None and stack.relative_orbit != int(relative_orbit):
+            continue
+        return stack
+    return None
@@ -0,0 +1,328 @@
+"""
+Streaming Ingest Module
+검색 → 다운로드 → 검증/메타데이터 적재를 겹쳐 실행하는 생산자/소비자 파이프라인
+
+    [검색 스레드] --(download 큐)--> [다운로드 워커 N] --(validate 큐)--> [검증 워커 M]
+
+검색 페이지가 도착하는 즉시 다운로드가 시작되고, 받은 zip은 다음 파일을 받는 동안
+바로 검증·카탈로그 적재됩니다. 큐 크기와 디스크 여유 공간이 역압(backpressure)을
+걸어 네트워크, 디스크, CPU가 동시에 바쁘게 유지됩니다.
+"""
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional
+import hashlib
+import logging
+import queue
+import shutil
+import threading
+import zipfile
+
+import pandas as pd
+
+from .catalog import SceneCatalog
+from .config import get_config
+from .raw_store import RawDataStore, _remove
+
+logger = logging.getLogger(__name__)
+
+# 큐 종료 표시
+_DONE = object()
+
+
+@dataclass
+class StreamStats:
+    """파이프라인 처리 결과"""
+    searched: int = 0
+    skipped: int = 0
+    downloaded: int = 0
+    validated: int = 0
+    failed: List[str] = field(default_factory=list)
+
+
+class DiskBudget:
+    """다운로드 중인 파일 크기를 예약해 디스크 여유 공간 이하로 동시 다운로드 제한"""
+
+    def __init__(self, directory: Path, min_free_bytes: int):
+        self.directory = Path(directory)
+        self.min_free_bytes = min_free_bytes
+        self.reserved = 0
+        self._cond = threading.Condition()
+
+    def _available(self) -> int:
+        return shutil.disk_usage(self.directory).free - self.reserved - self.min_free_bytes
+
+    def acquire(self, nbytes: int, stop: threading.Event) -> bool:
+        """nbytes를 예약할 수 있을 때까지 대기
+
+        Returns:
+            예약 성공 여부 (다른 다운로드가 없는데도 공간이 부족하거나 중단되면 False)
+        """
+        with self._cond:
+            while self._available() < nbytes:
+                if self.reserved == 0 or stop.is_set():
+                    return False
+                self._cond.wait(timeout=5.0)
+            self.reserved += nbytes
+            return True
+
+    def release(self, nbytes: int):
+        with self._cond:
+            self.reserved -= nbytes
+            self._cond.notify_all()
+
+
+def validate_safe_zip(path: Path, md5sum: str = None) -> bool:
+    """SAFE zip 검증
+
+    ASF md5sum이 있으면 파일 전체 해시를 비교하고, 없으면 zip 멤버 CRC를 검사합니다.
+    burst 부분 다운로드로 만든 .SAFE 디렉토리는 manifest 존재만 확인합니다.
+    """
+    if path.is_dir():
+        return (path / 'manifest.safe').exists()
+    try:
+        with zipfile.ZipFile(path) as zf:
+            if not any(name.endswith('manifest.safe') for name in zf.namelist()):
+                logger.error(f"manifest.safe가 없습니다: {path.name}")
+                return False
+            if not md5sum:
+                bad = zf.testzip()
+                if bad is not None:
+                    logger.error(f"손상된 zip 멤버: {path.name}/{bad}")
+                    return False
+                return True
+    except zipfile.BadZipFile as e:
+        logger.error(f"zip 파일이 아닙니다 ({path.name}): {e}")
+        return False
+
+    digest = hashlib.md5()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(8 * 1024**2), b''):
+            digest.update(chunk)
+    if digest.hexdigest() != md5sum.lower():
+        logger.error(f"md5 불일치: {path.name}")
+        return False
+    return True
+
+
+class StreamingIngest:
+    """검색·다운로드·검증을 겹쳐 실행하는 파이프라인
+
+    Example:
+        stats = StreamingIngest().run(start_date='2024-01-01', end_date='2024-03-31')
+    """
+
+    def __init__(
+        self,
+        retriever=None,
+        catalog: SceneCatalog = None,
+        on_scene: Callable[[Path, pd.Series], None] = None,
+        bursts_only: bool = None
+    ):
+        """
+        Args:
+            retriever: Sentinel1Retriever (기본값: 새로 생성)
+            catalog: 검증된 장면을 적재할 카탈로그 (기본값: catalog.path)
+            on_scene: 검증 통과한 장면마다 호출할 후속 처리 (path, row)
+            bursts_only: True면 AOI burst만 부분 다운로드 (기본값: burst_subset.enabled)
+        """
+        self.config = get_config()
+        if retriever is None:
+            from .data_retrieval import Sentinel1Retriever
+            retriever = Sentinel1Retriever()
+        self.retriever = retriever
+        self.catalog = catalog if catalog is not None else SceneCatalog()
+        self.on_scene = on_scene
+        if bursts_only is None:
+            bursts_only = self.config.get('burst_subset', 'enabled', default=False)
+        self.bursts_only = bursts_only
+
+        self.download_workers = self.config.get('streaming', 'download_workers', default=2)
+        self.validate_workers = self.config.get('streaming', 'validate_workers', default=2)
+        self.queue_size = self.config.get('streaming', 'queue_size', default=4)
+        self.verify_checksum = self.config.get('streaming', 'verify_checksum', default=True)
+        min_free_gb = self.config.get('streaming', 'min_free_gb', default=20)
+
+        self.download_dir = self.config.get_path('raw_data_dir')
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        self.budget = DiskBudget(self.download_dir, int(min_free_gb * 1024**3))
+        self.raw_store = RawDataStore(self.download_dir)
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.stats = StreamStats()
+
+    def _fail(self, title: str):
+        with self._lock:
+            self.stats.failed.append(title)
+
+    # ------------------------------------------------------------------
+    # 단계
+    # ------------------------------------------------------------------
+    def _search(self, download_q: queue.Queue, validate_q: queue.Queue, kwargs: dict, max_products: Optional[int]):
+        seen = set()
+        try:
+            for page in self.retriever.iter_search(**kwargs):
+                for _, row in page.iterrows():
+                    if self._stop.is_set() or (max_products and len(seen) >= max_products):
+                        return
+                    if row['title'] in seen:
+                        continue
+                    seen.add(row['title'])
+                    with self._lock:
+                        self.stats.searched += 1
+
+                    suffix = '.SAFE' if self.bursts_only else '.zip'
+                    local = self.download_dir / f"{row['title']}{suffix}"
+                    if local.exists():
+                        # 이미 받은 파일은 검증 단계로 바로 보냄
+                        with self._lock:
+                            self.stats.skipped += 1
+                        validate_q.put((local, row))
+                    else:
+                        download_q.put(row)  # 큐가 가득 차면 검색이 대기 (역압)
+        except Exception as e:
+            logger.error(f"검색 실패: {e}")
+            self._stop.set()
+        finally:
+            for _ in range(self.download_workers):
+                download_q.put(_DONE)
+
+    def _download(self, download_q: queue.Queue, validate_q: queue.Queue):
+        while True:
+            row = download_q.get()
+            if row is _DONE:
+                return
+            if self._stop.is_set():
+                continue
+
+            # 부분 다운로드도 최악의 경우(전체 burst)를 가정해 예약
+            nbytes = int(row['size_mb'] * 1024**2)
+            if not self.budget.acquire(nbytes, self._stop):
+                logger.error(f"디스크 공간 부족으로 건너뜀: {row['title']} ({row['size_mb']:.0f} MB)")
+                self._fail(row['title'])
+                continue
+            try:
+                path = self.retriever.download_product(row, self.download_dir, bursts_only=self.bursts_only)
+            except Exception as e:
+                logger.error(f"다운로드 실패 ({row['title']}): {e}")
+                path = None
+            finally:
+                # 다운로드가 끝나면 실제 파일이 디스크 사용량에 반영되므로 예약 해제
+                self.budget.release(nbytes)
+
+            if path is None or not path.exists():
+                self._fail(row['title'])
+                continue
+            with self._lock:
+                self.stats.downloaded += 1
+            validate_q.put((path, row))
+
+    def _validate(self, validate_q: queue.Queue):
+        while True:
+            item = validate_q.get()
+            if item is _DONE:
+                return
+            path, row = item
+            # 예외로 검증 스레드가 죽으면 다운로드 스레드가 validate_q.put에서 멈추므로 항목 단위로 처리
+            owner = None
+            try:
+                md5sum = row.get('md5sum') if self.verify_checksum and not path.is_dir() else None
+                if not isinstance(md5sum, str):
+                    md5sum = None
+                if not validate_safe_zip(path, md5sum):
+                    _remove(path)  # 부분 다운로드는 .SAFE 디렉토리
+                    self._fail(row['title'])
+                    continue
+
+                title = self.raw_store.register(path, md5sum)
+                # 후속 처리(on_scene)가 끝나기 전에 예산 정리로 지워지지 않도록 고정
+                owner = f"streaming:{title or row['title']}"
+                if title is not None:
+                    self.raw_store.pin([title], owner)
+                # 장면이 들어올 때마다 예산 정리 (고정된 장면은 남김)
+                self.raw_store.enforce_budget()
+                with self._lock:
+                    self.catalog.add(pd.DataFrame([row]))
+                    self.stats.validated += 1
+            except Exception as e:
+                logger.error(f"검증 실패 ({row['title']}): {e}")
+                self._fail(row['title'])
+                if owner is not None:
+                    self.raw_store.unpin(owner)
+                continue
+            logger.info(f"검증 완료: {path.name}")
+            try:
+                if self.on_scene is not None:
+                    self.on_scene(path, row)
+            except Exception as e:
+                logger.error(f"후속 처리 실패 ({row['title']}): {e}")
+                self._fail(row['title'])
+            finally:
+                self.raw_store.unpin(owner)
+
+    # ------------------------------------------------------------------
+    # 실행
+    # ------------------------------------------------------------------
+    def run(
+        self,
+        start_date: str = None,
+        end_date: str = None,
+        max_results: int = 100,
+        max_products: int = None
+    ) -> StreamStats:
+        """파이프라인 실행 (모든 단계가 끝날 때까지 대기)
+
+        Args:
+            start_date: 시작 날짜 (YYYY-MM-DD)
+            end_date: 종료 날짜 (YYYY-MM-DD)
+            max_results: 최대 검색 결과 수
+            max_products: 최대 처리 장면 수
+
+        Returns:
+            StreamStats
+        """
+        if self.retriever.session is None:
+            raise RuntimeError("ASF 세션이 없습니다. credentials.yaml에 인증 정보를 설정하세요.")
+
+        self.stats = StreamStats()
+        self._stop.clear()
+        download_q = queue.Queue(maxsize=self.queue_size)
+        validate_q = queue.Queue(maxsize=self.queue_size)
+        kwargs = dict(start_date=start_date, end_date=end_date, max_results=max_results)
+
+        searcher = threading.Thread(
+            target=self._search, args=(download_q, validate_q, kwargs, max_products), daemon=True
+        )
+        downloaders = [
+            threading.Thread(target=self._download, args=(download_q, validate_q), daemon=True)
+            for _ in range(self.download_workers)
+        ]
+        validators = [
+            threading.Thread(target=self._validate, args=(validate_q,), daemon=True)
+            for _ in range(self.validate_workers)
+        ]
+        for thread in [searcher] + downloaders + validators:
+            thread.start()
+
+        try:
+            searcher.join()
+            for thread in downloaders:
+                thread.join()
+        except KeyboardInterrupt:
+            logger.warning("중단 요청 - 진행 중인 작업을 마무리합니다")
+            self._stop.set()
+            raise
+        finally:
+            for _ in validators:
+                validate_q.put(_DONE)
+            for thread in validators:
+                thread.join()
+            self.catalog.save()
+
+        logger.info(
+            f"스트리밍 수집 완료: 검색 {self.stats.searched}, 다운로드 {self.stats.downloaded}, "
+            f"검증 {self.stats.validated}, 실패 {len(self.stats.failed)}"
+        )
+        return self.stats
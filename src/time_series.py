@@ -0,0 +1,291 @@
+"""
+Time-series Analysis Module
+SBAS(Small BAseline Subset) 시계열 역산 - 정규방정식 누적 방식
+
+미지수는 첫 날짜 대비 각 날짜의 변위(위상)이고, 간섭도 하나는
+phase_ij = x_j - x_i 관측식 하나가 됩니다. 정규방정식
+
+    N = Σ a aᵀ          (모든 픽셀 공통, M x M)
+    b = Σ a · phase     (픽셀별, M x L x W)
+
+을 스택 파일(/sbas)에 보관하므로 새 간섭도가 들어오면 해당 간섭도만 읽어
+N, b에 더하고 다시 풀면 됩니다 (전체 이력 재역산 불필요).
+"""
+
+from datetime import datetime
+from typing import Iterable, List, Sequence
+import logging
+
+import numpy as np
+
+from .config import get_config
+from .masking import ValidityMask
+from .stack import StackStore
+
+logger = logging.getLogger(__name__)
+
+
+def phase_to_mm(wavelength: float) -> float:
+    """위상(rad) → LOS 변위(mm) 변환 계수 (+: 위성에서 멀어짐 = 침하)"""
+    return wavelength / (4 * np.pi) * 1000
+
+
+def date_to_years(dates: Sequence[str]) -> np.ndarray:
+    """'YYYYMMDD' 목록 → 첫 날짜 기준 경과 연수"""
+    parsed = [datetime.strptime(d, '%Y%m%d') for d in dates]
+    return np.array([(d - parsed[0]).days / 365.25 for d in parsed])
+
+
+def design_matrix(pairs: Sequence[Sequence[str]], dates: Sequence[str]) -> np.ndarray:
+    """간섭쌍 → SBAS 설계 행렬 (N_ifg x (T-1), 첫 날짜는 기준으로 제외)"""
+    date_index = {d: i for i, d in enumerate(dates)}
+    A = np.zeros((len(pairs), len(dates)), dtype=np.float64)
+    for k, (reference, secondary) in enumerate(pairs):
+        A[k, date_index[reference]] = -1.0
+        A[k, date_index[secondary]] = 1.0
+    return A[:, 1:]
+
+
+def velocity_operator(dates: Sequence[str]) -> np.ndarray:
+    """변위 시계열 → 선형 속도 최소제곱 연산자 (T,) - 시계열에 내적하면 속도/년"""
+    t = date_to_years(dates)
+    centered = t - t.mean()
+    denom = np.sum(centered ** 2)
+    if denom == 0:
+        return np.zeros_like(t)
+    return centered / denom
+
+
+class IncrementalSBAS:
+    """정규방정식 누적형 SBAS 역산
+
+    Example:
+        with StackStore.open(mode='r+') as store:
+            sbas = IncrementalSBAS(store)
+            sbas.accumulate(new_indices)   # 새 간섭도만 읽음
+            sbas.solve()
+    """
+
+    def __init__(self, store: StackStore, block_size: int = None):
+        """
+        Args:
+            store: 쓰기 가능한 StackStore
+            block_size: 블록 처리 단위 (기본값: stack.block_size)
+        """
+        self.store = store
+        self.block_size = block_size
+        self.mask = ValidityMask.for_store(store)
+        self.wavelength = get_config().get('sbas', 'wavelength', default=0.0555)
+        if 'sbas' not in store.h5:
+            group = store.h5.create_group('sbas')
+            group.create_dataset('dates', shape=(0,), maxshape=(None,), dtype='S8')
+            group.create_dataset('normal_matrix', shape=(0, 0), maxshape=(None, None), dtype='float64')
+            group.create_dataset('used', shape=(0,), maxshape=(None,), dtype='bool')
+            group.create_dataset(
+                'rhs',
+                shape=(0, store.length, store.width),
+                maxshape=(None, store.length, store.width),
+                chunks=store.h5['interferograms/unwrapped_phase'].chunks,
+                dtype='float64',
+                fillvalue=0.0,
+            )
+            group.create_dataset(
+                'n_missing',
+                shape=(store.length, store.width),
+                chunks=store.h5['interferograms/unwrapped_phase'].chunks[1:],
+                dtype='uint16',
+                fillvalue=0,
+            )
+        self.group = store.h5['sbas']
+        if self.mask is None and self.group.attrs.get('mask_generation', 0) and ValidityMask.exists(store):
+            # 마스크 안에서만 누적된 정규방정식을 마스크 없이 풀면 누적되지 않은 픽셀이 0으로 기록됨
+            logger.warning("정규방정식이 유효 마스크 안에서만 누적되어 있어 mask.enabled와 관계없이 마스크를 적용합니다")
+            self.mask = ValidityMask(store)
+
+    @property
+    def dates(self) -> List[str]:
+        return [d.decode('ascii') for d in self.group['dates'][:]]
+
+    @property
+    def used(self) -> np.ndarray:
+        """간섭도별 정규방정식 반영 여부"""
+        used = np.zeros(len(self.store.pairs), dtype=bool)
+        used[:self.group['used'].shape[0]] = self.group['used'][:]
+        return used
+
+    def _extend_dates(self, new_dates: Iterable[str]):
+        """미지수(날짜) 확장 - 기존 날짜 사이에 끼어든 날짜는 정규방정식 중간에 0 행/열로 삽입
+
+        첫 날짜(기준) 이전 날짜는 미지수 기준이 바뀌므로 여기서 다루지 않습니다 (accumulate가 전체 재누적).
+        """
+        dates = self.dates
+        new_dates = sorted(set(new_dates) - set(dates))
+        if not new_dates:
+            return
+        if dates and new_dates[0] < dates[0]:
+            raise ValueError(f"기준 날짜({dates[0]}) 이전 날짜는 확장할 수 없습니다: {new_dates[0]}")
+
+        merged = sorted(dates + new_dates)
+        n_unknowns = len(merged) - 1
+        # 기존 미지수(dates[1:])가 새 미지수 순서에서 차지하는 위치
+        positions = np.searchsorted(merged[1:], dates[1:])
+        old = self.group['normal_matrix'][:]
+        self.group['dates'].resize(len(merged), axis=0)
+        self.group['dates'][:] = np.array(merged, dtype='S8')
+        self.group['normal_matrix'].resize((n_unknowns, n_unknowns))
+        padded = np.zeros((n_unknowns, n_unknowns))
+        padded[np.ix_(positions, positions)] = old
+        self.group['normal_matrix'][:] = padded
+
+        rhs = self.group['rhs']
+        n_old = rhs.shape[0]
+        rhs.resize(n_unknowns, axis=0)  # 새 행은 fillvalue 0
+        if n_old == 0 or np.array_equal(positions, np.arange(n_old)):
+            return
+        # 중간 삽입: 마스크가 나중에 넓어질 수 있으므로 모든 블록의 우변을 새 순서로 옮김
+        logger.info(f"기존 날짜 사이에 날짜 {len(new_dates)}개 삽입 - 정규방정식 우변 재배치")
+        for window in self.store.iter_windows(self.block_size):
+            block = rhs[:n_old, window[0], window[1]]
+            moved = np.zeros((n_unknowns,) + block.shape[1:])
+            moved[positions] = block
+            rhs[:, window[0], window[1]] = moved
+
+    def reset(self):
+        """정규방정식 초기화 (전체 재역산용)"""
+        self.group['dates'].resize(0, axis=0)
+        self.group['normal_matrix'].resize((0, 0))
+        self.group['used'].resize(0, axis=0)
+        self.group['rhs'].resize(0, axis=0)
+        self.group['n_missing'][:] = 0
+        self.group.attrs['mask_generation'] = 0
+
+    def _excluded(self) -> np.ndarray:
+        """폐합 검사(/qc/flagged)에서 제외된 간섭도"""
+        excluded = np.zeros(len(self.store.pairs), dtype=bool)
+        if 'qc/flagged' in self.store.h5:
+            flagged = self.store.h5['qc/flagged'][:]
+            excluded[:len(flagged)] = flagged
+        return excluded
+
+    def _apply(self, indices: np.ndarray, sign: float):
+        """간섭도 기여분을 정규방정식에 더하거나(sign=+1) 빼기(sign=-1)"""
+        pairs = [self.store.pairs[i] for i in indices]
+        A = design_matrix(pairs, self.dates)
+
+        self.group['normal_matrix'][:] = self.group['normal_matrix'][:] + sign * (A.T @ A)
+        n_unknowns = A.shape[1]
+        for window in self.store.iter_windows(self.block_size, mask=self.mask):
+            phase = self.store.read_stack('interferograms/unwrapped_phase', window, index=indices)
+            missing = np.isnan(phase)
+            phase = np.where(missing, 0.0, phase).reshape(len(indices), -1)
+            rhs = self.group['rhs'][:, window[0], window[1]].reshape(n_unknowns, -1)
+            rhs += sign * (A.T @ phase)
+            shape = (n_unknowns,) + missing.shape[1:]
+            self.group['rhs'][:, window[0], window[1]] = rhs.reshape(shape)
+            n_missing = self.group['n_missing'][window[0], window[1]].astype(np.int64)
+            n_missing += int(sign) * missing.sum(axis=0)
+            self.group['n_missing'][window[0], window[1]] = n_missing.astype(np.uint16)
+
+        if sign > 0:
+            # 누적 당시 마스크 세대 (0: 마스크 없음) - 이후 마스크가 넓어지면(expanded_at) 전체 재누적
+            generation = int(self.mask.group.attrs.get('generation', 1)) if self.mask is not None else 0
+            self.group.attrs['mask_generation'] = generation
+        used = self.used
+        used[indices] = sign > 0
+        self.group['used'].resize(len(used), axis=0)
+        self.group['used'][:] = used
+
+    def _mask_expanded(self) -> bool:
+        """마스크 안에서 누적한 뒤 마스크가 넓어져 새 유효 픽셀의 우변이 비어 있는지"""
+        if self.mask is None or not self.group['used'][:].any():
+            return False
+        generation = int(self.group.attrs.get('mask_generation', 0))
+        return 0 < generation < int(self.mask.group.attrs.get('expanded_at', 0))
+
+    def accumulate(self, indices: Sequence[int] = None):
+        """간섭도를 정규방정식에 누적 (해당 간섭도만 블록 단위로 읽음)
+
+        폐합 검사에서 제외된 간섭도는 건너뜁니다.
+
+        Args:
+            indices: 스택 간섭도 인덱스 (기본값: 아직 반영되지 않은 전부)
+        """
+        skip = self.used | self._excluded()
+        if indices is None:
+            indices = np.flatnonzero(~skip)
+        indices = np.asarray(sorted(int(i) for i in indices if not skip[i]), dtype=np.int64)
+        new_dates = {d for i in indices for d in self.store.pairs[i]}
+        dates = self.dates
+
+        reason = None
+        if self._mask_expanded():
+            reason = "누적 이후 유효 마스크가 넓어져"
+        elif dates and new_dates and min(new_dates) < dates[0]:
+            # 기준 날짜가 바뀌면 기존 누적분을 옮길 수 없음
+            reason = f"기준 날짜({dates[0]}) 이전 날짜({min(new_dates)})가 들어와"
+        if reason:
+            logger.warning(f"{reason} 반영된 간섭도까지 정규방정식을 다시 누적합니다")
+            indices = np.union1d(np.flatnonzero(self.used), indices).astype(np.int64)
+            self.reset()
+            new_dates = {d for i in indices for d in self.store.pairs[i]}
+        if indices.size == 0:
+            logger.info("누적할 새 간섭도가 없습니다")
+            return
+
+        self._extend_dates(new_dates)
+        self._apply(indices, +1.0)
+        logger.info(f"정규방정식 누적: 간섭도 {len(indices)}개, 날짜 {len(self.dates)}개")
+
+    def remove(self, indices: Sequence[int]):
+        """이미 누적된 간섭도의 기여분을 정규방정식에서 제거 (해당 간섭도만 다시 읽음)
+
+        Args:
+            indices: 제거할 스택 간섭도 인덱스 (누적되지 않은 것은 무시)
+        """
+        used = self.used
+        indices = np.asarray(sorted(int(i) for i in indices if used[i]), dtype=np.int64)
+        if indices.size == 0:
+            return
+        self._apply(indices, -1.0)
+        logger.info(f"정규방정식에서 간섭도 {len(indices)}개 제거")
+
+    def solve(self):
+        """누적된 정규방정식을 풀어 변위 시계열과 선형 속도 기록
+
+        간섭도 중 하나라도 값이 없는 픽셀은 공통 정규행렬을 쓸 수 없으므로 NaN 처리합니다.
+        """
+        if self._mask_expanded():
+            self.accumulate([])
+        dates = self.dates
+        if len(dates) < 2:
+            raise ValueError("역산하려면 날짜가 2개 이상 필요합니다")
+
+        N = self.group['normal_matrix'][:]
+        N_inv = np.linalg.pinv(N)
+        rank = np.linalg.matrix_rank(N)
+        if rank < N.shape[0]:
+            logger.warning(f"간섭쌍 네트워크가 분리되어 있습니다 (rank {rank}/{N.shape[0]}) - 최소 노름 해 사용")
+
+        scale = phase_to_mm(self.wavelength)
+        v_op = velocity_operator(dates)
+        self.store.set_dates(dates)
+        n_unknowns = len(dates) - 1
+
+        for window in self.store.iter_windows(self.block_size, mask=self.mask):
+            rhs = self.group['rhs'][:, window[0], window[1]]
+            block_shape = rhs.shape[1:]
+            x = (N_inv @ rhs.reshape(n_unknowns, -1)) * scale
+            displacement = np.vstack([np.zeros((1, x.shape[1])), x])
+            invalid = self.group['n_missing'][window[0], window[1]].ravel() > 0
+            if self.mask is not None:
+                invalid |= ~self.mask.window(window).ravel()
+            displacement[:, invalid] = np.nan
+
+            self.store.write_stack(
+                'timeseries/displacement', window,
+                displacement.reshape((len(dates),) + block_shape).astype(np.float32)
+            )
+            velocity = (v_op @ displacement).reshape(block_shape)
+            self.store.h5['timeseries/velocity'][window[0], window[1]] = velocity.astype(np.float32)
+
+        logger.info(f"SBAS 역산 완료: {dates[0]} ~ {dates[-1]} ({len(dates)}개 날짜)")
@@ -0,0 +1,188 @@
+"""
+Time-series Query Module
+경위도 지점의 SBAS 변위 시계열 조회 (API + CLI)
+
+조회 흐름:
+    경위도 → GeocodingIndex (배열 연산) → 픽셀 좌표
+    → LRU 캐시 확인 → 캐시 미스 픽셀만 StackStore.read_pixels (필요한 청크만 읽음)
+"""
+
+import argparse
+from collections import OrderedDict
+from typing import Dict, Sequence, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from .config import get_config
+from .geocoding import GeocodingIndex
+from .stack import StackStore
+
+logger = logging.getLogger(__name__)
+
+
+class TimeSeriesQuery:
+    """픽셀 시계열 조회 서비스
+
+    Example:
+        query = TimeSeriesQuery()
+        df = query.query_point(129.37, 36.10)          # 포항 지열발전소 인근
+        values, valid = query.query_batch(lons, lats)  # 수천 개 지점 일괄 조회
+    """
+
+    def __init__(
+        self,
+        store_path: str = None,
+        index_path: str = None,
+        dataset: str = 'timeseries/displacement',
+        cache_size: int = None
+    ):
+        """
+        Args:
+            store_path: 스택 HDF5 경로 (기본값: stack.store_path)
+            index_path: geocoding 인덱스 경로 (기본값: stack.geocoding_index, 없으면 스택 geotransform 사용)
+            dataset: 조회할 3D 데이터셋
+            cache_size: LRU 캐시에 보관할 최대 픽셀 수 (기본값: query.cache_size)
+        """
+        config = get_config()
+        self.store = StackStore.open(store_path)
+        self.dataset = dataset
+        self.dates = pd.to_datetime(self.store.dates, format='%Y%m%d')
+
+        if index_path is None and self.store.geotransform is not None \
+                and not GeocodingIndex.default_path().exists():
+            self.index = GeocodingIndex.from_geotransform(self.store.geotransform, self.store.shape)
+        else:
+            self.index = GeocodingIndex.load(index_path)
+
+        if cache_size is None:
+            cache_size = config.get('query', 'cache_size', default=100000)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[int, int], np.ndarray]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def close(self):
+        self.store.close()
+
+    def _read_cached(self, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+        """고유 픽셀 목록의 시계열 읽기 (LRU 캐시 경유)"""
+        out = np.empty((len(self.dates), rows.size), dtype=np.float32)
+        missing = []
+        for i, key in enumerate(zip(rows.tolist(), cols.tolist())):
+            series = self._cache.get(key)
+            if series is None:
+                missing.append(i)
+            else:
+                self._cache.move_to_end(key)
+                out[:, i] = series
+        self.hits += rows.size - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            missing = np.asarray(missing)
+            values = self.store.read_pixels(self.dataset, rows[missing], cols[missing])
+            out[:, missing] = values
+            for j, i in enumerate(missing.tolist()):
+                self._cache[(int(rows[i]), int(cols[i]))] = values[:, j]
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return out
+
+    def query_batch(self, lons: Sequence[float], lats: Sequence[float]) -> Tuple[np.ndarray, np.ndarray]:
+        """여러 지점 일괄 조회
+
+        Args:
+            lons, lats: 경도/위도 배열
+
+        Returns:
+            (values, valid) - values는 (날짜 수, 지점 수), 영역 밖 지점은 NaN
+        """
+        rows, cols, valid = self.index.lookup(lons, lats)
+        values = np.full((len(self.dates), rows.size), np.nan, dtype=np.float32)
+        if not valid.any():
+            return values, valid
+
+        # 같은 픽셀에 떨어지는 지점은 한 번만 읽음
+        pixel_ids = rows[valid] * self.store.width + cols[valid]
+        unique_ids, inverse = np.unique(pixel_ids, return_inverse=True)
+        unique_values = self._read_cached(unique_ids // self.store.width, unique_ids % self.store.width)
+        values[:, valid] = unique_values[:, inverse]
+        return values, valid
+
+    def query_point(self, lon: float, lat: float) -> pd.DataFrame:
+        """단일 지점 조회 → 날짜별 변위 DataFrame"""
+        values, valid = self.query_batch([lon], [lat])
+        if not valid[0]:
+            raise ValueError(f"스택 영역 밖의 지점입니다: ({lon}, {lat})")
+        return pd.DataFrame({'date': self.dates, 'displacement_mm': values[:, 0]})
+
+    def to_frame(self, lons: Sequence[float], lats: Sequence[float], names: Sequence[str] = None) -> pd.DataFrame:
+        """일괄 조회 결과를 long-format DataFrame으로 변환"""
+        values, valid = self.query_batch(lons, lats)
+        n_points = values.shape[1]
+        if names is None:
+            names = [f"P{i + 1}" for i in range(n_points)]
+        return pd.DataFrame({
+            'point': np.repeat(np.asarray(names), len(self.dates)),
+            'lon': np.repeat(np.asarray(lons, dtype=float), len(self.dates)),
+            'lat': np.repeat(np.asarray(lats, dtype=float), len(self.dates)),
+            'date': np.tile(self.dates.values, n_points),
+            'displacement_mm': values.T.ravel(),
+            'valid': np.repeat(valid, len(self.dates)),
+        })
+
+    def cache_info(self) -> Dict[str, int]:
+        """캐시 통계"""
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._cache), 'max_size': self.cache_size}
+
+
+def main():
+    """메인 실행 함수"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="경위도 지점 변위 시계열 조회")
+    parser.add_argument('--store', default=None, help='스택 HDF5 경로')
+    parser.add_argument('--index', default=None, help='geocoding 인덱스 (.npz)')
+    parser.add_argument('--point', type=float, nargs=2, action='append', metavar=('LON', 'LAT'),
+                        help='조회 지점 (여러 번 지정 가능)')
+    parser.add_argument('--points-csv', default=None, help='lon, lat (, name) 열을 가진 CSV')
+    parser.add_argument('--output', default=None, help='결과 CSV 경로 (기본값: 화면 출력)')
+    parser.add_argument('--build-index', nargs=2, metavar=('LAT_RDR', 'LON_RDR'),
+                        help='lat.rdr/lon.rdr로 geocoding 인덱스를 만들어 저장')
+    args = parser.parse_args()
+
+    if args.build_index:
+        index = GeocodingIndex.from_geometry(*args.build_index)
+        print(index.save(args.index))
+        return
+
+    lons, lats, names = [], [], None
+    if args.points_csv:
+        points = pd.read_csv(args.points_csv)
+        lons, lats = points['lon'].tolist(), points['lat'].tolist()
+        if 'name' in points:
+            names = points['name'].astype(str).tolist()
+    for lon, lat in args.point or []:
+        lons.append(lon)
+        lats.append(lat)
+    if not lons:
+        parser.error("--point 또는 --points-csv가 필요합니다")
+    if names is not None and len(names) != len(lons):
+        names = None
+
+    query = TimeSeriesQuery(store_path=args.store, index_path=args.index)
+    try:
+        frame = query.to_frame(lons, lats, names)
+    finally:
+        query.close()
+
+    if args.output:
+        frame.to_csv(args.output, index=False)
+        logger.info(f"저장 완료: {args.output}")
+    else:
+        print(frame.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,400 @@
+"""
+Pair Triage Module
+topsApp 실행 전 저해상도 quick-look coherence로 간섭쌍 순위 결정/제외
+
+간섭쌍 하나에 topsApp은 1~4시간이 걸리고, 눈/식생으로 상관성을 잃은 쌍은 끝난 뒤에야
+알 수 있습니다. 이 단계는 두 장면의 AOI burst에서 burst마다 몇 개의 행 띠(band)만
+RemoteSafe.read_lines로 읽어(로컬 zip이면 파일, 없으면 HTTP Range) 강하게 multilook한
+coherence를 추정합니다.
+
+    1. 날짜별 AOI burst를 swath와 footprint 겹침으로 짝지음
+    2. 띠마다 진폭 상호상관으로 정수 픽셀 정합 (secondary는 위아래 여유 행을 더 읽음)
+    3. (az, rg) looks 블록마다 간섭 위상의 FFT 최대 주파수(지형/평지 무늬)를 보상한 coherence
+           γ = max_k |Σ s1·s2*·exp(-j2πk·x)| / sqrt(Σ|s1|² Σ|s2|²)
+    4. coherence ≥ min_coherence 블록 비율로 통과/제외, (비율, 중앙값) 순으로 순위
+
+TOPS 방위 위상 경사와 부픽셀 정합 오차는 블록 안 선형 위상으로 대부분 흡수되므로
+정밀 정합 없이도 topsApp 결과 coherence의 상대 순위를 충분히 예측합니다.
+"""
+
+import argparse
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+import json
+import logging
+import threading
+import time
+import xml.etree.ElementTree as ET
+
+import numpy as np
+from rich.console import Console
+from rich.table import Table
+
+from .catalog import SceneCatalog
+from .config import get_config
+from .insar_processing import PairSpec, get_aoi_bbox
+from .raw_store import scene_name
+from .remote_safe import BurstInfo, FileRangeReader, HttpRangeReader, RemoteSafe, read_member
+from .utils import format_file_size
+
+console = Console()
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TriageResult:
+    """간섭쌍 quick-look 결과"""
+    pair: str
+    coherence: float              # 블록 coherence 중앙값
+    coherent_fraction: float      # min_coherence 이상 블록 비율
+    n_blocks: int
+    bytes_read: int
+    elapsed: float
+    accepted: bool = True
+    reason: str = ''
+
+    @property
+    def score(self) -> Tuple[float, float]:
+        """순위 키 (클수록 먼저 처리, 추정 실패는 중간)"""
+        if np.isnan(self.coherent_fraction):
+            return (-1.0, 0.0)
+        return (self.coherent_fraction, self.coherence)
+
+
+def match_bursts(reference: Sequence[BurstInfo], secondary: Sequence[BurstInfo], min_overlap: float = 0.5):
+    """같은 swath에서 footprint가 min_overlap 이상 겹치는 burst 짝"""
+    matches = []
+    for ref in reference:
+        best, best_overlap = None, min_overlap
+        for sec in secondary:
+            if sec.swath != ref.swath:
+                continue
+            area = min(ref.footprint.area, sec.footprint.area)
+            overlap = ref.footprint.intersection(sec.footprint).area / area if area > 0 else 0.0
+            if overlap >= best_overlap:
+                best, best_overlap = sec, overlap
+        if best is not None:
+            matches.append((ref, best))
+    return matches
+
+
+def aoi_columns(xml_bytes: bytes, burst: BurstInfo, aoi_bbox: Sequence[float]) -> Tuple[int, int]:
+    """annotation geolocation grid로 burst 안 AOI 열 범위 [col0, col1) 계산 (격자 한 칸 여유)"""
+    root = ET.fromstring(xml_bytes)
+    grid = np.array([
+        (float(p.findtext('line')), float(p.findtext('pixel')), float(p.findtext('latitude')), float(p.findtext('longitude')))
+        for p in root.findall('geolocationGrid/geolocationGridPointList/geolocationGridPoint')
+    ])
+    width = int(root.findtext('imageAnnotation/imageInformation/numberOfSamples', '0')) or int(grid[:, 1].max()) + 1
+    min_lat, max_lat, min_lon, max_lon = aoi_bbox
+    near = (grid[:, 0] >= burst.first_line - burst.lines) & (grid[:, 0] <= burst.first_line + 2 * burst.lines)
+    inside = near & (grid[:, 2] >= min_lat) & (grid[:, 2] <= max_lat) & (grid[:, 3] >= min_lon) & (grid[:, 3] <= max_lon)
+    if not inside.any():
+        return 0, width
+    step = np.diff(np.unique(grid[:, 1])).max() if len(np.unique(grid[:, 1])) > 1 else width
+    return max(int(grid[inside, 1].min() - step), 0), min(int(grid[inside, 1].max() + step) + 1, width)
+
+
+def band_rows(burst: BurstInfo, n_bands: int, height: int) -> List[int]:
+    """burst 가장자리(0으로 채워진 행) 10%를 뺀 구간에 고르게 놓은 띠 시작 행 (burst 기준)"""
+    usable0, usable1 = int(0.1 * burst.lines), int(0.9 * burst.lines)
+    if usable1 - usable0 < height:
+        return [max((burst.lines - height) // 2, 0)]
+    centers = usable0 + (np.arange(n_bands) + 0.5) * (usable1 - usable0) / n_bands
+    return sorted({int(np.clip(c - height / 2, usable0, usable1 - height)) for c in centers})
+
+
+def integer_offset(reference: np.ndarray, secondary: np.ndarray, max_offset: Sequence[int]) -> Tuple[int, int]:
+    """진폭 상호상관 최대 정수 이동 (daz, drg)
+
+    Args:
+        reference: (h, w) 복소 띠
+        secondary: (h + 2·max_az, w) 위아래 max_az행 여유를 둔 복소 띠
+        max_offset: (max_az, max_rg)
+
+    Returns:
+        reference[i, c] ↔ secondary[i + max_az + daz, c + drg]
+    """
+    max_az, max_rg = max_offset
+    a = np.abs(reference)
+    b = np.abs(secondary)
+    padded = np.zeros(b.shape)
+    padded[:a.shape[0], :a.shape[1]] = a - a.mean()
+    xc = np.fft.ifft2(np.fft.fft2(b - b.mean()) * np.conj(np.fft.fft2(padded))).real
+    shifts_rg = np.r_[0:max_rg + 1, -max_rg:0]
+    window = xc[:2 * max_az + 1][:, shifts_rg % b.shape[1]]
+    dy, dx = np.unravel_index(np.argmax(window), window.shape)
+    return int(dy) - max_az, int(shifts_rg[dx])
+
+
+def block_coherence(reference: np.ndarray, secondary: np.ndarray, looks: Sequence[int], oversample: int = 2) -> np.ndarray:
+    """(az, rg) looks 블록별 무늬 보상 coherence (0으로 채워진 픽셀이 10% 넘는 블록은 NaN)
+
+    블록 간섭도의 (oversample배 zero-padding) FFT 최대값이 곧 선형 위상을 보상한 |Σ s1·s2*|입니다.
+    """
+    la, lr = looks
+    h = reference.shape[0] // la * la
+    w = min(reference.shape[1], secondary.shape[1]) // lr * lr
+    if h == 0 or w == 0:
+        return np.empty((0, 0))
+
+    def blocks(x):
+        return x[:h, :w].reshape(h // la, la, w // lr, lr).transpose(0, 2, 1, 3).reshape(-1, la, lr)
+
+    s1, s2 = blocks(reference), blocks(secondary)
+    peak = np.abs(np.fft.fft2(s1 * np.conj(s2), s=(oversample * la, oversample * lr), axes=(1, 2)))
+    peak = peak.reshape(len(s1), -1).max(axis=1)
+    power = np.sqrt((np.abs(s1) ** 2).sum(axis=(1, 2)) * (np.abs(s2) ** 2).sum(axis=(1, 2)))
+    valid = ((s1 == 0).mean(axis=(1, 2)) < 0.1) & ((s2 == 0).mean(axis=(1, 2)) < 0.1) & (power > 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        coherence = np.where(valid, peak / power, np.nan)
+    return coherence.reshape(h // la, w // lr)
+
+
+class _Scene:
+    """triage용 장면 (AOI burst와 burst별 AOI 열 범위)"""
+
+    def __init__(self, safe: RemoteSafe, aoi_bbox: Sequence[float], polarization: str):
+        self.safe = safe
+        self.bursts = safe.select_bursts(aoi_bbox, polarization)
+        self.columns: Dict[Tuple[str, int], Tuple[int, int]] = {}
+        annotations = {}
+        for burst in self.bursts:
+            if burst.annotation not in annotations:
+                annotations[burst.annotation] = read_member(safe.reader, safe.members[burst.annotation])
+            self.columns[(burst.measurement, burst.index)] = aoi_columns(annotations[burst.annotation], burst, aoi_bbox)
+
+
+class PairTriage:
+    """quick-look coherence 기반 간섭쌍 순위/제외
+
+    Example:
+        triage = PairTriage(SceneCatalog(), session=retriever.session)
+        pairs = triage.select(pairs)   # 통과한 쌍만 예측 coherence 순으로
+    """
+
+    def __init__(self, catalog: SceneCatalog = None, session=None, reader_factory=None):
+        """
+        Args:
+            catalog: 원격 URL을 찾을 장면 카탈로그 (기본값: 새로 로드)
+            session: HTTP 세션 (ASFSession, 로컬 zip이 없는 장면에 사용)
+            reader_factory: url → RangeReader (기본값: HttpRangeReader)
+        """
+        config = get_config()
+        self.config = config
+        self.catalog = catalog or SceneCatalog()
+        self.reader_factory = reader_factory or (lambda url: HttpRangeReader(url, session=session))
+        self.raw_dir = config.get_path('raw_data_dir')
+        self.aoi_bbox = get_aoi_bbox(config)
+        self.polarization = config.get('sentinel1', 'polarization')
+        self.looks = tuple(config.get('triage', 'looks', default=[16, 64]))
+        self.bands_per_burst = config.get('triage', 'bands_per_burst', default=3)
+        self.max_offset = tuple(config.get('triage', 'max_offset', default=[8, 32]))
+        self.min_coherence = config.get('triage', 'min_coherence', default=0.3)
+        self.min_coherent_fraction = config.get('triage', 'min_coherent_fraction', default=0.2)
+        self.workers = config.get('triage', 'workers', default=2)
+        self.cache_path = config.project_root / config.get('triage', 'cache', default='./data/processed/triage.json')
+        self.cache_bytes = int(config.get('triage', 'cache_mb', default=1024) * 1024**2)
+
+        self._scenes: Dict[str, _Scene] = {}
+        self._scene_locks: Dict[str, threading.Lock] = {}
+        self._bands: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._band_bytes = 0
+        self._lock = threading.Lock()
+        self.results: Dict[str, dict] = {}
+        if self.cache_path.exists():
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                self.results = json.load(f)
+
+    # ------------------------------------------------------------------
+    # 장면/띠 읽기
+    # ------------------------------------------------------------------
+    def _reader(self, title: str):
+        zip_path = self.raw_dir / f"{title}.zip"
+        if zip_path.exists():
+            return FileRangeReader(zip_path)
+        rows = self.catalog.scenes[self.catalog.scenes['title'] == title]
+        if rows.empty or not rows.iloc[0]['url']:
+            raise ValueError(f"로컬 zip도 카탈로그 URL도 없습니다: {title}")
+        return self.reader_factory(rows.iloc[0]['url'])
+
+    def _scene(self, title: str) -> _Scene:
+        with self._lock:
+            lock = self._scene_locks.setdefault(title, threading.Lock())
+        with lock:
+            if title not in self._scenes:
+                self._scenes[title] = _Scene(RemoteSafe(self._reader(title)), self.aoi_bbox, self.polarization)
+            return self._scenes[title]
+
+    def _read_band(self, title: str, measurement: str, row0: int, row1: int) -> np.ndarray:
+        """측정 TIFF 행 읽기 (같은 날짜가 여러 쌍에 쓰이므로 LRU 캐시)"""
+        key = (title, measurement, row0, row1)
+        with self._lock:
+            if key in self._bands:
+                self._bands.move_to_end(key)
+                return self._bands[key]
+        block = self._scene(title).safe.read_lines(measurement, row0, row1)
+        with self._lock:
+            if key not in self._bands:
+                self._bands[key] = block
+                self._band_bytes += block.nbytes
+                while self._band_bytes > self.cache_bytes and len(self._bands) > 1:
+                    _, evicted = self._bands.popitem(last=False)
+                    self._band_bytes -= evicted.nbytes
+        return block
+
+    def _date_bursts(self, safes: Sequence[str]) -> List[Tuple[str, BurstInfo]]:
+        """날짜의 모든 장면(연속 프레임)에서 AOI burst"""
+        titles = [scene_name(Path(p)) or Path(p).stem for p in safes]
+        return [(title, burst) for title in titles for burst in self._scene(title).bursts]
+
+    # ------------------------------------------------------------------
+    # 간섭쌍 평가
+    # ------------------------------------------------------------------
+    def evaluate(self, pair: PairSpec) -> TriageResult:
+        """간섭쌍 하나의 quick-look coherence"""
+        started = time.time()
+        reference = self._date_bursts(pair.reference_safes)
+        secondary = self._date_bursts(pair.secondary_safes)
+        owners = {id(b): t for t, b in reference + secondary}
+        matches = match_bursts([b for _, b in reference], [b for _, b in secondary])
+        if not matches:
+            raise ValueError("두 날짜에 공통 AOI burst가 없습니다")
+        titles = {owners[id(b)] for pair_bursts in matches for b in pair_bursts}
+        read_before = sum(self._scene(t).safe.reader.bytes_read for t in titles)
+
+        height = self.looks[0]
+        max_az, max_rg = self.max_offset
+        coherences = []
+        for ref, sec in matches:
+            ref_title, sec_title = owners[id(ref)], owners[id(sec)]
+            col0, col1 = self._scene(ref_title).columns[(ref.measurement, ref.index)]
+            for row in band_rows(ref, self.bands_per_burst, height):
+                sec_row0 = sec.first_line + row - max_az
+                if sec_row0 < sec.first_line or sec_row0 + height + 2 * max_az > sec.first_line + sec.lines:
+                    continue
+                s1 = self._read_band(ref_title, ref.measurement, ref.first_line + row, ref.first_line + row + height)
+                s2 = self._read_band(sec_title, sec.measurement, sec_row0, sec_row0 + height + 2 * max_az)
+                daz, drg = integer_offset(s1[:, col0:col1], s2[:, col0:col1], self.max_offset)
+                c0, c1 = max(col0, -drg), min(col1, s2.shape[1] - drg, s1.shape[1])
+                aligned = s2[max_az + daz:max_az + daz + height, c0 + drg:c1 + drg]
+                coherences.append(block_coherence(s1[:, c0:c1], aligned, self.looks).ravel())
+
+        values = np.concatenate(coherences) if coherences else np.empty(0)
+        values = values[np.isfinite(values)]
+        if values.size == 0:
+            raise ValueError("유효한 quick-look 블록이 없습니다")
+        read_after = sum(self._scene(t).safe.reader.bytes_read for t in titles)
+        return TriageResult(
+            pair=pair.name,
+            coherence=float(np.median(values)),
+            coherent_fraction=float((values >= self.min_coherence).mean()),
+            n_blocks=int(values.size),
+            bytes_read=int(read_after - read_before),
+            elapsed=time.time() - started,
+        )
+
+    def _decide(self, result: TriageResult) -> TriageResult:
+        if result.reason and np.isnan(result.coherent_fraction):
+            return result
+        result.accepted = result.coherent_fraction >= self.min_coherent_fraction
+        result.reason = '' if result.accepted else (
+            f"coherence ≥ {self.min_coherence} 블록 {result.coherent_fraction:.0%} < {self.min_coherent_fraction:.0%}"
+        )
+        return result
+
+    def _evaluate_safely(self, pair: PairSpec) -> TriageResult:
+        """평가 실패 처리 - 공통 burst 없음 등 확정 오류는 제외, 통신 오류 등은 통과(처리 여부 판단 보류)"""
+        try:
+            return self.evaluate(pair)
+        except ValueError as e:
+            logger.warning(f"quick-look 제외 ({pair.name}): {e}")
+            return TriageResult(pair.name, np.nan, np.nan, 0, 0, 0.0, accepted=False, reason=str(e))
+        except Exception as e:
+            logger.warning(f"quick-look 실패, 판단 없이 통과 ({pair.name}): {e}")
+            return TriageResult(pair.name, np.nan, np.nan, 0, 0, 0.0, accepted=True, reason=f"평가 실패: {e}")
+
+    def run(self, pairs: Sequence[PairSpec], refresh: bool = False) -> List[TriageResult]:
+        """간섭쌍 평가 (캐시된 결과 재사용) → 순위순 결과
+
+        임계값은 캐시된 통계에 매번 다시 적용하므로 설정만 바꾸면 재계산 없이 판정이 바뀝니다.
+
+        Args:
+            pairs: 후보 간섭쌍
+            refresh: True면 캐시를 무시하고 다시 평가
+        """
+        todo = [p for p in pairs if refresh or p.name not in self.results]
+        if todo:
+            logger.info(f"quick-look 평가: 간섭쌍 {len(todo)}개 (캐시 {len(pairs) - len(todo)}개)")
+            # 날짜순으로 처리해 인접 쌍이 같은 장면의 띠를 캐시에서 재사용
+            todo = sorted(todo, key=lambda p: (p.reference, p.secondary))
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for result in pool.map(self._evaluate_safely, todo):
+                    # 통신 오류로 통과시킨 결과는 다음 실행에서 다시 평가
+                    if not (result.accepted and result.reason):
+                        self.results[result.pair] = asdict(result)
+                    logger.info(
+                        f"  {result.pair}: coherence {result.coherence:.2f}, "
+                        f"유효 블록 {result.coherent_fraction:.0%} ({format_file_size(result.bytes_read)}, {result.elapsed:.1f}s)"
+                    )
+            self.save()
+
+        results = []
+        for pair in pairs:
+            record = self.results.get(pair.name)
+            if record is None:
+                results.append(TriageResult(pair.name, np.nan, np.nan, 0, 0, 0.0, accepted=True, reason="평가 실패"))
+            else:
+                results.append(self._decide(TriageResult(**record)))
+        return sorted(results, key=lambda r: r.score, reverse=True)
+
+    def select(self, pairs: Sequence[PairSpec], refresh: bool = False) -> List[PairSpec]:
+        """통과한 간섭쌍만 예측 coherence 순으로 반환"""
+        by_name = {p.name: p for p in pairs}
+        results = self.run(pairs, refresh)
+        rejected = [r for r in results if not r.accepted]
+        for r in rejected:
+            logger.info(f"quick-look 제외: {r.pair} ({r.reason})")
+        logger.info(f"quick-look: 간섭쌍 {len(pairs)}개 중 {len(rejected)}개 제외")
+        return [by_name[r.pair] for r in results if r.accepted]
+
+    def save(self):
+        """평가 결과 캐시 저장"""
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_path, 'w', encoding='utf-8') as f:
+            json.dump(self.results, f, indent=2, ensure_ascii=False)
+
+
+def main():
+    """메인 실행 함수"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="topsApp 전 quick-look coherence 기반 간섭쌍 선별")
+    parser.add_argument('--refresh', action='store_true', help='캐시를 무시하고 다시 평가')
+    args = parser.parse_args()
+
+    from .dag import plan_stack_pairs
+    from .data_retrieval import Sentinel1Retriever
+
+    catalog = SceneCatalog()
+    pairs = plan_stack_pairs(catalog)
+    if not pairs:
+        console.print("[yellow]평가할 간섭쌍이 없습니다 (카탈로그 동기화 필요)[/yellow]")
+        return
+    results = PairTriage(catalog, session=Sentinel1Retriever().session).run(pairs, refresh=args.refresh)
+
+    table = Table(title=f"quick-look 간섭쌍 순위 ({len(results)}개)")
+    table.add_column("간섭쌍", style="cyan")
+    table.add_column("coherence", justify="right")
+    table.add_column("유효 블록", justify="right")
+    table.add_column("판정")
+    for r in results:
+        verdict = "[green]처리[/green]" if r.accepted else f"[red]제외[/red] {r.reason}"
+        table.add_row(r.pair, f"{r.coherence:.2f}", f"{r.coherent_fraction:.0%}", verdict)
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()
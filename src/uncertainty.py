@@ -0,0 +1,234 @@
+"""
+Velocity Uncertainty Module
+간섭도 부트스트랩으로 SBAS 선형 속도의 픽셀별 표준편차 추정
+
+간섭도 K개를 복원 추출한 재표본 b는 간섭도별 가중치(뽑힌 횟수) w_b로 표현되고,
+재표본의 SBAS 속도는 위상에 대한 선형 함수입니다.
+
+    v_b = h_bᵀ φ,    h_b = W_b · A · L̃_b⁻¹ · c_b
+
+A는 (K x T) 간섭쌍-날짜 행렬, L_b = Aᵀ W_b A, c_b는 재표본에서 관측된 날짜만으로 만든
+중심화 속도 연산자입니다. 관측되지 않은 날짜는 단위 대각, 기준(상수) 방향은 J/n 항으로
+고정한 L̃_b를 풀기 때문에 날짜가 빠진 재표본도 그대로 쓰고, 네트워크가 끊어진 재표본만 버립니다.
+
+유효 간섭도 패턴(유효 마스크 그룹)마다 H = [h_1 … h_B] (B x K)를 한 번만 계산해 캐시하면
+타일의 모든 재표본 속도는 행렬 곱 H · Φ 하나이고, 타일은 프로세스 풀에 분배합니다.
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Tuple
+import json
+import logging
+
+import numpy as np
+
+from .config import get_config
+from .masking import ValidityMask
+from .raster_io import IsceRaster
+from .stack import StackStore, Window
+from .time_series import date_to_years, phase_to_mm
+
+logger = logging.getLogger(__name__)
+
+
+def bootstrap_weights(n_ifgs: int, n_resamples: int, seed: int = 0) -> np.ndarray:
+    """복원 추출 재표본의 간섭도별 뽑힌 횟수 (B x K)"""
+    rng = np.random.default_rng(seed)
+    return rng.multinomial(n_ifgs, np.full(n_ifgs, 1.0 / n_ifgs), size=n_resamples).astype(np.float64)
+
+
+def bootstrap_operator(A: np.ndarray, t: np.ndarray, weights: np.ndarray, valid: np.ndarray = None) -> np.ndarray:
+    """재표본별 위상 → 속도(rad/yr) 연산자
+
+    Args:
+        A: (K, T) 간섭쌍-날짜 행렬 (reference −1, secondary +1)
+        t: (T,) 날짜 (연)
+        weights: (B, K) 재표본 가중치
+        valid: (K,) 이 픽셀 그룹에서 값이 있는 간섭도 (기본값: 전체)
+
+    Returns:
+        (B, K) 연산자 - 네트워크가 끊어진 재표본의 행은 NaN
+    """
+    w = weights * valid if valid is not None else weights
+    B, T = len(w), A.shape[1]
+    observed = (w @ np.abs(A)) > 0
+    n_obs = observed.sum(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.where(observed, t, 0.0).sum(axis=1) / n_obs
+        centered = np.where(observed, t - mean[:, None], 0.0)
+        c = centered / (centered ** 2).sum(axis=1, keepdims=True)
+
+    L = (A.T[None] * w[:, None, :]) @ A
+    o = observed.astype(np.float64)
+    L += o[:, :, None] * o[:, None, :] / np.maximum(n_obs, 1)[:, None, None]
+    L[:, np.arange(T), np.arange(T)] += 1.0 - o
+
+    eig = np.linalg.eigvalsh(L)
+    ok = (n_obs >= 2) & np.isfinite(c).all(axis=1) & (eig[:, 0] > 1e-9 * eig[:, -1])
+    H = np.full((B, A.shape[0]), np.nan)
+    if ok.any():
+        y = np.linalg.solve(L[ok], c[ok][..., None])[..., 0]
+        H[ok] = w[ok] * (y @ A.T)
+    return H
+
+
+# ----------------------------------------------------------------------
+# 워커 프로세스 (HDF5 핸들은 프로세스마다 따로 엶)
+# ----------------------------------------------------------------------
+_worker: Dict[str, object] = {}
+
+
+def _init_worker(store_path: str, indices: np.ndarray, A: np.ndarray, t: np.ndarray, weights: np.ndarray,
+                 scale: float, min_valid: int, min_resamples: int, use_mask: bool):
+    store = StackStore(store_path, 'r')
+    _worker.update(
+        store=store, indices=indices, A=A, t=t, weights=weights, scale=scale,
+        min_valid=min_valid, min_resamples=min_resamples,
+        mask=ValidityMask(store) if use_mask else None, operators={},
+    )
+
+
+def _operator(valid: np.ndarray) -> np.ndarray:
+    """유효 간섭도 패턴별 연산자 (끊어진 재표본 행은 제거, 워커 안에서 캐시)"""
+    key = np.packbits(valid).tobytes()
+    operators = _worker['operators']
+    if key not in operators:
+        H = bootstrap_operator(_worker['A'], _worker['t'], _worker['weights'], valid)
+        operators[key] = H[np.isfinite(H).all(axis=1)]
+    return operators[key]
+
+
+def _tile_std(window: Window) -> Tuple[Window, np.ndarray, int]:
+    """타일 하나의 부트스트랩 속도 표준편차 (mm/yr) → (window, std, 이 워커의 캐시된 패턴 수)"""
+    store = _worker['store']
+    phase = store.read_stack('interferograms/unwrapped_phase', window, index=_worker['indices']).astype(np.float64)
+    block_shape = phase.shape[1:]
+    phase = phase.reshape(len(_worker['indices']), -1)
+    valid = np.isfinite(phase)
+    candidates = valid.sum(axis=0) >= _worker['min_valid']
+    if _worker['mask'] is not None:
+        candidates &= _worker['mask'].window(window).ravel()
+    phase = np.where(valid, phase, 0.0)
+
+    std = np.full(phase.shape[1], np.nan)
+    pixels = np.flatnonzero(candidates)
+    if pixels.size:
+        patterns, inverse = np.unique(valid[:, pixels].T, axis=0, return_inverse=True)
+        for k, pattern in enumerate(patterns):
+            H = _operator(pattern)
+            if len(H) < _worker['min_resamples']:
+                continue
+            group = pixels[inverse.ravel() == k]
+            velocities = (H @ phase[:, group]) * _worker['scale']
+            std[group] = velocities.std(axis=0, ddof=1)
+    return window, std.reshape(block_shape).astype(np.float32), len(_worker['operators'])
+
+
+class BootstrapUncertainty:
+    """간섭도 부트스트랩 기반 SBAS 속도 표준편차
+
+    Example:
+        with StackStore.open() as store:
+            path = BootstrapUncertainty(store).run()
+    """
+
+    def __init__(self, store: StackStore, n_resamples: int = None, workers: int = None, block_size: int = None):
+        """
+        Args:
+            store: StackStore (폐합 검사 결과가 있으면 제외된 간섭도는 빼고 재표본)
+            n_resamples: 재표본 수 (기본값: uncertainty.n_resamples)
+            workers: 프로세스 수 (기본값: uncertainty.workers)
+            block_size: 타일 크기 (기본값: stack.block_size)
+        """
+        config = get_config()
+        self.store = store
+        self.n_resamples = n_resamples or config.get('uncertainty', 'n_resamples', default=200)
+        self.workers = workers or config.get('uncertainty', 'workers', default=4)
+        self.block_size = block_size
+        self.seed = config.get('uncertainty', 'seed', default=0)
+        self.min_valid_fraction = config.get('uncertainty', 'min_valid_fraction', default=0.8)
+        self.min_resamples = config.get('uncertainty', 'min_resamples', default=20)
+        self.wavelength = config.get('sbas', 'wavelength', default=0.0555)
+        self.output = config.project_root / config.get(
+            'uncertainty', 'output', default='./outputs/velocity_std.geo'
+        )
+        self.mask = ValidityMask.for_store(store)
+
+        keep = np.ones(len(store.pairs), dtype=bool)
+        if 'qc/flagged' in store.h5:
+            flagged = store.h5['qc/flagged'][:]
+            keep[:len(flagged)] &= ~flagged
+        self.indices = np.flatnonzero(keep)
+        if self.indices.size < 2:
+            raise ValueError("부트스트랩에 사용할 간섭도가 2개 이상 필요합니다")
+        pairs = [store.pairs[i] for i in self.indices]
+        self.dates = sorted({d for pair in pairs for d in pair})
+        date_index = {d: i for i, d in enumerate(self.dates)}
+        self.A = np.zeros((len(pairs), len(self.dates)))
+        for k, (reference, secondary) in enumerate(pairs):
+            self.A[k, date_index[reference]] = -1.0
+            self.A[k, date_index[secondary]] = 1.0
+
+    def run(self, output: str = None) -> Path:
+        """타일을 프로세스 풀에 분배해 표준편차 래스터(mm/yr, ISCE .geo) 기록"""
+        output = Path(output or self.output)
+        weights = bootstrap_weights(len(self.indices), self.n_resamples, self.seed)
+        t = date_to_years(self.dates)
+
+        # 전체 유효 패턴의 끊어진 재표본 비율 (네트워크 진단용)
+        H = bootstrap_operator(self.A, t, weights)
+        usable = int(np.isfinite(H).all(axis=1).sum())
+        logger.info(
+            f"부트스트랩: 간섭도 {len(self.indices)}개, 날짜 {len(self.dates)}개, "
+            f"재표본 {self.n_resamples}개 중 연결된 네트워크 {usable}개"
+        )
+
+        raster = IsceRaster.create(
+            output, self.store.width, self.store.length,
+            geotransform=self.store.geotransform, fill_value=np.nan,
+        )
+        windows = list(self.store.iter_windows(self.block_size, mask=self.mask))
+        init_args = (
+            str(self.store.path), self.indices, self.A, t, weights, phase_to_mm(self.wavelength),
+            int(np.ceil(self.min_valid_fraction * len(self.indices))), self.min_resamples, self.mask is not None,
+        )
+        n_patterns = 0
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=init_args) as pool:
+            for window, std, cached in pool.map(_tile_std, windows):
+                raster.write_window(window, std)
+                n_patterns = max(n_patterns, cached)
+        raster.flush()
+
+        with open(output.with_suffix('.json'), 'w', encoding='utf-8') as f:
+            json.dump({
+                'n_resamples': self.n_resamples,
+                'connected_resamples': usable,
+                'seed': self.seed,
+                'n_interferograms': int(len(self.indices)),
+                'dates': [self.dates[0], self.dates[-1]],
+                'units': 'mm/yr',
+            }, f, indent=2)
+        logger.info(f"속도 표준편차 래스터 기록: {output} (타일 {len(windows)}개, 워커당 최대 패턴 {n_patterns}개)")
+        return output
+
+
+def main():
+    """메인 실행 함수"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="간섭도 부트스트랩 기반 SBAS 속도 표준편차")
+    parser.add_argument('--store', default=None, help='스택 HDF5 경로')
+    parser.add_argument('--resamples', type=int, default=None, help='재표본 수 (기본값: uncertainty.n_resamples)')
+    parser.add_argument('--workers', type=int, default=None, help='프로세스 수 (기본값: uncertainty.workers)')
+    parser.add_argument('--output', default=None, help='출력 래스터 (기본값: uncertainty.output)')
+    args = parser.parse_args()
+
+    with StackStore.open(args.store) as store:
+        path = BootstrapUncertainty(store, args.resamples, args.workers).run(args.output)
+    print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+"""
+Visualization Module
+변위/속도/Coherence 래스터의 다중 해상도 오버뷰 피라미드(z/x/y 타일) 생성 및 제공
+
+원본 바이너리를 행 블록 단위로 한 번만 스트리밍하면서 모든 줌 레벨의 타일을
+디스크 캐시에 기록합니다. 이후 탐색은 캐시된 타일만 읽으므로 전체 배열을
+메모리에 올리거나 원본 바이너리를 다시 읽을 필요가 없습니다.
+
+캐시 구조:
+    <cache_dir>/<product>_<key>/
+        manifest.json       # 크기, 줌 범위, 색상 범위 등
+        <z>/<x>/<y>.npy     # float32 타일 데이터 (z=0이 가장 거친 레벨)
+        <z>/<x>/<y>.png     # 요청 시 렌더링되어 캐시되는 PNG
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import logging
+import math
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .config import get_config
+from .raster_io import IsceRaster
+
+logger = logging.getLogger(__name__)
+
+
+# 제품별 기본 설정 (band: ISCE 밴드 번호, scale: 값 변환 계수)
+PRODUCTS = {
+    'displacement': {'band': 2, 'units': 'mm', 'cmap': 'RdYlBu_r', 'symmetric': True},
+    'velocity': {'band': 1, 'units': 'mm/yr', 'cmap': 'RdYlBu_r', 'symmetric': True},
+    'coherence': {'band': 1, 'units': '', 'cmap': 'gray', 'vmin': 0.0, 'vmax': 1.0},
+}
+
+
+def downsample2(array: np.ndarray) -> np.ndarray:
+    """2x2 블록 NaN-평균 다운샘플링 (홀수 크기는 NaN으로 패딩)"""
+    rows, cols = array.shape
+    if rows % 2 or cols % 2:
+        padded = np.full((rows + rows % 2, cols + cols % 2), np.nan, dtype=np.float32)
+        padded[:rows, :cols] = array
+        array = padded
+        rows, cols = array.shape
+
+    valid = np.isfinite(array)
+    filled = np.where(valid, array, 0.0).reshape(rows // 2, 2, cols // 2, 2)
+    total = filled.sum(axis=(1, 3), dtype=np.float64)
+    count = valid.reshape(rows // 2, 2, cols // 2, 2).sum(axis=(1, 3))
+
+    out = np.full(total.shape, np.nan, dtype=np.float32)
+    np.divide(total, count, out=out, where=count > 0, casting='unsafe')
+    return out
+
+
+class _LevelWriter:
+    """피라미드 한 레벨의 행 버퍼
+
+    타일 높이만큼 행이 모이면 타일을 기록하고, 2배 다운샘플한 결과를
+    다음(더 거친) 레벨로 넘깁니다. 레벨당 최대 tile_size 행만 메모리에 유지합니다.
+    """
+
+    def __init__(self, pyramid_dir: Path, zoom: int, tile_size: int, next_level=None):
+        self.pyramid_dir = pyramid_dir
+        self.zoom = zoom
+        self.tile_size = tile_size
+        self.next_level = next_level
+        self.buffer: List[np.ndarray] = []
+        self.buffered_rows = 0
+        self.tile_row = 0
+
+    def push(self, rows: np.ndarray):
+        self.buffer.append(rows)
+        self.buffered_rows += rows.shape[0]
+        while self.buffered_rows >= self.tile_size:
+            strip = np.concatenate(self.buffer, axis=0)
+            self._emit(strip[:self.tile_size])
+            rest = strip[self.tile_size:]
+            self.buffer = [rest] if rest.shape[0] else []
+            self.buffered_rows = rest.shape[0]
+
+    def flush(self):
+        if self.buffered_rows:
+            self._emit(np.concatenate(self.buffer, axis=0))
+            self.buffer = []
+            self.buffered_rows = 0
+        if self.next_level is not None:
+            self.next_level.flush()
+
+    def _emit(self, strip: np.ndarray):
+        for tile_col, col0 in enumerate(range(0, strip.shape[1], self.tile_size)):
+            self._write_tile(tile_col, strip[:, col0:col0 + self.tile_size])
+        self.tile_row += 1
+        if self.next_level is not None:
+            self.next_level.push(downsample2(strip))
+
+    def _write_tile(self, tile_col: int, tile: np.ndarray):
+        """타일 하나 기록 (가장자리 타일은 tile_size보다 작을 수 있음)"""
+        tile_path = self.pyramid_dir / str(self.zoom) / str(tile_col) / f"{self.tile_row}.npy"
+        tile_path.parent.mkdir(parents=True, exist_ok=True)
+        np.save(tile_path, np.ascontiguousarray(tile, dtype=np.float32))
+
+
+def _cache_key(raster_path: Path, product: str, band: int, scale: float, tile_size: int) -> str:
+    """원본 파일 상태 + 설정으로 캐시 키 생성"""
+    stat = raster_path.stat()
+    token = f"{raster_path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}|{product}|{band}|{scale}|{tile_size}"
+    return hashlib.sha1(token.encode('utf-8')).hexdigest()[:12]
+
+
+def build_overview_pyramid(
+    raster_path: str,
+    product: str = 'displacement',
+    cache_dir: str = None,
+    tile_size: int = None,
+    band: int = None,
+    scale: float = None,
+    block_rows: int = 512,
+    force: bool = False
+) -> Path:
+    """래스터 1회 스트리밍으로 오버뷰 피라미드 생성 (디스크 캐시)
+
+    Args:
+        raster_path: ISCE 래스터 경로 (예: merged/filt_topophase.unw.geo)
+        product: 'displacement', 'velocity', 'coherence'
+        cache_dir: 타일 캐시 루트 (기본값: output.visualization.tiles.cache_dir)
+        tile_size: 타일 크기 (픽셀)
+        band: 읽을 밴드 번호 (기본값: 제품별 설정)
+        scale: 값 변환 계수 (displacement 기본값: 위상 → mm)
+        block_rows: 원본에서 한 번에 읽을 행 수
+        force: 캐시가 있어도 다시 생성
+
+    Returns:
+        피라미드 디렉토리 경로
+    """
+    if product not in PRODUCTS:
+        raise ValueError(f"지원하지 않는 제품: {product} ({', '.join(PRODUCTS)})")
+
+    config = get_config()
+    tile_config = config.get('output', 'visualization', 'tiles', default={})
+    if cache_dir is None:
+        cache_dir = config.project_root / tile_config.get('cache_dir', './outputs/tiles')
+    if tile_size is None:
+        tile_size = tile_config.get('tile_size', 256)
+
+    spec = PRODUCTS[product]
+    band = band or spec['band']
+    if scale is None:
+        if product == 'displacement':
+            wavelength = config.get('sbas', 'wavelength', default=0.0555)
+            scale = wavelength / (4 * np.pi) * 1000  # radians → mm
+        else:
+            scale = 1.0
+
+    raster_path = Path(raster_path)
+    raster = IsceRaster(raster_path)
+    band = min(band, raster.bands)
+
+    pyramid_dir = Path(cache_dir) / f"{product}_{_cache_key(raster_path, product, band, scale, tile_size)}"
+    manifest_path = pyramid_dir / 'manifest.json'
+    if manifest_path.exists() and not force:
+        logger.info(f"캐시된 피라미드 사용: {pyramid_dir}")
+        return pyramid_dir
+
+    max_zoom = max(0, math.ceil(math.log2(max(raster.shape) / tile_size)))
+    logger.info(f"피라미드 생성: {raster_path.name} ({raster.width} x {raster.length}), 줌 0~{max_zoom}")
+
+    # 가장 거친 레벨부터 체인 구성 (full resolution = max_zoom)
+    level = None
+    for zoom in range(0, max_zoom + 1):
+        level = _LevelWriter(pyramid_dir, zoom, tile_size, next_level=level)
+
+    valid_count = 0
+    value_min, value_max = np.inf, -np.inf
+    for _, _, block in raster.iter_row_blocks(block_rows, band=band):
+        block = block.astype(np.float32)
+        if product == 'coherence':
+            block[block <= 0] = np.nan
+        else:
+            block[block == 0] = np.nan  # ISCE는 무효 영역을 0으로 기록
+        block *= scale
+
+        finite = block[np.isfinite(block)]
+        if finite.size:
+            valid_count += finite.size
+            value_min = min(value_min, float(finite.min()))
+            value_max = max(value_max, float(finite.max()))
+        level.push(block)
+    level.flush()
+
+    # 색상 범위: 가장 거친 레벨(전체 장면 축소본) 기준
+    overview = np.load(pyramid_dir / '0' / '0' / '0.npy')
+    valid = overview[np.isfinite(overview)]
+    if 'vmin' in spec:
+        vmin, vmax = spec['vmin'], spec['vmax']
+    elif valid.size == 0:
+        vmin, vmax = 0.0, 1.0
+    elif spec.get('symmetric'):
+        vmax = float(np.percentile(np.abs(valid), 95))
+        vmin = -vmax
+    else:
+        vmin, vmax = (float(v) for v in np.percentile(valid, [5, 95]))
+
+    manifest = {
+        'product': product,
+        'source': str(raster_path.resolve()),
+        'band': band,
+        'scale': scale,
+        'width': raster.width,
+        'height': raster.length,
+        'tile_size': tile_size,
+        'min_zoom': 0,
+        'max_zoom': max_zoom,
+        'units': spec['units'],
+        'cmap': spec['cmap'],
+        'vmin': vmin,
+        'vmax': vmax,
+        'valid_pixels': valid_count,
+        'value_range': [value_min, value_max] if valid_count else None,
+        'geotransform': raster.geotransform,
+    }
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f"피라미드 생성 완료: {pyramid_dir}")
+    return pyramid_dir
+
+
+def load_manifest(pyramid_dir: Path) -> Dict:
+    """피라미드 manifest.json 읽기"""
+    with open(Path(pyramid_dir) / 'manifest.json', 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def render_tile(pyramid_dir: Path, z: int, x: int, y: int, manifest: Dict = None) -> Optional[bytes]:
+    """캐시된 타일을 PNG로 렌더링 (결과도 디스크에 캐시)
+
+    Args:
+        pyramid_dir: 피라미드 디렉토리
+        z, x, y: 타일 좌표 (z=0이 가장 거친 레벨)
+        manifest: 미리 읽어 둔 manifest (선택)
+
+    Returns:
+        PNG 바이트 (타일이 없으면 None)
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    pyramid_dir = Path(pyramid_dir)
+    png_path = pyramid_dir / str(z) / str(x) / f"{y}.png"
+    if png_path.exists():
+        return png_path.read_bytes()
+
+    npy_path = png_path.with_suffix('.npy')
+    if not npy_path.exists():
+        return None
+
+    if manifest is None:
+        manifest = load_manifest(pyramid_dir)
+    tile_size = manifest['tile_size']
+
+    data = np.load(npy_path)
+    tile = np.full((tile_size, tile_size), np.nan, dtype=np.float32)
+    tile[:data.shape[0], :data.shape[1]] = data  # 가장자리 타일 패딩
+
+    cmap = plt.get_cmap(manifest['cmap']).copy()
+    cmap.set_bad(alpha=0.0)  # 무효 픽셀은 투명
+    buffer = io.BytesIO()
+    plt.imsave(
+        buffer,
+        np.ma.masked_invalid(tile),
+        cmap=cmap,
+        vmin=manifest['vmin'],
+        vmax=manifest['vmax'],
+        format='png'
+    )
+    png = buffer.getvalue()
+    png_path.write_bytes(png)
+    return png
+
+
+def export_static_tiles(pyramid_dir: Path) -> int:
+    """모든 타일을 PNG로 렌더링 (정적 호스팅용)
+
+    Returns:
+        렌더링된 타일 수
+    """
+    pyramid_dir = Path(pyramid_dir)
+    manifest = load_manifest(pyramid_dir)
+    count = 0
+    for npy_path in sorted(pyramid_dir.glob('*/*/*.npy')):
+        z, x, y = npy_path.parts[-3], npy_path.parts[-2], npy_path.stem
+        render_tile(pyramid_dir, int(z), int(x), int(y), manifest)
+        count += 1
+    logger.info(f"정적 타일 {count}개 내보내기 완료: {pyramid_dir}")
+    return count
+
+
+class TileRequestHandler(SimpleHTTPRequestHandler):
+    """/<pyramid>/<z>/<x>/<y>.png 요청을 캐시에서 렌더링하여 응답"""
+
+    def __init__(self, *args, cache_dir: Path = None, **kwargs):
+        self.cache_dir = Path(cache_dir)
+        super().__init__(*args, directory=str(cache_dir), **kwargs)
+
+    def do_GET(self):
+        parts = self.path.split('?')[0].strip('/').split('/')
+        if len(parts) == 4 and parts[3].endswith('.png'):
+            try:
+                z, x, y = int(parts[1]), int(parts[2]), int(parts[3][:-4])
+            except ValueError:
+                self.send_error(400, "잘못된 타일 좌표")
+                return
+            png = render_tile(self.cache_dir / parts[0], z, x, y)
+            if png is None:
+                self.send_error(404, "타일 없음")
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'image/png')
+            self.send_header('Content-Length', str(len(png)))
+            self.send_header('Access-Control-Allow-Origin', '*')
+            self.end_headers()
+            self.wfile.write(png)
+            return
+        super().do_GET()  # manifest.json 등 정적 파일
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+
+def serve_tiles(cache_dir: str = None, host: str = '127.0.0.1', port: int = 8765):
+    """로컬 타일 서버 실행
+
+    Leaflet 등에서 http://<host>:<port>/<pyramid>/{z}/{x}/{y}.png 형식으로 사용합니다.
+    """
+    if cache_dir is None:
+        config = get_config()
+        cache_dir = config.project_root / config.get(
+            'output', 'visualization', 'tiles', 'cache_dir', default='./outputs/tiles'
+        )
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    handler = partial(TileRequestHandler, cache_dir=cache_dir)
+    server = ThreadingHTTPServer((host, port), handler)
+    logger.info(f"타일 서버 시작: http://{host}:{port}/ (캐시: {cache_dir})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("타일 서버 종료")
+    finally:
+        server.server_close()
+
+
+def main():
+    """메인 실행 함수"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="InSAR 결과 오버뷰 타일 생성/제공")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='오버뷰 피라미드 생성')
+    build_parser.add_argument('raster', help='ISCE 래스터 경로')
+    build_parser.add_argument('--product', choices=list(PRODUCTS), default='displacement')
+    build_parser.add_argument('--band', type=int, default=None)
+    build_parser.add_argument('--cache-dir', default=None)
+    build_parser.add_argument('--force', action='store_true')
+    build_parser.add_argument('--export', action='store_true', help='PNG 타일까지 모두 렌더링')
+
+    serve_parser = subparsers.add_parser('serve', help='로컬 타일 서버 실행')
+    serve_parser.add_argument('--cache-dir', default=None)
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8765)
+
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        pyramid_dir = build_overview_pyramid(
+            args.raster,
+            product=args.product,
+            cache_dir=args.cache_dir,
+            band=args.band,
+            force=args.force
+        )
+        if args.export:
+            export_static_tiles(pyramid_dir)
+        print(pyramid_dir)
+    else:
+        serve_tiles(args.cache_dir, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""
+Workspace Module
+여러 AOI(포항, 경주, 울산 등)를 한 작업 공간에서 함께 증분 갱신
+
+카탈로그와 원시 SLC 저장소는 작업 공간 전체가 공유합니다. AOI마다 검색한 결과를 하나의
+카탈로그에 합치고 AOI별 장면 목록만 따로 두므로, 여러 AOI가 쓰는 장면도 한 번만 받습니다.
+
+간섭쌍은 AOI마다 증분 갱신과 같은 규칙으로 선정한 뒤, 같은 입력 장면의 같은 간섭쌍을 원하는
+AOI 중 서로 가까운(workspace.merge_distance 이내) AOI를 묶어 합친 영역으로 topsApp을 한 번만
+실행합니다. 각 AOI는 그 결과를 자기 영역으로 잘라(crop) 스택에 적재하고, 이후 단계(마스크,
+대류권, 기준점, 폐합 검사, SBAS)는 AOI별 설정(Config.for_aoi)으로 실행합니다.
+
+지오코딩 영역은 workspace.grid_arcsec 격자에 맞춰 바깥으로 넓히므로 공유 처리에서 잘라낸 제품과
+AOI 단독 처리 제품이 같은 격자에 놓입니다.
+
+디렉토리:
+    <processed_dir>/workspace.json          AOI별 장면 목록과 마지막 동기화 시각
+    <processed_dir>/shared/<a>+<b>/pairs/   여러 AOI가 공유하는 topsApp 결과
+    <processed_dir>/aois/<name>/            AOI별 간섭쌍(잘라낸 제품), 스택, 캐시
+    <output_dir>/<name>/                    AOI별 출력
+"""
+
+import argparse
+from dataclasses import dataclass, field
+from datetime import datetime
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+import json
+import logging
+import math
+import os
+
+import pandas as pd
+from rich.console import Console
+from rich.table import Table
+
+from .config import Config, get_config, use_config
+from .executor import create_executor
+from .incremental import IncrementalUpdater
+from .insar_processing import PairSpec, get_aoi_bbox, pair_products, pair_work_dir
+from .raster_io import IsceRaster
+from .raw_store import scene_name
+from .triage import PairTriage
+
+console = Console()
+logger = logging.getLogger(__name__)
+
+
+def snap_bbox(bbox: Sequence[float], arcsec: float) -> List[float]:
+    """[min_lat, max_lat, min_lon, max_lon]을 arcsec(초) 격자에 맞춰 바깥으로 넓힘"""
+    min_lat, max_lat, min_lon, max_lon = bbox
+    # 부동소수 오차로 이미 격자 위인 값이 한 칸 밀리지 않도록 여유를 둠
+    down = lambda x: math.floor(x * 3600 / arcsec + 1e-6) * arcsec / 3600
+    up = lambda x: math.ceil(x * 3600 / arcsec - 1e-6) * arcsec / 3600
+    return [down(min_lat), up(max_lat), down(min_lon), up(max_lon)]
+
+
+def union_bbox(boxes: Sequence[Sequence[float]]) -> List[float]:
+    """여러 bbox를 모두 덮는 bbox"""
+    return [
+        min(b[0] for b in boxes), max(b[1] for b in boxes),
+        min(b[2] for b in boxes), max(b[3] for b in boxes),
+    ]
+
+
+def bbox_distance(a: Sequence[float], b: Sequence[float]) -> float:
+    """두 bbox 사이 간격 (도, 겹치면 0)"""
+    gap_lat = max(0.0, a[0] - b[1], b[0] - a[1])
+    gap_lon = max(0.0, a[2] - b[3], b[2] - a[3])
+    return max(gap_lat, gap_lon)
+
+
+def crop_window(raster: IsceRaster, bbox: Sequence[float]) -> Tuple[slice, slice]:
+    """지오코딩 래스터에서 bbox [min_lat, max_lat, min_lon, max_lon]에 해당하는 (행, 열) 윈도우"""
+    if raster.geotransform is None:
+        raise ValueError(f"지오코딩되지 않은 래스터는 자를 수 없습니다: {raster.path}")
+    lon0, dlon, lat0, dlat = raster.geotransform
+    min_lat, max_lat, min_lon, max_lon = bbox
+    row0, row1 = sorted(int(round((lat - lat0) / dlat)) for lat in (min_lat, max_lat))
+    col0, col1 = sorted(int(round((lon - lon0) / dlon)) for lon in (min_lon, max_lon))
+    row0, row1 = max(row0, 0), min(row1, raster.length)
+    col0, col1 = max(col0, 0), min(col1, raster.width)
+    if row1 <= row0 or col1 <= col0:
+        raise ValueError(f"bbox {list(bbox)}가 래스터 영역 밖입니다: {raster.path}")
+    return slice(row0, row1), slice(col0, col1)
+
+
+def crop_products(source_dir: Path, target_dir: Path, bbox: Sequence[float], block_rows: int = 256) -> Path:
+    """공유 처리 결과의 지오코딩 제품을 AOI 영역으로 잘라 AOI 간섭쌍 디렉토리에 기록
+
+    topsApp이 내려받은 DEM(demLat_*)은 대류권 보정에서 찾을 수 있도록 심볼릭 링크로 연결합니다.
+
+    Returns:
+        target_dir
+    """
+    source_dir, target_dir = Path(source_dir), Path(target_dir)
+    targets = pair_products(target_dir)
+    # unw를 마지막에 기록해 중간에 멈춰도 처리 완료(is_pair_processed)로 보이지 않게 함
+    for key, path in sorted(pair_products(source_dir).items(), key=lambda item: item[0] == 'unwrapped_phase'):
+        if not path.exists():
+            continue
+        source = IsceRaster(path)
+        rows, cols = crop_window(source, bbox)
+        lon0, dlon, lat0, dlat = source.geotransform
+        target = IsceRaster.create(
+            targets[key], cols.stop - cols.start, rows.stop - rows.start,
+            dtype=source.dtype, bands=source.bands, scheme=source.scheme,
+            geotransform=(lon0 + cols.start * dlon, dlon, lat0 + rows.start * dlat, dlat),
+        )
+        for row0 in range(rows.start, rows.stop, block_rows):
+            row1 = min(row0 + block_rows, rows.stop)
+            for band in range(1, source.bands + 1):
+                target.write_rows(row0 - rows.start, source.read_rows(row0, row1, band)[:, cols], band)
+        target.flush()
+
+    for dem in source_dir.glob('demLat_*'):
+        link = target_dir / dem.name
+        if not link.exists():
+            link.symlink_to(dem.resolve())
+    return target_dir
+
+
+@dataclass
+class ProcessingGroup:
+    """topsApp 한 번으로 처리하는 간섭쌍 묶음 (같은 AOI 조합, 같은 처리 영역)"""
+    aois: List[str]
+    config: Config
+    pairs: List[PairSpec] = field(default_factory=list)
+
+    @property
+    def name(self) -> str:
+        return '+'.join(self.aois)
+
+    @property
+    def shared(self) -> bool:
+        return len(self.aois) > 1
+
+
+class Workspace:
+    """여러 AOI 공유 작업 공간
+
+    Example:
+        summary = Workspace().run()
+        # summary['pohang'] = {'new_scenes': 3, 'new_pairs': 6, 'processed': 6, ...}
+    """
+
+    def __init__(self, config_path: str = None, retriever=None, names: Sequence[str] = None):
+        """
+        Args:
+            config_path: 설정 파일 경로
+            retriever: Sentinel1Retriever (기본값: 새로 생성)
+            names: 갱신할 AOI (기본값: workspace.aois 전체)
+        """
+        self.config = get_config(config_path)
+        names = list(names or self.config.aoi_names())
+        if not names:
+            raise ValueError("workspace.aois에 AOI가 없습니다. 설정 파일에 AOI를 추가하세요.")
+        self.aois = {name: self.config.for_aoi(name) for name in names}
+
+        # 카탈로그, 원시 저장소, 다운로드는 기본 설정의 증분 갱신기를 공유
+        self.updater = IncrementalUpdater(config_path, retriever)
+        self.retriever = self.updater.retriever
+        self.catalog = self.updater.catalog
+        self.raw_store = self.updater.raw_store
+        self._updaters: Dict[str, IncrementalUpdater] = {}
+
+        self.merge_distance = self.config.get('workspace', 'merge_distance', default=0.2)
+        self.grid_arcsec = self.config.get('workspace', 'grid_arcsec', default=1)
+        self.boxes = {name: snap_bbox(get_aoi_bbox(cfg), self.grid_arcsec) for name, cfg in self.aois.items()}
+
+        self.index_path = self.config.get_path('processed_dir') / 'workspace.json'
+        self.index: Dict[str, dict] = {}
+        if self.index_path.exists():
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                self.index = json.load(f).get('aois', {})
+
+    def save(self):
+        """AOI별 장면 목록 저장"""
+        self.index_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.index_path, 'w', encoding='utf-8') as f:
+            json.dump({'aois': self.index}, f, indent=2, ensure_ascii=False)
+
+    def _updater(self, name: str) -> IncrementalUpdater:
+        """AOI별 증분 갱신기 (use_config 블록 안에서만 사용)"""
+        if name not in self._updaters:
+            updater = IncrementalUpdater(retriever=self.retriever)
+            updater.catalog = self.catalog.subset(self.index.get(name, {}).get('scenes', []))
+            self._updaters[name] = updater
+        return self._updaters[name]
+
+    def _search(self, name: str, start_date: str, end_date: str, max_results: int) -> pd.DataFrame:
+        """검색기의 AOI만 바꿔 검색"""
+        previous = self.retriever.config
+        self.retriever.config = self.aois[name]
+        try:
+            return self.retriever.search_products(start_date=start_date, end_date=end_date, max_results=max_results)
+        finally:
+            self.retriever.config = previous
+
+    def sync(self, end_date: str = None, max_results: int = 1000) -> Dict[str, pd.DataFrame]:
+        """AOI별로 검색해 공유 카탈로그에 합침
+
+        검색 기간은 AOI마다 마지막 동기화 기준이라 나중에 추가한 AOI도 처음부터 검색합니다.
+
+        Returns:
+            {AOI 이름: 그 AOI에 새로 들어온 장면 테이블} (다른 AOI가 이미 받은 장면 포함)
+        """
+        now = datetime.now().isoformat(timespec='seconds')
+        new = {}
+        for name in self.aois:
+            state = self.index.setdefault(name, {'last_sync': None, 'scenes': []})
+            view = self.catalog.subset(state['scenes'])
+            view.last_sync = state['last_sync']
+            start_date, end = view.sync_range(end_date)
+            logger.info(f"AOI 동기화 ({name}): {start_date} ~ {end} (기존 {len(state['scenes'])}개 장면)")
+
+            products_df = self._search(name, start_date, end, max_results)
+            self.catalog.add(products_df)
+            known = set(state['scenes'])
+            new[name] = products_df[~products_df['title'].isin(known)].drop_duplicates('title')
+            state['scenes'] = sorted(known | set(products_df['title']))
+            state['last_sync'] = now
+            logger.info(f"AOI {name}: 새 장면 {len(new[name])}개")
+        self.catalog.last_sync = now
+        self._updaters.clear()
+        return new
+
+    def plan(self, new: Dict[str, pd.DataFrame]) -> Dict[str, List[PairSpec]]:
+        """AOI별 새 간섭쌍 선정 (증분 갱신과 같은 규칙)"""
+        pairs = {}
+        for name, cfg in self.aois.items():
+            with use_config(cfg):
+                pairs[name] = self._updater(name).plan(new[name])
+        return pairs
+
+    def triage(self, pairs: Dict[str, List[PairSpec]]) -> Dict[str, List[PairSpec]]:
+        """AOI별 quick-look 선별 (AOI 영역의 burst만 평가)"""
+        session = getattr(self.retriever, 'session', None)
+        selected = {}
+        for name, cfg in self.aois.items():
+            with use_config(cfg):
+                selected[name] = PairTriage(self._updater(name).catalog, session=session).select(pairs[name])
+        return selected
+
+    def group(self, pairs: Dict[str, List[PairSpec]]) -> List[ProcessingGroup]:
+        """같은 간섭쌍을 원하는 가까운 AOI끼리 묶어 처리 단위 구성
+
+        AOI는 같은 간섭쌍을 원하고 bbox 간격이 merge_distance 이내이면 연결되며(연결 요소 단위),
+        간섭쌍마다 그 간섭쌍을 원하는 AOI를 연결 요소별로 나눠 한 번씩 처리합니다.
+        """
+        wanted: Dict[tuple, Tuple[PairSpec, set]] = {}
+        for name, aoi_pairs in pairs.items():
+            for pair in aoi_pairs:
+                key = (pair.name, tuple(pair.reference_safes), tuple(pair.secondary_safes))
+                wanted.setdefault(key, (pair, set()))[1].add(name)
+
+        parent = {name: name for name in self.aois}
+
+        def find(name):
+            while parent[name] != name:
+                parent[name] = parent[parent[name]]
+                name = parent[name]
+            return name
+
+        for _, names in wanted.values():
+            for a, b in combinations(sorted(names), 2):
+                if bbox_distance(self.boxes[a], self.boxes[b]) <= self.merge_distance:
+                    parent[find(a)] = find(b)
+
+        groups: Dict[tuple, ProcessingGroup] = {}
+        for pair, names in wanted.values():
+            components: Dict[str, List[str]] = {}
+            for name in sorted(names):
+                components.setdefault(find(name), []).append(name)
+            for members in components.values():
+                key = tuple(members)
+                if key not in groups:
+                    groups[key] = ProcessingGroup(list(members), self._processing_config(members))
+                groups[key].pairs.append(pair)
+        return sorted(groups.values(), key=lambda g: (-len(g.aois), g.name))
+
+    def _processing_config(self, names: Sequence[str]) -> Config:
+        """처리 단위의 설정 (격자에 맞춘 영역, 공유 처리면 shared/<a>+<b> 디렉토리)"""
+        bbox = union_bbox([self.boxes[name] for name in names])
+        aoi = {
+            'name': '+'.join(names),
+            'min_lat': bbox[0], 'max_lat': bbox[1], 'min_lon': bbox[2], 'max_lon': bbox[3],
+            'epsg': self.config.get('aoi', 'epsg', default=4326),
+        }
+        if len(names) == 1:
+            # 단독 처리는 AOI 간섭쌍 디렉토리에 바로 기록 (잘라내기 없음)
+            return self.aois[names[0]].derive(aoi)
+        processed_dir = os.path.join(self.config.config['paths']['processed_dir'], 'shared', '+'.join(names))
+        return self.config.derive(aoi, processed_dir=processed_dir)
+
+    def run(self, dry_run: bool = False) -> Dict[str, Dict[str, int]]:
+        """작업 공간 증분 갱신
+
+        Args:
+            dry_run: True면 AOI별 새 간섭쌍과 처리 단위만 보고하고 처리하지 않음
+
+        Returns:
+            {AOI 이름: {'new_scenes', 'new_pairs', 'rejected', 'processed', 'failed'}}
+        """
+        new = self.sync()
+        pairs = self.plan(new)
+        summary = {
+            name: {'new_scenes': len(new[name]), 'new_pairs': len(pairs[name]),
+                   'rejected': 0, 'processed': 0, 'failed': 0}
+            for name in self.aois
+        }
+        if dry_run:
+            for group in self.group(pairs):
+                for pair in group.pairs:
+                    console.print(f"  [cyan]{pair.name}[/cyan] → {group.name}")
+            return summary
+        self.catalog.save()
+        self.save()
+        if self.config.get('triage', 'enabled', default=False):
+            selected = self.triage(pairs)
+            for name in self.aois:
+                summary[name]['rejected'] = len(pairs[name]) - len(selected[name])
+            pairs = selected
+
+        groups = self.group(pairs)
+        if not groups:
+            return summary
+        n_pairs = sum(len(group.pairs) for group in groups)
+        n_wanted = sum(len(aoi_pairs) for aoi_pairs in pairs.values())
+        logger.info(f"topsApp 처리 {n_pairs}개 (AOI별 합계 {n_wanted}개, 처리 단위 {len(groups)}개)")
+
+        self.raw_store.scan()
+        safes = [p for group in groups for pair in group.pairs for p in pair.reference_safes + pair.secondary_safes]
+        # 여러 AOI가 쓰는 장면도 공유 카탈로그 기준으로 한 번만 다운로드
+        self.updater._ensure_downloaded(sorted({scene_name(p) for p in safes}))
+        for group in groups:
+            for pair in group.pairs:
+                self.raw_store.pin(pair.reference_safes + pair.secondary_safes, owner=f"{group.name}:{pair.name}")
+        self.raw_store.touch(safes)
+
+        finished: Dict[str, List[Tuple[PairSpec, Path]]] = {name: [] for name in self.aois}
+        for group in groups:
+            for result in create_executor(config=group.config).run(group.pairs):
+                pair = result.pair
+                # 실패한 간섭쌍은 AOI별로 기록해 두고 다음 실행에서 다시 선정하므로 고정은 바로 해제
+                self.raw_store.unpin(f"{group.name}:{pair.name}")
+                for name in group.aois:
+                    with use_config(self.aois[name]):
+                        self._updater(name).record_result(pair, result.ok, result.error)
+                if not result.ok:
+                    logger.error(f"간섭쌍 처리 실패 ({group.name}/{pair.name}, {result.node}): {result.error}")
+                    for name in group.aois:
+                        summary[name]['failed'] += 1
+                    continue
+                for name in group.aois:
+                    target = pair_work_dir(pair, self.aois[name])
+                    if group.shared:
+                        crop_products(result.work_dir, target, self.boxes[name])
+                    finished[name].append((pair, target))
+
+        for name, cfg in self.aois.items():
+            if finished[name]:
+                with use_config(cfg):
+                    summary[name]['processed'] = self._updater(name).integrate(finished[name])
+        self.raw_store.enforce_budget()
+        return summary
+
+
+def main():
+    """메인 실행 함수"""
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="여러 AOI 공유 작업 공간 증분 갱신")
+    parser.add_argument('--aoi', nargs='*', default=None, help='갱신할 AOI (기본값: workspace.aois 전체)')
+    parser.add_argument('--dry-run', action='store_true', help='AOI별 새 간섭쌍과 처리 단위만 출력')
+    args = parser.parse_args()
+
+    console.print("[bold cyan]작업 공간 증분 갱신[/bold cyan]\n")
+    summary = Workspace(names=args.aoi).run(dry_run=args.dry_run)
+
+    table = Table(title="AOI별 갱신 결과" + (" (dry-run)" if args.dry_run else ""))
+    table.add_column("AOI", style="cyan")
+    for column in ("새 장면", "새 간섭쌍", "제외", "처리", "실패"):
+        table.add_column(column, justify="right")
+    for name, counts in summary.items():
+        table.add_row(name, *(str(counts[key]) for key in ('new_scenes', 'new_pairs', 'rejected', 'processed', 'failed')))
+    console.print(table)
+
+
+if __name__ == "__main__":
+    main()